@@ -20,7 +20,6 @@ from statsmodels.stats.diagnostic import (
     het_breuschpagan,
     linear_reset
 )
-from statsmodels.stats.outliers_influence import variance_inflation_factor
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
 from scipy.stats import shapiro
@@ -110,6 +109,51 @@ if not st.session_state.authenticated:
     </style>
     """, unsafe_allow_html=True)
 
+# =========================================================
+# VIF (BATCH)
+# VIF_i = [R^-1]_ii dari korelasi uncentered X'X (= variance_inflation_factor)
+# salinan vif_from_gram di "Model Rating Development/utils/vif.py" → ubah keduanya bersamaan
+# =========================================================
+
+SINGULAR_COND = 1e12
+
+
+def vif_from_gram(gram):
+
+    gram = np.asarray(gram, dtype="float64")
+
+    scale = np.sqrt(np.diag(gram))
+    valid = scale > 0
+
+    # kolom nol → VIF NaN (hanya kolom itu)
+    vif = np.full(len(gram), np.nan)
+
+    if not valid.any():
+        return vif
+
+    sub = gram[np.ix_(valid, valid)] / np.outer(scale[valid], scale[valid])
+
+    if np.linalg.cond(sub) < SINGULAR_COND:
+        vif[valid] = np.diag(np.linalg.inv(sub))
+        return vif
+
+    # near-singular → eigen: diag(R^-1) = Σ V_ij² / w_j
+    # inf hanya untuk kolom yang ikut kombinasi kolinear
+    w, v = np.linalg.eigh(sub)
+
+    tol = w.max() * len(w) * np.finfo("float64").eps
+    null = w <= tol
+
+    with np.errstate(divide="ignore"):
+        diag = (v[:, ~null] ** 2 / w[~null]).sum(axis=1)
+
+    involved = (v[:, null] ** 2).sum(axis=1) > tol
+    diag[involved] = np.inf
+
+    vif[valid] = diag
+
+    return vif
+
 # =========================================================
 # USER LOGGING
 # =========================================================
@@ -1069,12 +1113,12 @@ with tab2:
             return True
 
         def compute_vif(X):
+            # semua VIF sekaligus dari X'X (tanpa p kali OLS)
+            A = X.to_numpy(dtype="float64")
+
             vif = pd.DataFrame()
             vif["variable"] = X.columns
-            vif["VIF"] = [
-                variance_inflation_factor(X.values, i)
-                for i in range(X.shape[1])
-            ]
+            vif["VIF"] = vif_from_gram(A.T @ A)
             return vif
 
         def check_sign(coef_dict):
@@ -3,6 +3,17 @@ import pandas as pd
 
 from database.models import create_tables
 from database.crud import get_projects, create_project, delete_project
+from database.status import load_pipeline_status
+from database.maintenance import auto_vacuum_mode, enable_incremental_vacuum, INCREMENTAL
+from pipeline.dag import STAGES, STAGE_LABELS
+
+STATUS_ICONS = {
+    "done": "✅",
+    "stale": "⚠️",
+    "failed": "❌",
+    "running": "⏳",
+    "pending": "⚪",
+}
 
 # ======================
 # INIT
@@ -79,25 +90,20 @@ with st.sidebar:
     if st.session_state["page"] == "project_dashboard":
         st.markdown("### 🧭 Pipeline")
 
-        modules = [
-            ("① Input Data", "input"),
-            ("② Preprocessing", "preprocessing"),
-            ("③ Split Data", "split"),
-            ("④ Binning", "binning"),
-            ("⑤ WOE", "woe"),
-            ("⑥ Multicollinearity", "vif"),
-            ("⑦ SMOTE", "smote"),
-            ("⑧ Training Model", "training"),
-            ("⑨ Model Performance", "performance"),
-        ]
-
         if not st.session_state.get("project_id"):
             st.warning("Select a project first")
         else:
-            for label, key in modules:
-                if st.button(label, key=f"module_{key}", width='stretch'):
+            pipeline_status = load_pipeline_status(st.session_state["project_id"])
+
+            for key, label, _ in STAGES:
+                status = pipeline_status.get(key, {}).get("status", "pending")
+                icon = STATUS_ICONS.get(status, "⚪")
+
+                if st.button(f"{icon} {label}", key=f"module_{key}", width='stretch'):
                     st.session_state["active_module"] = key
 
+            st.caption("✅ done · ⚠️ stale · ❌ failed · ⚪ not run")
+
 
 # ======================
 # DIALOG: CREATE PROJECT
@@ -251,6 +257,21 @@ def project_list_page():
             else:
                 st.warning("Select a project first")
 
+        # ======================
+        # DATABASE MAINTENANCE
+        # DB lama → satu kali VACUUM penuh (blocking) agar ruang kosong
+        # bisa dikembalikan bertahap di background
+        # ======================
+        if auto_vacuum_mode() != INCREMENTAL:
+            with st.expander("🧹 Database Maintenance"):
+                st.caption("One-time full VACUUM: blocks the app until finished")
+
+                if st.button("Enable incremental vacuum", width='stretch'):
+                    with st.spinner("Running VACUUM..."):
+                        enable_incremental_vacuum()
+
+                    st.success("Incremental vacuum enabled")
+
 # ======================
 # PAGE 2: PROJECT DASHBOARD
 # ======================
@@ -264,18 +285,6 @@ def project_dashboard():
 
     st.title("📁 Project Dashboard")
 
-    modules = [
-        ("① Input Data", "input"),
-        ("② Preprocessing", "preprocessing"),
-        ("③ Split Data", "split"),
-        ("④ Binning", "binning"),
-        ("⑤ WOE", "woe"),
-        ("⑥ Multicollinearity", "vif"),
-        ("⑦ SMOTE", "smote"),
-        ("⑧ Training Model", "training"),
-        ("⑨ Model Performance", "performance"),
-    ]
-
     if project_name:
         st.markdown(f"""
         <div style="background-color:#EAF2F8;padding:10px;border-radius:12px;">
@@ -312,6 +321,37 @@ def project_dashboard():
         </div>
         """, unsafe_allow_html=True)
 
+        stage_status = load_pipeline_status(project_id).get(active, {})
+
+        if stage_status.get("status") == "stale":
+            st.warning("Upstream step changed since this step was saved — re-run it")
+        elif stage_status.get("status") == "failed":
+            st.error(f"Last run failed: {stage_status.get('error')}")
+
+        # ======================
+        # RUN FROM HERE (HEADLESS)
+        # pakai parameter terakhir yang disimpan tiap step
+        # ======================
+        if st.button(f"▶ Run from {STAGE_LABELS[active]}"):
+            from pipeline.runner import run_pipeline
+
+            with st.status("Running pipeline...", expanded=True) as run_status:
+
+                def show_result(result):
+                    label = STAGE_LABELS[result["stage"]]
+
+                    if result["status"] == "done":
+                        st.write(f"✅ {label}: {result['summary']}")
+                    else:
+                        st.write(f"❌ {label}: {result['error']}")
+
+                results = run_pipeline(project_id, start=active, on_stage=show_result)
+
+                if results and results[-1]["status"] == "done":
+                    run_status.update(label="Pipeline finished", state="complete")
+                else:
+                    run_status.update(label="Pipeline stopped", state="error")
+
     st.divider()
 
     if active == "input":
@@ -334,6 +374,10 @@ def project_dashboard():
         from modules import woe
         woe.run(project_id)
 
+    elif active == "preselection":
+        from modules import preselection
+        preselection.run(project_id)
+
     elif active == "vif":
         from modules import multicollinearity
         multicollinearity.run(project_id)
@@ -0,0 +1,347 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from database.db import ARTIFACT_DIR
+
+
+# ======================
+# PATH HELPERS
+# ======================
+def artifact_path(hash_value, fmt="parquet"):
+    ext = "parquet" if fmt == "parquet" else "pkl"
+    return ARTIFACT_DIR / f"{hash_value}.{ext}"
+
+
+def _file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _publish(tmp_path, fmt):
+    # 🔥 nama file = hash isi file (content addressed)
+    hash_value = _file_hash(tmp_path)
+    final_path = artifact_path(hash_value, fmt)
+
+    if final_path.exists():
+        # dedup: isi sama sudah ada → pakai file lama
+        # (mtime diperbarui supaya tidak ikut disapu GC)
+        os.remove(tmp_path)
+        os.utime(final_path)
+    else:
+        os.replace(tmp_path, final_path)
+
+    return hash_value, final_path
+
+
+# ======================
+# WRITE
+# file ditulis di luar transaksi (tidak memegang write lock),
+# metadata didaftarkan di dalam transaksi
+# ======================
+CHUNK_ROWS = 100_000
+COMPRESSION = "zstd"
+
+
+def _tmp_path():
+    ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
+    return ARTIFACT_DIR / f".tmp-{uuid.uuid4().hex}"
+
+
+def _has_default_index(df):
+    index = df.index
+    return (
+        isinstance(index, pd.RangeIndex)
+        and index.start == 0
+        and index.step == 1
+    )
+
+
+def iter_frame_chunks(df, chunk_rows=CHUNK_ROWS):
+    # slice (view), bukan copy
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _info(hash_value, fmt, n_rows, columns, final_path):
+    return {
+        "hash": hash_value,
+        "format": fmt,
+        "n_rows": n_rows,
+        "n_cols": len(columns),
+        "columns": columns,
+        "size_bytes": final_path.stat().st_size
+    }
+
+
+class ChunkSchemaError(ValueError):
+    pass
+
+
+def _unify_chunk(table, schema, i):
+    # schema parquet dikunci chunk pertama → chunk berikutnya di-cast,
+    # kalau tidak bisa (mis. float dengan NaN → int, teks → angka) error jelas per kolom
+    if table.schema.names != schema.names:
+        raise ChunkSchemaError(f"Chunk {i}: columns differ from the first chunk")
+
+    try:
+        return table.cast(schema)
+
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+        mismatched = [
+            f"{field.name}: {table.schema.field(field.name).type} → {field.type}"
+            for field in schema
+            if not table.schema.field(field.name).type.equals(field.type)
+        ]
+
+        raise ChunkSchemaError(
+            f"Chunk {i}: schema differs from the first chunk ({', '.join(mismatched)}); "
+            "lock dtypes for the whole file (e.g. scan_csv_dtypes) before ingest"
+        ) from e
+
+
+def store_artifact_chunks(chunks, preserve_index=False):
+    # streaming writer: tiap chunk → satu row group (zstd)
+    tmp_path = _tmp_path()
+    writer = None
+    n_rows = 0
+
+    try:
+        for i, chunk in enumerate(chunks):
+            try:
+                table = pa.Table.from_pandas(chunk, preserve_index=preserve_index)
+            except (pa.ArrowException, TypeError) as e:
+                raise ChunkSchemaError(f"Chunk {i}: column with mixed types ({e}); set its dtype explicitly") from e
+
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema, compression=COMPRESSION)
+
+            elif not table.schema.equals(writer.schema, check_metadata=False):
+                # dtype per chunk bisa beda (mis. int64 vs float64, kolom semua NaN)
+                table = _unify_chunk(table, writer.schema, i)
+
+            writer.write_table(table, row_group_size=len(chunk) or None)
+            n_rows += len(chunk)
+
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if tmp_path.exists():
+            os.remove(tmp_path)
+        raise
+
+    if writer is None:
+        raise ValueError("No chunks to write")
+
+    columns = [c for c in writer.schema.names if not c.startswith("__index_level_")]
+    writer.close()
+
+    hash_value, final_path = _publish(tmp_path, "parquet")
+
+    return _info(hash_value, "parquet", n_rows, columns, final_path)
+
+
+def store_artifact(df):
+    try:
+        return store_artifact_chunks(
+            iter_frame_chunks(df),
+            preserve_index=not _has_default_index(df)
+        )
+
+    except (pa.ArrowException, TypeError, ChunkSchemaError):
+        # mixed-type object column → fallback pickle
+        tmp_path = _tmp_path()
+
+        with open(tmp_path, "wb") as f:
+            pickle.dump(df, f)
+
+        hash_value, final_path = _publish(tmp_path, "pickle")
+
+        return _info(hash_value, "pickle", len(df), [str(c) for c in df.columns], final_path)
+
+
+def register_artifact(cursor, info):
+    cursor.execute("""
+        INSERT OR IGNORE INTO artifacts
+        (hash, format, n_rows, n_cols, columns, size_bytes)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (
+        info["hash"],
+        info["format"],
+        info["n_rows"],
+        info["n_cols"],
+        json.dumps(info["columns"]),
+        info["size_bytes"]
+    ))
+
+    return info["hash"]
+
+
+def write_artifact(cursor, df):
+    return register_artifact(cursor, store_artifact(df))
+
+
+# ======================
+# READ
+# ======================
+def get_artifact_info(cursor, hash_value):
+    cursor.execute("SELECT * FROM artifacts WHERE hash = ?", (hash_value,))
+    row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    return {
+        "hash": row["hash"],
+        "format": row["format"],
+        "n_rows": row["n_rows"],
+        "n_cols": row["n_cols"],
+        "columns": json.loads(row["columns"]),
+        "size_bytes": row["size_bytes"]
+    }
+
+
+def _index_columns(parquet_file):
+    metadata = parquet_file.schema_arrow.pandas_metadata or {}
+
+    return [
+        c for c in metadata.get("index_columns", [])
+        if isinstance(c, str)
+    ]
+
+
+def read_artifact_file(hash_value, fmt, columns=None):
+    path = artifact_path(hash_value, fmt)
+
+    if fmt == "pickle":
+        with open(path, "rb") as f:
+            df = pickle.load(f)
+        return df[list(columns)] if columns is not None else df
+
+    if columns is None:
+        return pq.read_table(path).to_pandas()
+
+    # 🔥 COLUMN PROJECTION (index ikut dibaca supaya alignment aman)
+    parquet_file = pq.ParquetFile(path)
+    table = parquet_file.read(columns=list(columns) + _index_columns(parquet_file))
+
+    return table.to_pandas()
+
+
+def read_artifact(cursor, hash_value, columns=None):
+    info = get_artifact_info(cursor, hash_value)
+
+    if info is None:
+        raise FileNotFoundError(f"Artifact {hash_value} not registered")
+
+    return read_artifact_file(hash_value, info["format"], columns)
+
+
+# ======================
+# LAZY HANDLE
+# ======================
+class ArtifactHandle:
+
+    def __init__(self, info):
+        self.hash = info["hash"]
+        self.format = info["format"]
+        self.columns = info["columns"]
+        self.shape = (info["n_rows"], info["n_cols"])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return f"ArtifactHandle({self.hash[:12]}, shape={self.shape})"
+
+    def load(self, columns=None):
+        return read_artifact_file(self.hash, self.format, columns)
+
+    def iter_chunks(self, batch_size=CHUNK_ROWS, columns=None):
+        return iter_artifact_file(self.hash, self.format, batch_size, columns)
+
+
+def open_artifact(cursor, hash_value):
+    info = get_artifact_info(cursor, hash_value)
+
+    if info is None:
+        raise FileNotFoundError(f"Artifact {hash_value} not registered")
+
+    return ArtifactHandle(info)
+
+
+# ======================
+# STREAMING READ
+# ======================
+def iter_artifact_file(hash_value, fmt, batch_size=CHUNK_ROWS, columns=None):
+    path = artifact_path(hash_value, fmt)
+
+    if fmt == "pickle":
+        with open(path, "rb") as f:
+            df = pickle.load(f)
+        if columns is not None:
+            df = df[list(columns)]
+        yield from iter_frame_chunks(df, batch_size)
+        return
+
+    parquet_file = pq.ParquetFile(path)
+
+    if columns is not None:
+        columns = list(columns) + _index_columns(parquet_file)
+
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas()
+
+
+def iter_artifact(cursor, hash_value, batch_size=CHUNK_ROWS, columns=None):
+    info = get_artifact_info(cursor, hash_value)
+
+    if info is None:
+        raise FileNotFoundError(f"Artifact {hash_value} not registered")
+
+    return iter_artifact_file(hash_value, info["format"], batch_size, columns)
+
+
+# ======================
+# GARBAGE COLLECTION
+# ======================
+GC_GRACE_SECONDS = 600
+
+
+def collect_garbage(cursor, grace_seconds=GC_GRACE_SECONDS):
+    # 1) metadata artifact tanpa referensi
+    cursor.execute("DELETE FROM artifacts WHERE refcount <= 0")
+
+    cursor.execute("SELECT hash FROM artifacts")
+    live = {row["hash"] for row in cursor.fetchall()}
+
+    # 2) file tanpa metadata; file yang baru ditulis (belum sempat
+    #    di-register oleh transaksi lain) dilindungi grace period
+    cutoff = time.time() - grace_seconds
+    removed = 0
+
+    if not ARTIFACT_DIR.exists():
+        return removed
+
+    for path in ARTIFACT_DIR.iterdir():
+        hash_value = path.stem.replace(".tmp-", "")
+
+        if hash_value in live or path.stat().st_mtime > cutoff:
+            continue
+
+        os.remove(path)
+        removed += 1
+
+    return removed
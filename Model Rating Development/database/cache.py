@@ -0,0 +1,87 @@
+import hashlib
+import json
+
+from database.db import transaction
+from database.artifacts import (
+    store_artifact,
+    register_artifact,
+    read_artifact,
+    collect_garbage
+)
+
+
+# jumlah versi yang disimpan per (project, stage)
+STAGE_CACHE_VERSIONS = 4
+
+
+# ======================
+# CACHE KEY
+# hash dari semua input stage (hash artifact upstream, rules, parameter)
+# ======================
+def stage_key(*inputs):
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# ======================
+# LOAD / SAVE
+# ======================
+def load_stage_results(project_id, keys):
+    # keys: iterable (stage, cache_key)
+    # → dict {(stage, cache_key): (df, value)} hanya untuk cache hit
+    results = {}
+
+    with transaction() as cursor:
+        for stage, key in keys:
+            cursor.execute("""
+                SELECT artifact_hash, value FROM stage_cache
+                WHERE project_id = ? AND stage = ? AND cache_key = ?
+            """, (project_id, stage, key))
+
+            row = cursor.fetchone()
+
+            if row is None:
+                continue
+
+            df = None
+            if row["artifact_hash"] is not None:
+                df = read_artifact(cursor, row["artifact_hash"])
+
+            value = json.loads(row["value"]) if row["value"] is not None else None
+
+            results[(stage, key)] = (df, value)
+
+    return results
+
+
+def save_stage_result(project_id, stage, key, df=None, value=None):
+    # file parquet ditulis sebelum transaksi dibuka
+    info = store_artifact(df) if df is not None else None
+
+    with transaction(write=True) as cursor:
+        cursor.execute("""
+            INSERT OR REPLACE INTO stage_cache
+            (project_id, stage, cache_key, artifact_hash, value)
+            VALUES (?, ?, ?, ?, ?)
+        """, (
+            project_id,
+            stage,
+            key,
+            register_artifact(cursor, info) if info is not None else None,
+            json.dumps(value) if value is not None else None
+        ))
+
+        # 🔥 buang versi lama (refcount artifact turun lewat trigger)
+        cursor.execute("""
+            DELETE FROM stage_cache
+            WHERE project_id = ? AND stage = ? AND rowid NOT IN (
+                SELECT rowid FROM stage_cache
+                WHERE project_id = ? AND stage = ?
+                ORDER BY created_at DESC, rowid DESC
+                LIMIT ?
+            )
+        """, (project_id, stage, project_id, stage, STAGE_CACHE_VERSIONS))
+
+        if cursor.rowcount > 0:
+            collect_garbage(cursor)
+
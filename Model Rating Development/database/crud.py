@@ -1,116 +1,136 @@
+import ast
 import pickle
 import json
-from database.db import get_connection
+from database.db import transaction
+from database.maintenance import schedule_vacuum
+from database.status import complete_stage
+from database.artifacts import (
+    store_artifact,
+    store_artifact_chunks,
+    register_artifact,
+    read_artifact,
+    open_artifact,
+    collect_garbage
+)
 
 
 # ======================
 # CREATE PROJECT
 # ======================
 def create_project(name):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "INSERT INTO projects (name) VALUES (?)",
-        (name,)
-    )
-
-    conn.commit()
-    conn.close()
+    with transaction(write=True) as cursor:
+        cursor.execute(
+            "INSERT INTO projects (name) VALUES (?)",
+            (name,)
+        )
 
 
 # ======================
 # READ PROJECTS
 # ======================
 def get_projects():
-    conn = get_connection()
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        cursor.execute("SELECT * FROM projects ORDER BY created_at DESC")
+        rows = cursor.fetchall()
 
-    cursor.execute("SELECT * FROM projects ORDER BY created_at DESC")
-    rows = cursor.fetchall()
-
-    result = [dict(row) for row in rows]
-
-    conn.close()
-    return result
+    return [dict(row) for row in rows]
 
 
 # ======================
 # DELETE PROJECT
 # ======================
 def delete_project(project_id):
-    conn = get_connection()
-    cursor = conn.cursor()
+    with transaction(write=True) as cursor:
+        # 🔥 ON DELETE CASCADE → semua tabel turunan ikut terhapus
+        # (refcount artifact turun lewat trigger)
+        cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
 
-    cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+        # artifact yang tidak dipakai project lain ikut dihapus
+        collect_garbage(cursor)
 
-    conn.commit()
-    conn.close()
+    # halaman kosong dikembalikan ke OS di background
+    schedule_vacuum()
 
 
 # ======================
 # DATASET
 # ======================
 def save_dataset(project_id, df, file_name):
-    conn = get_connection()
-    cursor = conn.cursor()
+    # file parquet ditulis (per row group) sebelum transaksi dibuka
+    _register_dataset(project_id, store_artifact(df), file_name)
 
-    cursor.execute("""
-    INSERT OR REPLACE INTO datasets (project_id, file_name, data)
-    VALUES (?, ?, ?)
-    """, (
-        project_id,
-        file_name,
-        pickle.dumps(df)
-    ))
 
-    conn.commit()
-    conn.close()
+def save_dataset_chunks(project_id, chunks, file_name):
+    # chunks: iterable DataFrame (mis. pd.read_csv(..., chunksize=...))
+    # → tidak pernah ada satu frame penuh di memory
+    _register_dataset(project_id, store_artifact_chunks(chunks), file_name)
 
 
-def load_dataset(project_id):
-    conn = get_connection()
-    cursor = conn.cursor()
+def _register_dataset(project_id, info, file_name):
+    with transaction(write=True) as cursor:
+        data_hash = register_artifact(cursor, info)
 
-    cursor.execute("SELECT * FROM datasets WHERE project_id = ?", (project_id,))
-    row = cursor.fetchone()
+        cursor.execute("""
+        INSERT OR REPLACE INTO datasets (project_id, file_name, data_hash)
+        VALUES (?, ?, ?)
+        """, (
+            project_id,
+            file_name,
+            data_hash
+        ))
 
-    conn.close()
+        complete_stage(cursor, project_id, "input")
 
-    if row:
-        return pickle.loads(row["data"]), row["file_name"]
-    return None, None
+
+def load_dataset(project_id, columns=None):
+    with transaction() as cursor:
+        cursor.execute("SELECT * FROM datasets WHERE project_id = ?", (project_id,))
+        row = cursor.fetchone()
+
+        if row is None:
+            return None, None
+
+        df = read_artifact(cursor, row["data_hash"], columns)
+
+    return df, row["file_name"]
+
+
+def open_dataset(project_id):
+    # handle lazy → .iter_chunks(batch_size, columns) untuk streaming read
+    with transaction() as cursor:
+        cursor.execute("SELECT * FROM datasets WHERE project_id = ?", (project_id,))
+        row = cursor.fetchone()
+
+        if row is None:
+            return None, None
+
+        handle = open_artifact(cursor, row["data_hash"])
+
+    return handle, row["file_name"]
 
 
 # ======================
 # PREPROCESSING
 # ======================
 def save_preprocessing(project_id, target, features, imputation_rules):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    INSERT OR REPLACE INTO preprocessing (project_id, target, features, imputation_rules)
-    VALUES (?, ?, ?, ?)
-    """, (
-        project_id,
-        target,
-        json.dumps(features),
-        json.dumps(imputation_rules)
-    ))
+    with transaction(write=True) as cursor:
+        cursor.execute("""
+        INSERT OR REPLACE INTO preprocessing (project_id, target, features, imputation_rules)
+        VALUES (?, ?, ?, ?)
+        """, (
+            project_id,
+            target,
+            json.dumps(features),
+            json.dumps(imputation_rules)
+        ))
 
-    conn.commit()
-    conn.close()
+        complete_stage(cursor, project_id, "preprocessing")
 
 
 def load_preprocessing(project_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT * FROM preprocessing WHERE project_id = ?", (project_id,))
-    row = cursor.fetchone()
-
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("SELECT * FROM preprocessing WHERE project_id = ?", (project_id,))
+        row = cursor.fetchone()
 
     if row:
         return {
@@ -126,89 +146,119 @@ def load_preprocessing(project_id):
 # DATA SPLIT
 # ======================
 def save_split(project_id, train, test, val, method):
-    conn = get_connection()
-    cursor = conn.cursor()
+    infos = [
+        store_artifact(df) if df is not None else None
+        for df in (train, test, val)
+    ]
 
-    cursor.execute("""
-    INSERT OR REPLACE INTO data_split
-    (project_id, train_data, test_data, val_data, method)
-    VALUES (?, ?, ?, ?, ?)
-    """, (
-        project_id,
-        pickle.dumps(train),
-        pickle.dumps(test),
-        pickle.dumps(val) if val is not None else None,
-        method
-    ))
+    with transaction(write=True) as cursor:
+        train_hash, test_hash, val_hash = [
+            register_artifact(cursor, info) if info is not None else None
+            for info in infos
+        ]
 
-    conn.commit()
-    conn.close()
+        cursor.execute("""
+        INSERT OR REPLACE INTO data_split
+        (project_id, method, train_hash, test_hash, val_hash)
+        VALUES (?, ?, ?, ?, ?)
+        """, (
+            project_id,
+            method,
+            train_hash,
+            test_hash,
+            val_hash
+        ))
 
+        complete_stage(cursor, project_id, "split")
 
-def load_split(project_id):
-    conn = get_connection()
-    cursor = conn.cursor()
 
-    cursor.execute("SELECT * FROM data_split WHERE project_id = ?", (project_id,))
-    row = cursor.fetchone()
+SPLIT_PARTS = ("train", "test", "val")
 
-    conn.close()
 
-    if row:
-        return {
-            "train": pickle.loads(row["train_data"]),
-            "test": pickle.loads(row["test_data"]),
-            "val": pickle.loads(row["val_data"]) if row["val_data"] else None,
-            "method": row["method"]
+def _load_split_part(cursor, row, part, columns=None, lazy=False):
+    if row[f"{part}_hash"] is None:
+        return None
+
+    if lazy:
+        return open_artifact(cursor, row[f"{part}_hash"])
+
+    return read_artifact(cursor, row[f"{part}_hash"], columns)
+
+
+def load_split(project_id, parts=None, columns=None):
+    # parts=None → semua partisi di-load (perilaku lama)
+    # partisi lain dikembalikan sebagai ArtifactHandle (lazy)
+    if parts is None:
+        parts = SPLIT_PARTS
+
+    with transaction() as cursor:
+        cursor.execute("SELECT * FROM data_split WHERE project_id = ?", (project_id,))
+        row = cursor.fetchone()
+
+        if row is None:
+            return None
+
+        result = {
+            part: _load_split_part(
+                cursor,
+                row,
+                part,
+                columns=columns,
+                lazy=part not in parts
+            )
+            for part in SPLIT_PARTS
         }
 
-    return None
+    result["method"] = row["method"]
+
+    return result
 
 
 # ======================
 # BINNING
 # ======================
 def save_binning(project_id, rules):
-    conn = get_connection()
-    cursor = conn.cursor()
+    with transaction(write=True) as cursor:
+        cursor.execute("""
+        INSERT OR REPLACE INTO binning (project_id, binning_rules)
+        VALUES (?, ?)
+        """, (project_id, json.dumps(rules)))
 
-    cursor.execute("""
-    INSERT OR REPLACE INTO binning (project_id, binning_rules)
-    VALUES (?, ?)
-    """, (project_id, json.dumps(rules)))
-
-    conn.commit()
-    conn.close()
+        complete_stage(cursor, project_id, "binning")
 
 
 def load_binning(project_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT * FROM binning WHERE project_id = ?", (project_id,))
-    row = cursor.fetchone()
-
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("SELECT * FROM binning WHERE project_id = ?", (project_id,))
+        row = cursor.fetchone()
 
     return json.loads(row["binning_rules"]) if row else None
 
 
 # ======================
-# MODEL DATASET (FIXED)
+# MODEL DATASET (PER ARTIFACT)
+# satu baris per artifact → update satu artifact
+# tidak menulis ulang artifact lain
 # ======================
-def ensure_model_dataset_schema(cursor):
-
-    cursor.execute("PRAGMA table_info(model_dataset)")
-    columns = [row[1] for row in cursor.fetchall()]
-
-    if "woe_result" not in columns:
-        cursor.execute("ALTER TABLE model_dataset ADD COLUMN woe_result BLOB")
-
-    if "coef_df" not in columns:
-        cursor.execute("ALTER TABLE model_dataset ADD COLUMN coef_df BLOB")
-
-    if "intercept" not in columns:
-        cursor.execute("ALTER TABLE model_dataset ADD COLUMN intercept REAL")
+MODEL_ARTIFACTS = {
+    "df_woe": "frame",
+    "features": "json",
+    "woe_result": "frame",
+    "coef_df": "frame",
+    "intercept": "json",
+    "woe_maps": "pickle",
+    "source": "json"
+}
+
+# artifact → stage pipeline yang menghasilkannya
+# (features / source saja → SMOTE)
+MODEL_ARTIFACT_STAGES = {
+    "woe_result": "woe",
+    "woe_maps": "woe",
+    "df_woe": "vif",
+    "coef_df": "training",
+    "intercept": "training"
+}
 
 
 def save_model_dataset(
@@ -219,146 +269,133 @@ def save_model_dataset(
     coef_df=None,
     intercept=None,
     woe_maps=None,
-    source="original"
+    source=None
 ):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    ensure_model_dataset_schema(cursor)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS model_dataset (
-            project_id INTEGER PRIMARY KEY,
-            df_woe BLOB,
-            features TEXT,
-            woe_result BLOB,
-            coef_df BLOB,
-            intercept REAL,
-            woe_maps BLOB,
-            source TEXT
-        )
-    """)
+    values = {
+        "df_woe": df_woe,
+        "features": features,
+        "woe_result": woe_result,
+        "coef_df": coef_df,
+        "intercept": intercept,
+        "woe_maps": woe_maps,
+        "source": source
+    }
 
-    # ======================
-    # 🔥 CHECK EXISTING DATA
-    # ======================
-    cursor.execute("SELECT * FROM model_dataset WHERE project_id=?", (project_id,))
-    row = cursor.fetchone()
+    # 🔥 hanya artifact yang dikirim yang ditulis
+    values = {name: value for name, value in values.items() if value is not None}
 
-    if row:
-        # ambil existing
-        existing_df_woe = pickle.loads(row["df_woe"]) if row["df_woe"] else None
-        existing_features = json.loads(row["features"]) if row["features"] else None
-        existing_woe_result = pickle.loads(row["woe_result"]) if row["woe_result"] else None
-        existing_coef_df = pickle.loads(row["coef_df"]) if row["coef_df"] else None
-        existing_intercept = row["intercept"]
-        existing_woe_maps = pickle.loads(row["woe_maps"]) if row["woe_maps"] else None
-
-    else:
-        existing_df_woe = None
-        existing_features = None
-        existing_woe_result = None
-        existing_coef_df = None
-        existing_intercept = None
-        existing_woe_maps = None
-
-    # ======================
-    # 🔥 MERGE DATA (INI KUNCI)
-    # ======================
-    final_df_woe = df_woe if df_woe is not None else existing_df_woe
-    final_features = features if features is not None else existing_features
-    final_woe_result = woe_result if woe_result is not None else existing_woe_result
-    final_coef_df = coef_df if coef_df is not None else existing_coef_df
-    final_intercept = intercept if intercept is not None else existing_intercept
-    final_woe_maps = woe_maps if woe_maps is not None else existing_woe_maps
-
-    # ======================
-    # SAVE FINAL
-    # ======================
-    cursor.execute("""
-        INSERT OR REPLACE INTO model_dataset
-        (project_id, df_woe, features, woe_result, coef_df, intercept, woe_maps, source)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        project_id,
-        pickle.dumps(final_df_woe) if final_df_woe is not None else None,
-        json.dumps(final_features) if final_features is not None else None,
-        pickle.dumps(final_woe_result) if final_woe_result is not None else None,
-        pickle.dumps(final_coef_df) if final_coef_df is not None else None,
-        final_intercept,
-        pickle.dumps(final_woe_maps) if final_woe_maps is not None else None,
-        source
-    ))
-
-    conn.commit()
-    conn.close()
-
-
-def load_model_dataset(project_id):
-
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT * FROM model_dataset WHERE project_id=?
-    """, (project_id,))
-
-    row = cursor.fetchone()
-    conn.close()
+    # file parquet ditulis sebelum transaksi dibuka
+    infos = {
+        name: store_artifact(value)
+        for name, value in values.items()
+        if MODEL_ARTIFACTS[name] == "frame"
+    }
 
-    if row is None:
-        return None
+    with transaction(write=True) as cursor:
+        cursor.execute("""
+            SELECT name, artifact_hash, value, blob FROM model_artifacts
+            WHERE project_id = ?
+        """, (project_id,))
 
-    return {
-        "df_woe": pickle.loads(row["df_woe"]) if row["df_woe"] else None,
-        "features": json.loads(row["features"]) if row["features"] else None,
-        "woe_result": pickle.loads(row["woe_result"]) if row["woe_result"] else None,
-        "coef_df": pickle.loads(row["coef_df"]) if row["coef_df"] else None,
-        "intercept": row["intercept"],
-        "source": row["source"]
-    }
+        previous = {row["name"]: tuple(row)[1:] for row in cursor.fetchall()}
+        changed = set()
 
+        for name, value in values.items():
 
-def save_model_rules(project_id, rating_rules=None, score_rules=None):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS model_rules (
-            project_id TEXT PRIMARY KEY,
-            rating_rules TEXT,
-            score_rules TEXT
-        )
-    """)
+            kind = MODEL_ARTIFACTS[name]
 
-    cursor.execute("""
-        INSERT INTO model_rules (project_id, rating_rules, score_rules)
-        VALUES (?, ?, ?)
-        ON CONFLICT(project_id) DO UPDATE SET
-            rating_rules=excluded.rating_rules,
-            score_rules=excluded.score_rules
-    """, (
-        project_id,
-        json.dumps(rating_rules) if rating_rules else None,
-        json.dumps(score_rules) if score_rules else None
-    ))
+            row = (
+                register_artifact(cursor, infos[name]) if kind == "frame" else None,
+                json.dumps(value) if kind == "json" else None,
+                pickle.dumps(value) if kind == "pickle" else None
+            )
 
-    conn.commit()
-    conn.close()
+            if previous.get(name) != row:
+                changed.add(name)
 
+            cursor.execute("""
+                INSERT INTO model_artifacts
+                (project_id, name, artifact_hash, value, blob)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(project_id, name) DO UPDATE SET
+                    artifact_hash=excluded.artifact_hash,
+                    value=excluded.value,
+                    blob=excluded.blob,
+                    updated_at=CURRENT_TIMESTAMP
+            """, (project_id, name, *row))
 
-def load_model_rules(project_id):
-    conn = get_connection()
-    cursor = conn.cursor()
+        stages = {MODEL_ARTIFACT_STAGES[name] for name in values if name in MODEL_ARTIFACT_STAGES}
+
+        for completed in stages or {"smote"}:
+            # re-run tanpa perubahan (mis. Streamlit rerun) tidak meng-invalidate
+            complete_stage(cursor, project_id, completed, changed=bool(changed))
+
+
+def _load_model_artifact(cursor, row, columns=None):
+    kind = MODEL_ARTIFACTS.get(row["name"])
+
+    if kind == "frame":
+        return read_artifact(cursor, row["artifact_hash"], columns)
+
+    if kind == "pickle":
+        return pickle.loads(row["blob"])
+
+    return json.loads(row["value"])
+
+
+def load_model_dataset(project_id, artifacts=None):
+    # artifacts=None → semua artifact; selain itu hanya yang diminta
+    # (artifact lain bernilai None, tidak di-load)
+    names = list(artifacts) if artifacts is not None else list(MODEL_ARTIFACTS)
 
-    cursor.execute("""
-        SELECT rating_rules, score_rules
-        FROM model_rules
-        WHERE project_id = ?
-    """, (project_id,))
+    with transaction() as cursor:
+        cursor.execute("""
+            SELECT * FROM model_artifacts WHERE project_id=?
+        """, (project_id,))
 
-    row = cursor.fetchone()
-    conn.close()
+        rows = {row["name"]: row for row in cursor.fetchall()}
+
+        if not rows:
+            return None
+
+        result = {
+            name: None
+            for name in ("df_woe", "features", "woe_result", "coef_df", "intercept", "source")
+        }
+
+        for name in names:
+            if name in rows:
+                result[name] = _load_model_artifact(cursor, rows[name])
+
+    return result
+
+
+def save_model_rules(project_id, rating_rules=None, score_rules=None):
+    with transaction(write=True) as cursor:
+        cursor.execute("""
+            INSERT INTO model_rules (project_id, rating_rules, score_rules)
+            VALUES (?, ?, ?)
+            ON CONFLICT(project_id) DO UPDATE SET
+                rating_rules=excluded.rating_rules,
+                score_rules=excluded.score_rules
+        """, (
+            project_id,
+            json.dumps(rating_rules) if rating_rules else None,
+            json.dumps(score_rules) if score_rules else None
+        ))
+
+        complete_stage(cursor, project_id, "performance")
+
+
+def load_model_rules(project_id):
+    with transaction() as cursor:
+        cursor.execute("""
+            SELECT rating_rules, score_rules
+            FROM model_rules
+            WHERE project_id = ?
+        """, (project_id,))
+
+        row = cursor.fetchone()
 
     if row is None:
         return None, None
@@ -367,3 +404,76 @@ def load_model_rules(project_id):
     score_rules = json.loads(row[1]) if row[1] else []
 
     return rating_rules, score_rules
+
+
+# ======================
+# MODEL RESULT
+# ======================
+def save_model(project_id, model, features):
+    model_blob = pickle.dumps(model)
+
+    with transaction(write=True) as cursor:
+        cursor.execute("""
+            INSERT OR REPLACE INTO model_result (project_id, model, features)
+            VALUES (?, ?, ?)
+        """, (
+            project_id,
+            model_blob,
+            json.dumps(features)
+        ))
+
+
+def _parse_features(raw):
+    # baris lama bisa berisi repr list Python, bukan JSON
+    if raw is None:
+        return None
+
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return ast.literal_eval(raw)
+
+
+def load_model(project_id):
+    # → (model statsmodels, features) atau (None, None)
+    with transaction() as cursor:
+        cursor.execute("""
+            SELECT model, features
+            FROM model_result
+            WHERE project_id = ?
+        """, (project_id,))
+
+        row = cursor.fetchone()
+
+    if row is None:
+        return None, None
+
+    return pickle.loads(row["model"]), _parse_features(row["features"])
+
+
+def save_calibrated_model(project_id, params, features):
+    with transaction(write=True) as cursor:
+        cursor.execute("""
+            INSERT OR REPLACE INTO model_calibrated (project_id, params, features)
+            VALUES (?, ?, ?)
+        """, (
+            project_id,
+            pickle.dumps(params),
+            json.dumps(features)
+        ))
+
+
+def load_calibrated_model(project_id):
+    # → (params kalibrasi, features) atau (None, None)
+    with transaction() as cursor:
+        cursor.execute("""
+            SELECT params, features FROM model_calibrated
+            WHERE project_id = ?
+        """, (project_id,))
+
+        row = cursor.fetchone()
+
+    if row is None:
+        return None, None
+
+    return pickle.loads(row["params"]), json.loads(row["features"])
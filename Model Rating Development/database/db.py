@@ -1,9 +1,128 @@
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 DB_PATH = Path("storage/app.db")
+ARTIFACT_DIR = DB_PATH.parent / "artifacts"
+
+POOL_SIZE = 8
+
+# ======================
+# PRAGMA (per connection)
+# ======================
+PRAGMAS = [
+    # harus sebelum journal_mode: hanya berlaku di DB baru (tanpa VACUUM),
+    # DB lama tetap mode lamanya sampai enable_incremental_vacuum()
+    "PRAGMA auto_vacuum = INCREMENTAL",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",      # 64 MB page cache
+    "PRAGMA mmap_size = 268435456",    # 256 MB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 30000",
+    # INSERT OR REPLACE ikut menjalankan DELETE trigger (refcount artifact)
+    "PRAGMA recursive_triggers = ON",
+    "PRAGMA foreign_keys = ON",
+]
+
 
 def get_connection():
-    conn = sqlite3.connect(DB_PATH)
+    # autocommit mode: transaksi dikontrol eksplisit lewat transaction()
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=30,
+        isolation_level=None,
+        check_same_thread=False
+    )
     conn.row_factory = sqlite3.Row
+
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
     return conn
+
+
+# ======================
+# CONNECTION POOL
+# ======================
+class ConnectionPool:
+
+    def __init__(self, size=POOL_SIZE):
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return get_connection()
+
+    def release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool, _pool_pid
+
+    # pool per process (koneksi sqlite tidak boleh dibawa lintas fork)
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool()
+            _pool_pid = os.getpid()
+
+    return _pool
+
+
+# ======================
+# TRANSACTION
+# ======================
+@contextmanager
+def transaction(write=False):
+    pool = get_pool()
+    conn = pool.acquire()
+
+    try:
+        # BEGIN IMMEDIATE: ambil write lock di awal → tidak ada
+        # "database is locked" saat upgrade read → write
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+
+        yield conn.cursor()
+
+        conn.commit()
+
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def connection():
+    # koneksi pool tanpa BEGIN (untuk VACUUM / PRAGMA di luar transaksi)
+    pool = get_pool()
+    conn = pool.acquire()
+
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
@@ -0,0 +1,109 @@
+import threading
+import time
+
+from database.db import connection
+
+
+VACUUM_STEP_PAGES = 256
+VACUUM_PAUSE_SECONDS = 0.05
+
+_vacuum_thread = None
+_vacuum_lock = threading.Lock()
+_vacuum_requested = threading.Event()
+
+
+# ======================
+# AUTO VACUUM MODE
+# DB baru: sudah INCREMENTAL dari PRAGMA koneksi (db.py)
+# DB lama: perlu satu kali VACUUM penuh (blocking) → aksi maintenance eksplisit,
+# tidak dijalankan otomatis saat startup
+# ======================
+INCREMENTAL = 2
+
+
+def auto_vacuum_mode():
+    with connection() as conn:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+
+def enable_incremental_vacuum():
+    # → True kalau DB dikonversi (VACUUM penuh dijalankan)
+    with connection() as conn:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == INCREMENTAL:
+            return False
+
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+
+    return True
+
+
+# ======================
+# BACKGROUND INCREMENTAL VACUUM
+# halaman kosong dikembalikan sedikit demi sedikit
+# → write lock hanya dipegang sebentar per langkah
+# ======================
+def _free_pages(conn):
+    return conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+def _vacuum_step(conn):
+    # 🔥 conn.execute hanya men-step statement sekali (= 1 halaman)
+    # executescript menjalankan PRAGMA sampai selesai (VACUUM_STEP_PAGES halaman)
+    conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES});")
+
+
+def _vacuum_worker():
+    while _vacuum_requested.is_set():
+        _vacuum_requested.clear()
+
+        with connection() as conn:
+            # auto_vacuum belum INCREMENTAL → incremental_vacuum tidak melakukan apa-apa
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != INCREMENTAL:
+                return
+
+            free = _free_pages(conn)
+
+            while free > 0:
+                _vacuum_step(conn)
+                time.sleep(VACUUM_PAUSE_SECONDS)
+
+                remaining = _free_pages(conn)
+
+                # tidak ada progress → berhenti (hindari loop tanpa akhir)
+                if remaining >= free:
+                    break
+
+                free = remaining
+
+            # kecilkan file WAL setelah halaman dipindah
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def _run_worker():
+    global _vacuum_thread
+
+    try:
+        _vacuum_worker()
+    finally:
+        with _vacuum_lock:
+            _vacuum_thread = None
+
+        # request yang masuk saat thread sedang selesai
+        if _vacuum_requested.is_set():
+            schedule_vacuum()
+
+
+def schedule_vacuum():
+    global _vacuum_thread
+
+    _vacuum_requested.set()
+
+    with _vacuum_lock:
+        if _vacuum_thread is None:
+            _vacuum_thread = threading.Thread(
+                target=_run_worker,
+                name="sqlite-incremental-vacuum",
+                daemon=True
+            )
+            _vacuum_thread.start()
@@ -0,0 +1,518 @@
+import json
+import pickle
+import threading
+
+from database.db import DB_PATH, transaction
+from database.artifacts import store_artifact, register_artifact
+
+
+# ======================
+# HELPERS
+# ======================
+def ensure_columns(cursor, table, columns):
+
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = [row[1] for row in cursor.fetchall()]
+
+    for name, col_type in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+
+
+def _write_frame(cursor, blob):
+    return register_artifact(cursor, store_artifact(pickle.loads(blob)))
+
+
+# ======================
+# 001: BASELINE SCHEMA
+# (tabel yang dulu dibuat ad-hoc di crud / training)
+# ======================
+def _baseline_schema(cursor):
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS projects (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS datasets (
+        project_id INTEGER PRIMARY KEY,
+        file_name TEXT,
+        data BLOB,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS preprocessing (
+        project_id INTEGER PRIMARY KEY,
+        target TEXT,
+        features TEXT,
+        imputation_rules TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS data_split (
+        project_id INTEGER PRIMARY KEY,
+        train_data BLOB,
+        test_data BLOB,
+        val_data BLOB,
+        method TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS binning (
+        project_id INTEGER PRIMARY KEY,
+        binning_rules TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS model_dataset (
+        project_id INTEGER PRIMARY KEY,
+        df_woe BLOB,
+        features TEXT,
+        source TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    ensure_columns(cursor, "model_dataset", {
+        "woe_result": "BLOB",
+        "coef_df": "BLOB",
+        "intercept": "REAL",
+        "woe_maps": "BLOB"
+    })
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS model_result (
+        project_id INTEGER PRIMARY KEY,
+        model BLOB,
+        features TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS model_calibrated (
+        project_id INTEGER PRIMARY KEY,
+        params BLOB,
+        features TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS model_rules (
+        project_id TEXT PRIMARY KEY,
+        rating_rules TEXT,
+        score_rules TEXT
+    )
+    """)
+
+
+# ======================
+# 002: ARTIFACT STORE
+# ======================
+def _artifact_store(cursor):
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS artifacts (
+        hash TEXT PRIMARY KEY,
+        format TEXT,
+        n_rows INTEGER,
+        n_cols INTEGER,
+        columns TEXT,
+        size_bytes INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS model_artifacts (
+        project_id INTEGER,
+        name TEXT,
+        artifact_hash TEXT,
+        value TEXT,
+        blob BLOB,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (project_id, name)
+    )
+    """)
+
+    ensure_columns(cursor, "datasets", {"data_hash": "TEXT"})
+
+    ensure_columns(cursor, "data_split", {
+        "train_hash": "TEXT",
+        "test_hash": "TEXT",
+        "val_hash": "TEXT"
+    })
+
+    ensure_columns(cursor, "model_dataset", {
+        "df_woe_hash": "TEXT",
+        "woe_result_hash": "TEXT",
+        "coef_df_hash": "TEXT"
+    })
+
+
+# ======================
+# 003: PICKLED BLOB → ARTIFACT STORE
+# ======================
+def _migrate_legacy_blobs(cursor):
+
+    # DATASETS
+    cursor.execute("""
+        SELECT project_id, data FROM datasets
+        WHERE data IS NOT NULL AND data_hash IS NULL
+    """)
+
+    for row in cursor.fetchall():
+        cursor.execute(
+            "UPDATE datasets SET data_hash = ?, data = NULL WHERE project_id = ?",
+            (_write_frame(cursor, row["data"]), row["project_id"])
+        )
+
+    # DATA SPLIT
+    for part in ("train", "test", "val"):
+        cursor.execute(f"""
+            SELECT project_id, {part}_data FROM data_split
+            WHERE {part}_data IS NOT NULL AND {part}_hash IS NULL
+        """)
+
+        for row in cursor.fetchall():
+            cursor.execute(
+                f"UPDATE data_split SET {part}_hash = ?, {part}_data = NULL WHERE project_id = ?",
+                (_write_frame(cursor, row[f"{part}_data"]), row["project_id"])
+            )
+
+    # MODEL DATASET → MODEL ARTIFACTS
+    cursor.execute("SELECT * FROM model_dataset")
+
+    for row in cursor.fetchall():
+
+        artifacts = {}
+
+        for name in ("df_woe", "woe_result", "coef_df"):
+            if row[f"{name}_hash"]:
+                artifacts[name] = (row[f"{name}_hash"], None, None)
+            elif row[name]:
+                artifacts[name] = (_write_frame(cursor, row[name]), None, None)
+
+        if row["features"]:
+            artifacts["features"] = (None, row["features"], None)
+
+        if row["intercept"] is not None:
+            artifacts["intercept"] = (None, json.dumps(row["intercept"]), None)
+
+        if row["source"]:
+            artifacts["source"] = (None, json.dumps(row["source"]), None)
+
+        if row["woe_maps"]:
+            artifacts["woe_maps"] = (None, None, row["woe_maps"])
+
+        for name, (artifact_hash, value, blob) in artifacts.items():
+            # artifact baru (model_artifacts) menang atas data lama
+            cursor.execute("""
+                INSERT OR IGNORE INTO model_artifacts
+                (project_id, name, artifact_hash, value, blob)
+                VALUES (?, ?, ?, ?, ?)
+            """, (row["project_id"], name, artifact_hash, value, blob))
+
+    cursor.execute("DELETE FROM model_dataset")
+
+
+# ======================
+# 004: INDEXES
+# project_id sudah PRIMARY KEY (atau kolom pertama PK) di semua tabel
+# project-scoped → index tambahan hanya untuk query list project
+# ======================
+def _indexes(cursor):
+
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_projects_created_at
+    ON projects (created_at)
+    """)
+
+
+# ======================
+# 005: ARTIFACT REFCOUNT
+# refcount dijaga trigger di setiap kolom yang mereferensikan artifact
+# ======================
+ARTIFACT_REFERENCES = [
+    ("datasets", "data_hash"),
+    ("data_split", "train_hash"),
+    ("data_split", "test_hash"),
+    ("data_split", "val_hash"),
+    ("model_artifacts", "artifact_hash"),
+]
+
+
+def create_ref_triggers(cursor, table, column):
+    name = f"trg_{table}_{column}"
+
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS {name}_ins
+    AFTER INSERT ON {table}
+    WHEN NEW.{column} IS NOT NULL
+    BEGIN
+        UPDATE artifacts SET refcount = refcount + 1 WHERE hash = NEW.{column};
+    END
+    """)
+
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS {name}_del
+    AFTER DELETE ON {table}
+    WHEN OLD.{column} IS NOT NULL
+    BEGIN
+        UPDATE artifacts SET refcount = refcount - 1 WHERE hash = OLD.{column};
+    END
+    """)
+
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS {name}_upd
+    AFTER UPDATE OF {column} ON {table}
+    WHEN OLD.{column} IS NOT NEW.{column}
+    BEGIN
+        UPDATE artifacts SET refcount = refcount - 1 WHERE hash = OLD.{column};
+        UPDATE artifacts SET refcount = refcount + 1 WHERE hash = NEW.{column};
+    END
+    """)
+
+
+def recount_artifact_refs(cursor):
+    references = " UNION ALL ".join(
+        f"SELECT {column} AS hash FROM {table} WHERE {column} IS NOT NULL"
+        for table, column in ARTIFACT_REFERENCES
+    )
+
+    cursor.execute(f"""
+        UPDATE artifacts SET refcount = (
+            SELECT COUNT(*) FROM ({references}) refs
+            WHERE refs.hash = artifacts.hash
+        )
+    """)
+
+
+def _artifact_refcount(cursor):
+
+    ensure_columns(cursor, "artifacts", {"refcount": "INTEGER NOT NULL DEFAULT 0"})
+
+    # hitung ulang dari referensi yang sudah ada
+    recount_artifact_refs(cursor)
+
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_artifacts_refcount
+    ON artifacts (refcount)
+    """)
+
+    for table, column in ARTIFACT_REFERENCES:
+        create_ref_triggers(cursor, table, column)
+
+
+# ======================
+# 006: FOREIGN KEY → projects(id) ON DELETE CASCADE
+# SQLite tidak bisa ADD CONSTRAINT → tabel dibangun ulang
+# ======================
+PROJECT_TABLES = [
+    "datasets",
+    "preprocessing",
+    "data_split",
+    "binning",
+    "model_dataset",
+    "model_artifacts",
+    "model_result",
+    "model_calibrated",
+    "model_rules",
+]
+
+
+def _rebuild_with_project_fk(cursor, table):
+
+    cursor.execute(f"PRAGMA table_info({table})")
+    info = cursor.fetchall()
+
+    column_defs = []
+    pk_columns = [row["name"] for row in sorted(info, key=lambda r: r["pk"]) if row["pk"]]
+    select_columns = []
+
+    for row in info:
+        name = row["name"]
+
+        if name == "project_id":
+            column_defs.append(
+                "project_id INTEGER NOT NULL "
+                "REFERENCES projects(id) ON DELETE CASCADE"
+            )
+            select_columns.append("CAST(project_id AS INTEGER)")
+            continue
+
+        col_def = f"{name} {row['type']}"
+
+        if row["notnull"]:
+            col_def += " NOT NULL"
+
+        if row["dflt_value"] is not None:
+            col_def += f" DEFAULT {row['dflt_value']}"
+
+        column_defs.append(col_def)
+        select_columns.append(name)
+
+    column_defs.append(f"PRIMARY KEY ({', '.join(pk_columns)})")
+
+    cursor.execute(f"CREATE TABLE {table}_new ({', '.join(column_defs)})")
+
+    # baris yatim (project sudah dihapus) tidak ikut dipindah
+    cursor.execute(f"""
+        INSERT INTO {table}_new ({', '.join(row["name"] for row in info)})
+        SELECT {', '.join(select_columns)} FROM {table}
+        WHERE CAST(project_id AS INTEGER) IN (SELECT id FROM projects)
+    """)
+
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
+def _project_foreign_keys(cursor):
+
+    for table in PROJECT_TABLES:
+        _rebuild_with_project_fk(cursor, table)
+
+    # trigger ikut ter-drop bersama tabel lama
+    for table, column in ARTIFACT_REFERENCES:
+        create_ref_triggers(cursor, table, column)
+
+    recount_artifact_refs(cursor)
+
+
+# ======================
+# 007: STAGE CACHE
+# hasil stage pipeline, key = hash input upstream
+# ======================
+def _stage_cache(cursor):
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS stage_cache (
+        project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+        stage TEXT NOT NULL,
+        cache_key TEXT NOT NULL,
+        artifact_hash TEXT,
+        value TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (project_id, stage, cache_key)
+    )
+    """)
+
+    create_ref_triggers(cursor, "stage_cache", "artifact_hash")
+
+
+# ======================
+# 008: PIPELINE STATUS
+# status + parameter terakhir per stage
+# ======================
+STAGE_OUTPUTS = [
+    ("input", "SELECT project_id FROM datasets"),
+    ("preprocessing", "SELECT project_id FROM preprocessing"),
+    ("split", "SELECT project_id FROM data_split"),
+    ("binning", "SELECT project_id FROM binning"),
+    ("woe", "SELECT project_id FROM model_artifacts WHERE name = 'woe_result'"),
+    ("vif", "SELECT project_id FROM model_artifacts WHERE name = 'df_woe'"),
+    ("smote", "SELECT project_id FROM model_artifacts WHERE name = 'source'"),
+    ("training", "SELECT project_id FROM model_artifacts WHERE name = 'coef_df'"),
+    ("performance", "SELECT project_id FROM model_rules"),
+]
+
+
+def _pipeline_status(cursor):
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pipeline_status (
+        project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+        stage TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        params TEXT,
+        error TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (project_id, stage)
+    )
+    """)
+
+    # project lama: stage yang sudah punya output dianggap done
+    for stage, query in STAGE_OUTPUTS:
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO pipeline_status (project_id, stage, status)
+            SELECT DISTINCT project_id, ?, 'done' FROM ({query})
+        """, (stage,))
+
+
+# ======================
+# 009: PRE-SELECTION STAGE
+# ======================
+def _preselection_stage(cursor):
+    # stage baru di antara WOE dan VIF → project lama tidak ter-blokir
+    cursor.execute("""
+        INSERT OR IGNORE INTO pipeline_status (project_id, stage, status)
+        SELECT project_id, 'preselection', status FROM pipeline_status
+        WHERE stage = 'woe' AND status IN ('done', 'stale')
+    """)
+
+
+MIGRATIONS = [
+    (1, _baseline_schema),
+    (2, _artifact_store),
+    (3, _migrate_legacy_blobs),
+    (4, _indexes),
+    (5, _artifact_refcount),
+    (6, _project_foreign_keys),
+    (7, _stage_cache),
+    (8, _pipeline_status),
+    (9, _preselection_stage),
+]
+
+
+# ======================
+# RUNNER
+# ======================
+_migrated = set()
+_lock = threading.Lock()
+
+
+def schema_version(cursor):
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+
+def run_migrations():
+    db_key = str(DB_PATH.resolve())
+
+    with _lock:
+        # sekali per process
+        if db_key in _migrated:
+            return
+
+        with transaction() as cursor:
+            version = schema_version(cursor)
+
+        latest = MIGRATIONS[-1][0]
+
+        if version < latest:
+            with transaction(write=True) as cursor:
+                # cek ulang di dalam write lock (process lain bisa lebih dulu)
+                version = schema_version(cursor)
+
+                for target_version, migrate in MIGRATIONS:
+                    if target_version > version:
+                        migrate(cursor)
+                        cursor.execute(f"PRAGMA user_version = {target_version}")
+
+        # auto_vacuum: DB baru langsung INCREMENTAL (PRAGMA koneksi);
+        # DB lama dikonversi lewat aksi maintenance (VACUUM penuh, tidak saat startup)
+
+        _migrated.add(db_key)
@@ -0,0 +1,86 @@
+import json
+
+from database.db import transaction
+from pipeline.dag import downstream_of
+
+
+# ======================
+# STAGE STATUS
+# pending → done → stale (upstream berubah) / failed
+# ======================
+def set_stage_status(cursor, project_id, stage, status, error=None):
+    cursor.execute("""
+        INSERT INTO pipeline_status (project_id, stage, status, error)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(project_id, stage) DO UPDATE SET
+            status=excluded.status,
+            error=excluded.error,
+            updated_at=CURRENT_TIMESTAMP
+    """, (project_id, stage, status, error))
+
+
+def complete_stage(cursor, project_id, stage, changed=True):
+    set_stage_status(cursor, project_id, stage, "done")
+
+    # 🔥 INVALIDATION: hasil turunan dihitung dari input lama
+    # (output sama persis → turunan tetap valid)
+    downstream = downstream_of(stage) if changed else []
+
+    if downstream:
+        placeholders = ", ".join("?" for _ in downstream)
+
+        cursor.execute(f"""
+            UPDATE pipeline_status
+            SET status = 'stale', updated_at = CURRENT_TIMESTAMP
+            WHERE project_id = ? AND status = 'done'
+            AND stage IN ({placeholders})
+        """, (project_id, *downstream))
+
+
+def load_pipeline_status(project_id):
+    with transaction() as cursor:
+        cursor.execute("""
+            SELECT stage, status, error, updated_at FROM pipeline_status
+            WHERE project_id = ?
+        """, (project_id,))
+
+        rows = cursor.fetchall()
+
+    return {row["stage"]: dict(row) for row in rows}
+
+
+def mark_stage(project_id, stage, status, error=None):
+    with transaction(write=True) as cursor:
+        if status == "done":
+            complete_stage(cursor, project_id, stage)
+        else:
+            set_stage_status(cursor, project_id, stage, status, error)
+
+
+# ======================
+# STAGE PARAMS
+# parameter UI terakhir → dipakai ulang oleh runner headless
+# ======================
+def save_stage_params(project_id, stage, params):
+    with transaction(write=True) as cursor:
+        cursor.execute("""
+            INSERT INTO pipeline_status (project_id, stage, params)
+            VALUES (?, ?, ?)
+            ON CONFLICT(project_id, stage) DO UPDATE SET
+                params=excluded.params
+        """, (project_id, stage, json.dumps(params, default=str)))
+
+
+def load_stage_params(project_id, stage):
+    with transaction() as cursor:
+        cursor.execute("""
+            SELECT params FROM pipeline_status
+            WHERE project_id = ? AND stage = ?
+        """, (project_id, stage))
+
+        row = cursor.fetchone()
+
+    if row is None or row["params"] is None:
+        return {}
+
+    return json.loads(row["params"])
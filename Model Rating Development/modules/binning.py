@@ -3,14 +3,19 @@ import pandas as pd
 import numpy as np
 
 from database.crud import load_split, load_preprocessing, save_binning, load_binning
+from utils.helpers import required_columns
 from utils.binning import (
     create_numeric_bins,
     create_categorical_bins,
     calculate_bin_stats,
     create_manual_categorical_bins,
     create_manual_numeric_bins,
-    create_optimal_bins
+    create_optimal_bins,
+    quantile_edges,
+    auto_bin_features,
+    sketch_bin_features
 )
+from utils.transform import apply_transformation
 
 # ======================
 # HELPER: SORT NUMERIC BIN
@@ -45,10 +50,17 @@ def run(project_id):
     # ======================
     # LOAD DATA
     # ======================
-    split = load_split(project_id)
     config = load_preprocessing(project_id)
     saved_rules = load_binning(project_id)
 
+    split = None
+    if config is not None:
+        split = load_split(
+            project_id,
+            parts=("train",),
+            columns=required_columns(config)
+        )
+
     if split is None or config is None:
         st.warning("Complete previous steps first")
         return
@@ -75,6 +87,146 @@ def run(project_id):
 
     st.success(f"Using TRAIN data: {df.shape}")
 
+    # ======================
+    # ⚡ AUTO-BIN ALL FEATURES (PARALLEL)
+    # ======================
+    with st.expander("⚡ Auto-bin all numeric features (optbinning)"):
+
+        c1, c2, c3, c4 = st.columns(4)
+
+        auto_monotonic = c1.selectbox(
+            "Monotonic Trend",
+            ["auto", "ascending", "descending"],
+            key="auto_bin_mono"
+        )
+
+        time_limit = c2.number_input(
+            "Time limit per feature (s)",
+            min_value=5,
+            max_value=600,
+            value=60,
+            key="auto_bin_time_limit"
+        )
+
+        # sketch: full train di-stream per chunk (pre-binning GK sketch)
+        auto_source = c3.selectbox(
+            "Fit on",
+            ["Sample (exact)", "Full train (sketch)"],
+            key="auto_bin_source"
+        )
+
+        auto_sample = c4.number_input(
+            "Sample size",
+            min_value=1000,
+            value=min(len(df), 100_000),
+            step=1000,
+            disabled=auto_source != "Sample (exact)",
+            key="auto_bin_sample"
+        )
+
+        numeric_features = [
+            col for col in selected_features
+            if pd.to_numeric(df[col], errors="coerce").notna().sum() > 0.8 * len(df)
+        ]
+
+        st.caption(f"{len(numeric_features)} numeric features")
+
+        if st.button("🚀 Auto-bin", key="auto_bin_run"):
+
+            # transform tersimpan ikut dipakai (split di skala yang sama saat apply)
+            transforms = {
+                col: {"type": "numeric", "transform": saved_rules.get(col, {}).get("transform", {"type": "none"})}
+                for col in numeric_features
+            }
+
+            separate_missing = {
+                col: imputation_rules.get(col, {}).get("method") == "separate_missing"
+                for col in numeric_features
+            }
+
+            progress = st.progress(0.0)
+            done = []
+
+            def on_result(result):
+                done.append(result)
+                progress.progress(len(done) / len(numeric_features))
+
+            results = None
+
+            if auto_source == "Full train (sketch)":
+                train_handle = load_split(project_id, parts=())["train"]
+
+                chunks = (
+                    apply_transformation(chunk, transforms)
+                    for chunk in train_handle.iter_chunks(columns=numeric_features + [target])
+                )
+
+                try:
+                    results = sketch_bin_features(
+                        chunks,
+                        target,
+                        numeric_features,
+                        monotonic_trend=auto_monotonic,
+                        separate_missing=separate_missing,
+                        time_limit=int(time_limit),
+                        on_result=on_result
+                    )
+
+                # 🔥 OptimalBinningSketch butuh pympler → fallback ke sample
+                except ImportError as e:
+                    st.warning(f"Sketch binning unavailable ({e}) — falling back to Sample (exact)")
+
+            if results is None:
+                df_auto = df.sample(min(len(df), int(auto_sample)), random_state=42)
+                df_auto = apply_transformation(df_auto, transforms)
+
+                results = auto_bin_features(
+                    df_auto,
+                    target,
+                    numeric_features,
+                    monotonic_trend=auto_monotonic,
+                    separate_missing=separate_missing,
+                    time_limit=int(time_limit),
+                    on_result=on_result
+                )
+
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "feature": r["feature"],
+                        "n_bins": len(r["splits"]) + 1 if r["splits"] is not None else None,
+                        "status": r["status"],
+                        "seconds": round(r["seconds"], 2),
+                        "error": r["error"]
+                    }
+                    for r in results
+                ]),
+                width='stretch'
+            )
+
+            # ======================
+            # PERSIST SPLITS
+            # ======================
+            auto_rules = dict(saved_rules)
+
+            for r in results:
+                if r["splits"] is None:
+                    continue
+
+                auto_rules[r["feature"]] = {
+                    "type": "numeric",
+                    "mode": "optimal",
+                    "splits": r["splits"],
+                    "monotonic_trend": auto_monotonic,
+                    "transform": transforms[r["feature"]]["transform"],
+                    "separate_missing": imputation_rules.get(r["feature"], {}).get("method") == "separate_missing"
+                }
+
+            save_binning(project_id, auto_rules)
+            saved_rules = auto_rules
+
+            st.success(f"Splits saved for {sum(r['splits'] is not None for r in results)} features")
+
     binning_rules = {}
 
     # ======================
@@ -166,7 +318,10 @@ def run(project_id):
                     key=f"{col}_bins"
                 )
 
-                bins = create_numeric_bins(col_data_numeric, n_bins, separate_missing=missing_as_bin)
+                # 🔥 FIT: edge quantile dari train disimpan di rules
+                edges = quantile_edges(col_data_numeric, n_bins)
+
+                bins = create_manual_numeric_bins(col_data_numeric, edges, separate_missing=missing_as_bin)
 
             else:
                 bins = create_categorical_bins(df[col], separate_missing=missing_as_bin)
@@ -182,34 +337,57 @@ def run(project_id):
 
             st.write("### ⚙️ Optbinning Settings")
 
+            saved = saved_rules.get(col, {})
+
             monotonic = st.selectbox(
                 f"Monotonic Trend for {col}",
                 ["auto", "ascending", "descending"],
+                index=["auto", "ascending", "descending"].index(saved.get("monotonic_trend", "auto")),
                 key=f"{col}_mono"
             )
 
-            sample_size = min(len(df), 5000)
-            df_sample = df.sample(sample_size, random_state=42)
+            # split tersimpan (mis. hasil auto-bin) dipakai ulang → tidak fit ulang tiap rerun
+            reuse = (
+                saved.get("mode") == "optimal"
+                and saved.get("monotonic_trend", monotonic) == monotonic
+                and not st.checkbox(f"Refit {col}", key=f"{col}_refit")
+            )
 
-            with st.spinner(f"Running optimal binning for {col}..."):
-                try:
-                    bins, optb_model = create_optimal_bins(
-                        df_sample[col],
-                        df_sample[target],
-                        monotonic_trend=monotonic,
-                        separate_missing=missing_as_bin
-                    )
+            if reuse:
+                splits = saved["splits"]
+                bins = create_manual_numeric_bins(col_data_numeric, splits, separate_missing=missing_as_bin)
+
+                st.caption("Using saved splits")
+                st.write("### Bin Splits")
+                st.write(splits)
+
+            else:
+                sample_size = min(len(df), 5000)
+                df_sample = df.sample(sample_size, random_state=42)
+
+                with st.spinner(f"Running optimal binning for {col}..."):
+                    try:
+                        bins, optb_model = create_optimal_bins(
+                            df_sample[col],
+                            df_sample[target],
+                            monotonic_trend=monotonic,
+                            separate_missing=missing_as_bin
+                        )
+
+                        splits = optb_model.splits.tolist()
 
-                    st.success("Optimal binning created")
-                    st.caption(f"Using sample size: {sample_size}")
+                        st.success("Optimal binning created")
+                        st.caption(f"Using sample size: {sample_size}")
 
-                    st.write("### Bin Splits")
-                    st.write(optb_model.splits)
+                        st.write("### Bin Splits")
+                        st.write(optb_model.splits)
 
-                except Exception as e:
-                    st.error(f"Optbinning failed: {e}")
-                    st.warning("Fallback to quantile binning")
-                    bins = create_numeric_bins(col_data_numeric, 5, separate_missing=missing_as_bin)
+                    except Exception as e:
+                        st.error(f"Optbinning failed: {e}")
+                        st.warning("Fallback to quantile binning")
+                        splits = None
+                        edges = quantile_edges(col_data_numeric, 5)
+                        bins = create_manual_numeric_bins(col_data_numeric, edges, separate_missing=missing_as_bin)
 
         # ======================
         # MANUAL BINNING
@@ -344,6 +522,18 @@ def run(project_id):
                     "type": "numeric",
                     "mode": "quantile",
                     "n_bins": n_bins,
+                    "edges": edges,
+                    "transform": transform,
+                    "separate_missing": missing_as_bin
+                }
+
+            elif mode == "Optimal (optbinning)" and splits is None:
+                # optbinning gagal → fallback quantile
+                binning_rules[col] = {
+                    "type": "numeric",
+                    "mode": "quantile",
+                    "n_bins": 5,
+                    "edges": edges,
                     "transform": transform,
                     "separate_missing": missing_as_bin
                 }
@@ -352,7 +542,8 @@ def run(project_id):
                 binning_rules[col] = {
                     "type": "numeric",
                     "mode": "optimal",
-                    "splits": optb_model.splits.tolist(),
+                    "splits": splits,
+                    "monotonic_trend": monotonic,
                     "transform": transform,
                     "separate_missing": missing_as_bin
                 }
@@ -1,7 +1,24 @@
 import streamlit as st
 import pandas as pd
 
-from database.crud import save_dataset, load_dataset
+from database.crud import save_dataset, save_dataset_chunks, load_dataset
+from database.status import save_stage_params
+from utils.helpers import apply_type_conversion, csv_dtypes
+
+CSV_CHUNK_ROWS = 100_000
+
+
+# ======================
+# TYPE CONVERSION
+# ======================
+def convert_types(df, edited_types):
+    type_map = dict(zip(edited_types["Column"], edited_types["New Type"]))
+
+    return apply_type_conversion(
+        df,
+        type_map,
+        on_error=lambda col, e: st.error(f"Error converting {col}: {e}")
+    )
 
 
 def run(project_id):
@@ -43,6 +60,7 @@ def run(project_id):
             # 🔥 RESET SESSION (IMPORTANT)
             st.session_state.pop("converted_df", None)
             st.session_state.pop("type_config", None)
+            st.session_state.pop("applied_type_config", None)
 
             try:
                 # ======================
@@ -110,47 +128,10 @@ def run(project_id):
                 # ======================
                 if st.button("⚙️ Apply Type Conversion"):
 
-                    df_converted = df.copy()
-                    edited_types = st.session_state["type_config"]
-
-                    for _, row in edited_types.iterrows():
-                        col = row["Column"]
-                        new_type = row["New Type"]
-
-                        try:
-                            # NUMERIC
-                            if new_type == "numeric":
-                                df_converted[col] = (
-                                    df_converted[col]
-                                    .astype(str)
-                                    .str.replace(",", "")
-                                    .str.strip()
-                                )
-                                df_converted[col] = pd.to_numeric(
-                                    df_converted[col],
-                                    errors='coerce'
-                                )
-
-                            # DATETIME
-                            elif new_type == "datetime":
-                                df_converted[col] = pd.to_datetime(
-                                    df_converted[col],
-                                    errors='coerce',
-                                    dayfirst=True
-                                )
-
-                            # CATEGORICAL
-                            elif new_type == "categorical":
-                                df_converted[col] = df_converted[col].astype("category")
-
-                            # STRING
-                            elif new_type == "string":
-                                df_converted[col] = df_converted[col].astype(str)
-
-                        except Exception as e:
-                            st.error(f"Error converting {col}: {e}")
+                    df_converted = convert_types(df, st.session_state["type_config"])
 
                     st.session_state["converted_df"] = df_converted
+                    st.session_state["applied_type_config"] = st.session_state["type_config"]
 
                     st.success("Conversion applied")
 
@@ -181,9 +162,35 @@ def run(project_id):
                 # ======================
                 if st.button("💾 Save Dataset"):
 
-                    final_df = st.session_state.get("converted_df", df)
+                    # type config dipakai ulang saat pipeline di-run headless
+                    type_map = {}
+                    if "converted_df" in st.session_state:
+                        applied = st.session_state["applied_type_config"]
+                        type_map = dict(zip(applied["Column"], applied["New Type"]))
+
+                    if uploaded_file.name.endswith(".csv"):
+                        # 🔥 STREAMING SAVE: baca ulang CSV per chunk
+                        # (dtype dikunci dari hasil baca penuh) → row group parquet
+                        uploaded_file.seek(0)
+
+                        chunks = pd.read_csv(
+                            uploaded_file,
+                            chunksize=CSV_CHUNK_ROWS,
+                            dtype=csv_dtypes(df)
+                        )
+
+                        if "converted_df" in st.session_state:
+                            edited_types = st.session_state["applied_type_config"]
+                            chunks = (convert_types(chunk, edited_types) for chunk in chunks)
+
+                        save_dataset_chunks(project_id, chunks, uploaded_file.name)
+
+                    else:
+                        final_df = st.session_state.get("converted_df", df)
+
+                        save_dataset(project_id, final_df, uploaded_file.name)
 
-                    save_dataset(project_id, final_df, uploaded_file.name)
+                    save_stage_params(project_id, "input", {"type_map": type_map})
 
                     st.success("Dataset saved with updated types!")
 
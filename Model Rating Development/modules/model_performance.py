@@ -1,14 +1,12 @@
 import streamlit as st
-import statsmodels.api as sm
 import pandas as pd
 import numpy as np
-import pickle
-import json
-import ast
 import matplotlib.pyplot as plt
 
-from utils.binning import apply_binning
-from utils.transform import apply_transformation
+from utils.helpers import required_columns
+from utils.metrics import discrimination_metrics, metrics_ci_table, comparison_table
+from utils.rating import assign_rules, validate_rules
+from pipeline.scoring import Scorer, score_partitions, REFERENCE_SCORE, REFERENCE_ODDS, PDO
 
 from database.crud import (
     load_split,
@@ -16,108 +14,9 @@ from database.crud import (
     load_model_dataset,
     load_binning,
     load_model_rules, 
-    save_model_rules
+    save_model_rules,
+    load_model
 )
-from database.db import get_connection
-
-
-# ======================
-# SAFE PARSER
-# ======================
-def parse_features(raw):
-    if raw is None:
-        return None
-    try:
-        return json.loads(raw)
-    except:
-        return ast.literal_eval(raw)
-
-
-# ======================
-# ALIGN FEATURES
-# ======================
-def align_features(X, feature_list):
-    X = X.copy()
-
-    for col in feature_list:
-        if col not in X.columns:
-            X[col] = 0
-
-    X = X[feature_list]
-    return X
-
-
-def prepare_exog(X, feature_list):
-    if "const" in feature_list:
-        cols = [c for c in feature_list if c != "const"]
-        X = align_features(X, cols)
-        X = sm.add_constant(X, has_constant='add')
-    else:
-        X = align_features(X, feature_list)
-
-    X = X[feature_list]
-    return X
-
-
-# ======================
-# APPLY WOE
-# ======================
-def apply_woe_from_result(df, woe_result):
-    df = df.copy()
-
-    for var in woe_result['variabel'].unique():
-        mapping = (
-            woe_result[woe_result["variabel"] == var]
-            .set_index("kategori")["woe"]
-        )
-
-        missing_woe = mapping.get("Missing", 0)
-
-        df[var] = df[var].map(mapping)
-        df[var] = df[var].fillna(missing_woe)
-
-    return df
-
-
-# ======================
-# LOAD MODEL
-# ======================
-def load_model(project_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT model, features
-        FROM model_result
-        WHERE project_id = ?
-    """, (project_id,))
-
-    row = cursor.fetchone()
-    conn.close()
-
-    if row is None:
-        return None, None
-
-    return pickle.loads(row[0]), parse_features(row[1])
-
-
-def load_calibrated_model(project_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT params, features
-        FROM model_calibrated
-        WHERE project_id = ?
-    """, (project_id,))
-
-    row = cursor.fetchone()
-    conn.close()
-
-    if row is None:
-        return None, None
-
-    return pickle.loads(row[0]), parse_features(row[1])
 
 
 # ======================
@@ -321,47 +220,73 @@ def build_performance_table_score(df_perf, group_col, rules):
 
     return grouped
 
+
 # ======================
-# SCORE FUNCTION
+# COMPARISON MODE
+# Train / Test / Validation × Original / Calibrated dalam satu pass
 # ======================
-def get_score(df, df_scorecard, intercept_score):
-    df_score = df.copy()
+def run_comparison(project_id, config, binning_rules):
 
-    for var in df_scorecard['variabel'].unique():
-        score_map = df_scorecard[
-            df_scorecard['variabel'] == var
-        ].set_index('kategori')['Score']
+    st.caption("Score is a monotone transform of the Original PD → same KS / AUROC / Gini")
 
-        missing_score = score_map.get("Missing", 0)
+    if st.button("🔁 Run Comparison"):
 
-        df_score[var + "_Score"] = (
-            df_score[var]
-            .map(score_map)
-            .fillna(missing_score)
-        )
+        try:
+            scored = score_partitions(
+                project_id,
+                config["target"],
+                columns=required_columns(config, binning_rules)
+            )
+        except ValueError as e:
+            st.warning(str(e))
+            return
+
+        st.session_state["comparison"] = (project_id, comparison_table(scored))
+
+    if st.session_state.get("comparison", (None,))[0] != project_id:
+        return
+
+    table = st.session_state["comparison"][1]
+
+    if table.empty:
+        st.warning("No dataset to compare")
+        return
+
+    # ======================
+    # SIDE BY SIDE
+    # ======================
+    st.subheader("📊 Discrimination per Dataset")
 
-    score_cols = [c for c in df_score.columns if c.endswith('_Score')]
+    # urutan kolom ikut urutan partisi (Train → Test → Validation)
+    datasets = list(dict.fromkeys(table["dataset"]))
 
-    df_score["Score_total"] = (
-        df_score[score_cols].sum(axis=1)
-        + intercept_score
+    side = table.pivot(index="model", columns="dataset", values=["ks", "auroc", "gini"])
+    side = side.reindex(
+        index=list(dict.fromkeys(table["model"])),
+        columns=pd.MultiIndex.from_product([["ks", "auroc", "gini"], datasets])
     )
 
-    return df_score
+    st.dataframe(side.style.format("{:.4f}"), width="stretch")
 
+    # ======================
+    # STABILITY DELTAS (VS TRAIN)
+    # ======================
+    st.subheader("📉 Stability vs Train")
 
-# ======================
-# HELPER: MANUAL MAPPING (IMPORTANT)
-# ======================
-def map_with_rules(x, rules):
-    for i, (name, low, high) in enumerate(rules):
-        if i == len(rules) - 1:
-            if low <= x <= high:
-                return name
-        else:
-            if low <= x < high:
-                return name
-    return "Unknown"
+    st.dataframe(
+        table.style.format({
+            "bad_rate": "{:.4%}",
+            "mean_pd": "{:.4%}",
+            "ks": "{:.4f}",
+            "auroc": "{:.4f}",
+            "gini": "{:.4f}",
+            "psi": "{:.4f}",
+            "delta_ks": "{:+.4f}",
+            "delta_gini": "{:+.4f}",
+            "gini_change_pct": "{:+.2%}"
+        }, na_rep="-"),
+        width="stretch"
+    )
 
 
 # ======================
@@ -392,9 +317,12 @@ def run(project_id):
         
     st.header("📊 Model Performance")
 
-    split = load_split(project_id)
+    split = load_split(project_id, parts=())
     config = load_preprocessing(project_id)
-    model_data = load_model_dataset(project_id)
+    model_data = load_model_dataset(
+        project_id,
+        artifacts=("features", "woe_result")
+    )
     binning_rules = load_binning(project_id)
 
     if split is None or config is None or model_data is None:
@@ -403,14 +331,7 @@ def run(project_id):
 
     target = config["target"]
 
-    df_train = split["train"]
-    df_test = split["test"]
-    df_val = split.get("val")
-
-    features = model_data["features"]
-
     model, _ = load_model(project_id)
-    calibrated_params, calibrated_features = load_calibrated_model(project_id)
 
     if model is None:
         st.warning("Train model first")
@@ -421,6 +342,12 @@ def run(project_id):
     # ======================
     st.subheader("⚙️ Setup")
 
+    mode = st.radio("Mode", ["Single dataset", "Compare all datasets"], horizontal=True)
+
+    if mode == "Compare all datasets":
+        run_comparison(project_id, config, binning_rules)
+        return
+
     col1, col2, col3 = st.columns(3)
 
     with col1:
@@ -435,46 +362,31 @@ def run(project_id):
     # ======================
     # DATA
     # ======================
-    if dataset_type == "Train":
-        df_raw = df_train.copy()
-        y_true = df_train[target]
-    elif dataset_type == "Test":
-        df_raw = df_test.copy()
-        y_true = df_test[target]
-    else:
-        if df_val is None:
-            st.warning("No validation data available")
-            return
-        df_raw = df_val.copy()
-        y_true = df_val[target]
-
-    df_binned = apply_binning(
-        apply_transformation(df_raw.copy(), binning_rules),
-        binning_rules
-    )
+    part = {"Train": "train", "Test": "test", "Validation": "val"}[dataset_type]
 
-    woe_result = model_data["woe_result"]
-    woe_result["kategori"] = woe_result["kategori"].astype(str)
-    df_binned = df_binned.astype(str)
+    if split[part] is None:
+        st.warning("No validation data available")
+        return
 
-    df_model = apply_woe_from_result(df_binned, woe_result)
-    # 🔥 pastikan tidak ada NaN
-    df_model = df_model.fillna(0)
-    X = df_model[features].copy()
-    X = X.fillna(0)
+    # 🔥 hanya partisi & kolom yang dipakai yang di-load
+    df_raw = load_split(
+        project_id,
+        parts=(part,),
+        columns=required_columns(config, binning_rules)
+    )[part]
+    y_true = df_raw[target]
 
     # ======================
-    # PREDICT
+    # PREDICT (SCORER HEADLESS)
+    # binning → WOE → PD / score sama persis dengan batch scoring
     # ======================
-    if model_type == "Original":
-        cols = model.model.exog_names
-        X_model = prepare_exog(X, cols)
-        y_prob = model.predict(X_model)
-    else:
-        cols = calibrated_features
-        X_model = prepare_exog(X, cols)
-        linear = np.dot(X_model.values, calibrated_params)
-        y_prob = 1 / (1 + np.exp(-linear))
+    try:
+        scorer = Scorer.from_project(project_id, calibrated=model_type == "Calibrated")
+    except ValueError as e:
+        st.warning(str(e))
+        return
+
+    y_prob = scorer.predict_pd(df_raw)
 
     # ======================
     # RATING
@@ -540,6 +452,10 @@ def run(project_id):
 
                 st.rerun()
 
+        # 🔥 gap / overlap → nilai jatuh ke "Unknown"
+        for issue in validate_rules(rating_rules):
+            st.warning(f"Rating rules: {issue}")
+
         # simpan kembali
         st.session_state["rating_rules"] = rating_rules
 
@@ -565,7 +481,7 @@ def run(project_id):
         df_perf["cum_portion"] = df_perf["freq_cum"] / total
         df_perf["cum_bad"] = df_perf["freq_bad_cum"] / total_bad
 
-        df_perf["rating"] = df_perf["prob"].apply(lambda x: map_with_rules(x, rating_rules))
+        df_perf["rating"] = assign_rules(df_perf["prob"], rating_rules)
 
         st.dataframe(df_perf.style.format({"prob": "{:.10f}"}))
 
@@ -577,25 +493,13 @@ def run(project_id):
         st.subheader("📋 Scorecard Table (Per Bin)")
 
         woe_result = model_data["woe_result"]
-        coef_df = model_data["coef_df"]
-        intercept = model_data["intercept"]
 
-        BaseScore = 600
-        ReferenceScore = 600
-        PDO = 50
-        ReferenceOdds = 50
-
-        Factor = PDO / np.log(2)
-
-        Offset = (
-            ReferenceScore
-            - Factor * np.log(ReferenceOdds)
-        )
+        BaseScore = REFERENCE_SCORE
+        ReferenceOdds = REFERENCE_ODDS
 
-        InterceptScore = (
-            Offset
-            - Factor * intercept
-        )        
+        Factor = scorer.factor
+        Offset = scorer.offset
+        InterceptScore = scorer.intercept_score
 
         st.info(f"""
         ### Scorecard Configuration
@@ -608,15 +512,8 @@ def run(project_id):
         - Intercept Score : {InterceptScore:.4f}
         """)
 
-        df_score = woe_result.merge(
-            coef_df,
-            left_on='variabel',
-            right_on='index'
-        )
-
         # 🔥 BIN-LEVEL SCALING
-        df_score['Score'] = - Factor * df_score['Coefficient_final'] * df_score['woe']
-        df_score = df_score.dropna()
+        df_score = scorer.scorecard(woe_result)
 
         st.dataframe(
             df_score[['variabel','kategori','woe','Coefficient_final','Score']]
@@ -624,7 +521,7 @@ def run(project_id):
             width='stretch'
         )
 
-        df_score_result = get_score(df_binned, df_score, InterceptScore)
+        df_score_result = scorer.score_points(df_raw).to_frame("Score_total")
 
         df_score_result["Odds"] = np.exp(
             (df_score_result["Score_total"] - Offset) / Factor
@@ -710,6 +607,9 @@ def run(project_id):
 
                 st.rerun()
 
+        for issue in validate_rules(score_rules):
+            st.warning(f"Score rules: {issue}")
+
         st.session_state["score_rules"] = score_rules
 
         save_model_rules(
@@ -735,10 +635,22 @@ def run(project_id):
         df_perf["cum_portion"] = df_perf["freq_cum"] / total
         df_perf["cum_bad"] = df_perf["freq_bad_cum"] / total_bad
 
-        df_perf["score_range"] = df_perf["score"].apply(lambda x: map_with_rules(x, score_rules))
+        df_perf["score_range"] = assign_rules(df_perf["score"], score_rules)
 
         st.dataframe(df_perf.style.format({"prob": "{:.10f}"}))
 
+    # ======================
+    # CONFIDENCE INTERVAL SETTING
+    # DeLong selalu dihitung, bootstrap opsional (multi-core, seeded)
+    # ======================
+    with st.expander("📏 Confidence Interval"):
+        col1, col2, col3, col4 = st.columns(4)
+
+        ci_level = col1.selectbox("Confidence level", [0.90, 0.95, 0.99], index=1)
+        use_bootstrap = col2.checkbox("Bootstrap (KS)", value=False)
+        n_boot = col3.number_input("Resamples", min_value=100, max_value=10000, value=1000, step=100)
+        boot_seed = col4.number_input("Seed", min_value=0, value=42, step=1)
+
     # ======================
     # PERFORMANCE
     # ======================
@@ -793,6 +705,48 @@ def run(project_id):
         st.write(f"AUROC: {auroc:.4f}")
         st.write(f"Gini: {gini:.4f}")
 
+        # ======================
+        # FULL-RESOLUTION METRICS
+        # dari PD / score mentah (bukan per grade)
+        # ======================
+        st.subheader("🎯 Full-resolution Metrics")
+
+        value_col = "prob" if output_type == "Rating" else "score"
+
+        # data besar → histogram O(n), selain itu exact (rank-based)
+        method = "histogram" if len(df_perf) > 5_000_000 else "exact"
+
+        full_metrics, bucket_table = discrimination_metrics(
+            df_perf[value_col],
+            df_perf["target"],
+            higher_is_bad=output_type == "Rating",
+            method=method
+        )
+
+        st.caption(f"Method: {method} · {len(df_perf):,} rows")
+
+        st.write(f"KS: {full_metrics['ks']:.4f}")
+        st.write(f"AUROC: {full_metrics['auroc']:.4f}")
+        st.write(f"Gini: {full_metrics['gini']:.4f}")
+
+        st.dataframe(bucket_table, width="stretch")
+
+        st.markdown(f"**{ci_level:.0%} Confidence Interval**")
+
+        ci_table = metrics_ci_table(
+            df_perf[value_col],
+            df_perf["target"],
+            higher_is_bad=output_type == "Rating",
+            alpha=1 - ci_level,
+            n_boot=int(n_boot) if use_bootstrap else 0,
+            seed=int(boot_seed)
+        )
+
+        st.dataframe(
+            ci_table.style.format({"estimate": "{:.4f}", "lower": "{:.4f}", "upper": "{:.4f}"}),
+            width="stretch"
+        )
+
         st.subheader("📈 ROC Curve")
 
         # ======================
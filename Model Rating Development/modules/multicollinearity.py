@@ -2,10 +2,9 @@ import streamlit as st
 import pandas as pd
 
 from database.crud import load_split, load_preprocessing, load_binning, save_model_dataset
-from utils.binning import apply_binning
-from utils.woe import calculate_woe_iv
-from utils.vif import calculate_vif
-from utils.transform import apply_transformation  # 🔥 NEW
+from database.status import save_stage_params
+from pipeline.stages import woe_columns, load_woe_transformer, preselection_shortlist
+from utils.vif import calculate_vif, drop_high_vif
 
 
 def run(project_id):
@@ -14,81 +13,65 @@ def run(project_id):
     # ======================
     # LOAD DATA
     # ======================
-    split = load_split(project_id)
     config = load_preprocessing(project_id)
     binning_rules = load_binning(project_id)
 
+    # train tidak di-load di sini (handle) → hanya dibaca kalau cache miss
+    split = load_split(project_id, parts=())
+
     if split is None or config is None or binning_rules is None:
         st.warning("Complete previous steps first")
         return
 
-    df = split["train"].copy()
-    target = config["target"]
+    train = split["train"]
     features = config["features"]
 
+    # 🔥 WOE dari halaman WOE (alpha & tabel yang sama), tidak dihitung ulang
+    transformer = load_woe_transformer(project_id, train, binning_rules)
+
+    if transformer is None:
+        st.warning("Run WOE step first")
+        return
+
     # ======================
     # VARIABLE SELECTION (NEW)
     # ======================
     st.subheader("📌 Select Variables for VIF")
 
+    woe_features = [col for col in features if col in transformer.woe]
+
+    # default = shortlist tersimpan (pre-selection), kalau ada
+    shortlist = preselection_shortlist(project_id, woe_features)
+
     selected_features = st.multiselect(
         "Choose variables",
-        features,
-        default=features
+        woe_features,
+        default=shortlist or woe_features
     )
 
     # ======================
-    # 🔥 APPLY TRANSFORMATION (FIX)
-    # ======================
-    df = apply_transformation(df, binning_rules)
-
-    st.success("Transformation applied")
-
+    # WOE TRANSFORMATION (STAGE CACHE)
+    # 🔥 hanya variabel yang input-nya berubah yang dihitung ulang
     # ======================
-    # APPLY BINNING
-    # ======================
-    df_binned = apply_binning(df, binning_rules)
-
-    st.success("Binning applied")
-
-    # ======================
-    # WOE TRANSFORMATION (ROBUST - MERGE BASED)
-    # ======================
-    df_woe = pd.DataFrame(index=df.index)  # 🔥 ensure index align
-    warning_cols = []
-
-    for col in selected_features:
-        try:
-            woe_table, _ = calculate_woe_iv(df_binned, col, target)
-
-            # 🔥 IMPORTANT: gunakan merge (bukan map)
-            temp = df_binned[[col]].copy()
-            temp["bin"] = temp[col]
-
-            woe_table_copy = woe_table.copy()
-            woe_table_copy["bin"] = woe_table_copy["bin"]
-
-            merged = temp.merge(
-                woe_table_copy[["bin", "woe"]],
-                on="bin",
-                how="left"
-            )
-
-            df_woe[col] = merged["woe"].values  # 🔥 FIX alignment
-
-            # ======================
-            # VALIDATION
-            # ======================
-            missing_ratio = df_woe[col].isna().mean()
+    df_woe, missing_ratios, errors, n_stale = woe_columns(
+        project_id,
+        train,
+        selected_features,
+        transformer
+    )
 
-            if missing_ratio > 0:
-                warning_cols.append((col, missing_ratio))
+    if n_stale:
+        st.success(f"WOE transformer applied ({n_stale} variables)")
+    else:
+        st.success("WOE columns loaded from cache")
 
-            # fill missing
-            df_woe[col] = df_woe[col].fillna(0)
+    for col, e in errors.items():
+        st.error(f"Error processing {col}: {e}")
 
-        except Exception as e:
-            st.error(f"Error processing {col}: {e}")
+    warning_cols = [
+        (col, ratio) for col, ratio in missing_ratios.items()
+        if ratio > 0
+    ]
 
     st.success("WOE transformation completed")
 
@@ -167,6 +150,25 @@ def run(project_id):
     st.write("### ✅ Safe Variables (VIF ≤ 5)")
     st.write(low_vif)
 
+    # ======================
+    # ITERATIVE DROP (AUTO)
+    # ======================
+    st.subheader("🔁 Iterative Drop (highest VIF first)")
+
+    vif_threshold = st.number_input(
+        "VIF threshold",
+        min_value=1.0,
+        value=5.0,
+        step=0.5
+    )
+
+    keep_vars, drop_history = drop_high_vif(df_woe, threshold=vif_threshold)
+
+    if drop_history.empty:
+        st.success(f"All variables have VIF ≤ {vif_threshold}")
+    else:
+        st.dataframe(drop_history, width='stretch')
+
     st.caption("⚠️ Final decision remains with user")
 
     # ======================
@@ -174,7 +176,7 @@ def run(project_id):
     # ======================
     st.subheader("✏️ Select Variables for Model")
 
-    default_vars = low_vif if low_vif else vif_df["variable"].tolist()
+    default_vars = keep_vars if keep_vars else vif_df["variable"].tolist()
 
     selected_vars = st.multiselect(
         "Choose variables to KEEP",
@@ -208,6 +210,8 @@ def run(project_id):
                 selected_vars
             )
 
+            save_stage_params(project_id, "vif", {"features": selected_vars})
+
             st.success("Variables and WOE dataset saved (persistent)!")
 
         except Exception as e:
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 
-from database.crud import load_dataset, save_preprocessing, load_preprocessing
+from database.crud import open_dataset, save_preprocessing, load_preprocessing
 
 def detect_type(series):
     if pd.api.types.is_numeric_dtype(series):
@@ -10,20 +10,44 @@ def detect_type(series):
         return "categorical"
 
 
+# ======================
+# STREAMING PROFILE (dtype + missing count per chunk)
+# ======================
+def profile_dataset(handle):
+    dtypes = None
+    missing = None
+    n_rows = 0
+
+    for chunk in handle.iter_chunks():
+        if dtypes is None:
+            dtypes = chunk.dtypes
+            missing = chunk.isna().sum()
+        else:
+            missing += chunk.isna().sum()
+
+        n_rows += len(chunk)
+
+    return dtypes, missing, n_rows
+
+
 def run(project_id):
     st.header("⚙️ Preprocessing")
 
     # ======================
     # LOAD DATASET
     # ======================
-    df, file_name = load_dataset(project_id)
+    handle, file_name = open_dataset(project_id)
 
-    if df is None:
+    if handle is None:
         st.warning("Please upload dataset first")
         return
 
     st.success(f"Dataset: {file_name}")
 
+    # dataset tidak di-load penuh; cukup dtype & missing count
+    dtypes, missing_counts, n_rows = profile_dataset(handle)
+    columns = dtypes.index
+
     # ======================
     # LOAD EXISTING CONFIG
     # ======================
@@ -36,8 +60,8 @@ def run(project_id):
 
     target = st.selectbox(
         "Select Target",
-        df.columns,
-        index=df.columns.get_loc(config["target"]) if config else 0
+        columns,
+        index=columns.get_loc(config["target"]) if config else 0
     )
 
     # ======================
@@ -49,7 +73,7 @@ def run(project_id):
 
     features = st.multiselect(
         "Select Features",
-        df.columns.drop(target),
+        columns.drop(target),
         default=default_features
     )
 
@@ -61,10 +85,10 @@ def run(project_id):
     type_dict = {}
 
     for col in features:
-        detected_type = detect_type(df[col])
+        detected_type = detect_type(dtypes[col])
 
         # Tambahan: deteksi datetime sederhana
-        if pd.api.types.is_datetime64_any_dtype(df[col]):
+        if pd.api.types.is_datetime64_any_dtype(dtypes[col]):
             detected_type = "datetime"
 
         options = ["numeric", "categorical", "datetime"]
@@ -91,11 +115,11 @@ def run(project_id):
     st.subheader("📉 Missing Value Summary")
 
     missing_df = pd.DataFrame({
-        "Variable": df.columns,
-        "Missing Count": df.isna().sum().values,
+        "Variable": columns,
+        "Missing Count": missing_counts.values,
     })
 
-    missing_df["Missing %"] = (missing_df["Missing Count"] / len(df)) * 100
+    missing_df["Missing %"] = (missing_df["Missing Count"] / n_rows) * 100
     missing_df = missing_df.sort_values(by="Missing %", ascending=False)
 
     st.dataframe(missing_df, width='stretch')
@@ -117,9 +141,9 @@ def run(project_id):
 
     else:
         for col in missing_vars:
-            col_type = detect_type(df[col])
-            missing_count = df[col].isna().sum()
-            missing_pct = missing_count / len(df) * 100
+            col_type = detect_type(dtypes[col])
+            missing_count = missing_counts[col]
+            missing_pct = missing_count / n_rows * 100
 
             st.markdown(f"### {col}")
             st.caption(f"Missing: {missing_count} ({missing_pct:.2f}%)")
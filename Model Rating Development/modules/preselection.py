@@ -0,0 +1,125 @@
+import streamlit as st
+
+from database.crud import load_split, load_preprocessing, load_binning
+from database.status import save_stage_params, mark_stage
+from pipeline.stages import load_woe_transformer, preselection_inputs
+from utils.selection import preselect_features, woe_correlation
+
+
+# ======================
+# COLOR STATUS
+# ======================
+def color_status(val):
+    if val == "kept":
+        return "background-color: #ccffcc"
+    elif val == "low IV":
+        return "background-color: #ffcccc"
+    else:
+        return "background-color: #fff2cc"
+
+
+def run(project_id):
+    st.header("🧹 Feature Pre-selection")
+
+    # ======================
+    # LOAD DATA
+    # ======================
+    config = load_preprocessing(project_id)
+    binning_rules = load_binning(project_id)
+
+    split = load_split(project_id, parts=())
+
+    if split is None or config is None or binning_rules is None:
+        st.warning("Complete previous steps first")
+        return
+
+    train = split["train"]
+
+    transformer = load_woe_transformer(project_id, train, binning_rules)
+
+    if transformer is None:
+        st.warning("Run WOE step first")
+        return
+
+    # ======================
+    # WOE + IV (STAGE CACHE)
+    # ======================
+    df_woe, iv, errors = preselection_inputs(
+        project_id,
+        train,
+        config["target"],
+        binning_rules,
+        transformer
+    )
+
+    for col, e in errors.items():
+        st.error(f"Error processing {col}: {e}")
+
+    if df_woe.empty:
+        st.error("No WOE variables available")
+        return
+
+    # ======================
+    # THRESHOLDS
+    # ======================
+    st.subheader("⚙️ Thresholds")
+
+    col1, col2, col3 = st.columns(3)
+
+    iv_min = col1.number_input("Minimum IV", min_value=0.0, value=0.02, step=0.01)
+    corr_max = col2.slider("Max |correlation|", 0.1, 1.0, 0.6, 0.05)
+    vif_max = col3.number_input("Max VIF", min_value=1.0, value=5.0, step=0.5)
+
+    shortlist, report = preselect_features(
+        df_woe,
+        iv,
+        iv_min=iv_min,
+        corr_max=corr_max,
+        vif_max=vif_max
+    )
+
+    # ======================
+    # RESULT
+    # ======================
+    st.subheader("📊 Pre-selection Result")
+
+    st.write(f"{len(shortlist)} of {len(report)} variables kept")
+
+    st.dataframe(
+        report.style.map(color_status, subset=["status"]),
+        width='stretch'
+    )
+
+    with st.expander("🔗 WOE Correlation Matrix"):
+        st.dataframe(
+            woe_correlation(df_woe[report["variable"].tolist()]).round(3),
+            width='stretch'
+        )
+
+    st.caption("⚠️ Final decision remains with user")
+
+    # ======================
+    # SAVE SHORTLIST
+    # ======================
+    selected_vars = st.multiselect(
+        "Shortlist",
+        options=report["variable"].tolist(),
+        default=shortlist
+    )
+
+    if st.button("💾 Save Shortlist"):
+
+        if not selected_vars:
+            st.warning("Select at least one variable")
+            return
+
+        # shortlist = params stage sendiri (artifact features ditimpa VIF / training)
+        save_stage_params(
+            project_id,
+            "preselection",
+            {"iv_min": iv_min, "corr_max": corr_max, "vif_max": vif_max, "shortlist": selected_vars}
+        )
+
+        mark_stage(project_id, "preselection", "done")
+
+        st.success("Shortlist saved — used as default on the VIF page")
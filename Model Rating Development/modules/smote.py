@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 
-from imblearn.combine import SMOTETomek
 from database.crud import load_split, load_preprocessing, load_model_dataset, save_model_dataset
+from database.status import save_stage_params
+from pipeline.stages import resample
 
 
 def run(project_id):
@@ -11,9 +12,16 @@ def run(project_id):
     # ======================
     # LOAD DATA
     # ======================
-    split = load_split(project_id)
     config = load_preprocessing(project_id)
 
+    split = None
+    if config is not None:
+        split = load_split(
+            project_id,
+            parts=("train",),
+            columns=[config["target"]]
+        )
+
     if split is None or config is None:
         st.warning("Complete previous steps first")
         return
@@ -26,7 +34,10 @@ def run(project_id):
         selected_features = st.session_state["final_features"]
 
     else:
-        model_data = load_model_dataset(project_id)
+        model_data = load_model_dataset(
+            project_id,
+            artifacts=("df_woe", "features")
+        )
 
         if model_data is None:
             st.warning("Run VIF step first")
@@ -94,6 +105,13 @@ def run(project_id):
     # ======================
     if st.button("🚀 Prepare Dataset for Modelling"):
 
+        # parameter dipakai ulang saat pipeline di-run headless
+        save_stage_params(
+            project_id,
+            "smote",
+            {"use_smote": use_smote, "sampling_strategy": sampling_strategy}
+        )
+
         # ======================
         # NO SMOTE
         # ======================
@@ -114,8 +132,7 @@ def run(project_id):
             # 🔥 SAVE TO DB
             save_model_dataset(
                 project_id,
-                df_woe,
-                selected_features,
+                features=selected_features,
                 source="original"
             )
 
@@ -129,16 +146,7 @@ def run(project_id):
         try:
             st.write("Running SMOTETomek...")
 
-            if sampling_strategy:
-                sampling_strategy = float(sampling_strategy)
-                smote = SMOTETomek(
-                    sampling_strategy=sampling_strategy,
-                    random_state=42
-                )
-            else:
-                smote = SMOTETomek(random_state=42)
-
-            X_resampled, y_resampled = smote.fit_resample(X, y)
+            X_resampled, y_resampled = resample(X, y, sampling_strategy)
 
             st.success("SMOTE applied successfully")
 
@@ -184,8 +192,7 @@ def run(project_id):
             # 🔥 SAVE TO DB (METADATA)
             save_model_dataset(
                 project_id,
-                df_woe,
-                selected_features,
+                features=selected_features,
                 source="smote"
             )
 
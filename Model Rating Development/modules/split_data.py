@@ -1,9 +1,10 @@
 import streamlit as st
 import pandas as pd
-from sklearn.model_selection import train_test_split
 
 from database.crud import load_dataset, load_preprocessing, save_split, load_split
+from database.status import save_stage_params
 from utils.helpers import apply_imputation
+from utils.split import split_frame
 
 
 def run(project_id):
@@ -29,7 +30,7 @@ def run(project_id):
     # ======================
     # CHECK EXISTING SPLIT
     # ======================
-    existing = load_split(project_id)
+    existing = load_split(project_id, parts=())
 
     if existing:
         st.success(f"Split already exists ({existing['method']})")
@@ -58,14 +59,17 @@ def run(project_id):
 
         use_validation = st.checkbox("Use Validation Set")
 
-        val_size = 0.2 if use_validation else 0
+        params = {
+            "method": method,
+            "use_validation": use_validation
+        }
 
         # =====================================================
         # RANDOM / STRATIFIED
         # =====================================================
         if method != "time_based":
 
-            test_size = st.slider(
+            params["test_size"] = st.slider(
                 "Test Size",
                 min_value=0.10,
                 max_value=0.50,
@@ -73,43 +77,6 @@ def run(project_id):
                 step=0.05
             )
 
-            stratify_col = df[target] if method == "stratified" else None
-
-            if use_validation:
-
-                train_val, test = train_test_split(
-                    df,
-                    test_size=test_size,
-                    stratify=stratify_col,
-                    random_state=42
-                )
-
-                val_ratio = val_size / (1 - test_size)
-
-                stratify_val = (
-                    train_val[target]
-                    if method == "stratified"
-                    else None
-                )
-
-                train, val = train_test_split(
-                    train_val,
-                    test_size=val_ratio,
-                    stratify=stratify_val,
-                    random_state=42
-                )
-
-            else:
-
-                train, test = train_test_split(
-                    df,
-                    test_size=test_size,
-                    stratify=stratify_col,
-                    random_state=42
-                )
-
-                val = None
-
         # ======================
         # TIME BASED
         # ======================
@@ -121,7 +88,7 @@ def run(project_id):
             )
 
             try:
-                df[date_col] = pd.to_datetime(df[date_col])
+                dates = pd.to_datetime(df[date_col])
             except Exception:
                 st.error(
                     f"Column '{date_col}' is not a valid date column. "
@@ -129,20 +96,17 @@ def run(project_id):
                 )
                 st.stop()
 
-            df = df.sort_values(date_col)
-
             split_date = st.date_input(
                 "Split Date",
-                value=df[date_col].max().date(),
-                min_value=df[date_col].min().date(),
-                max_value=df[date_col].max().date()
+                value=dates.max().date(),
+                min_value=dates.min().date(),
+                max_value=dates.max().date()
             )
 
-            split_date = pd.Timestamp(split_date)
+            params["date_col"] = date_col
+            params["split_date"] = str(split_date)
 
-            train = df[df[date_col] < split_date]
-            test = df[df[date_col] >= split_date]
-            val = None
+        train, test, val = split_frame(df, target, **params)
 
         # ======================
         # RESULT
@@ -192,6 +156,9 @@ def run(project_id):
                 method=method
             )
 
+            # parameter split dipakai ulang saat pipeline di-run headless
+            save_stage_params(project_id, "split", params)
+
             st.success("Split saved!")
             st.session_state["resplit"] = False
             st.rerun()
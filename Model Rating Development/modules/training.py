@@ -1,9 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import pickle
-import json
-import ast
 
 import statsmodels.api as sm
 
@@ -12,105 +9,13 @@ from database.crud import (
     load_preprocessing,
     load_model_dataset,
     load_binning,
-    save_model_dataset
+    save_model_dataset,
+    save_model,
+    load_model,
+    save_calibrated_model
 )
-from database.db import get_connection
-
-
-# ======================
-# SAFE PARSER
-# ======================
-def parse_features(raw):
-    if raw is None:
-        return None
-
-    if isinstance(raw, list):
-        return raw
-
-    try:
-        return json.loads(raw)
-    except:
-        return ast.literal_eval(raw)
-
-
-# ======================
-# SAVE MODEL
-# ======================
-def save_model(project_id, model, features):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS model_result (
-            project_id INTEGER PRIMARY KEY,
-            model BLOB,
-            features TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    cursor.execute("""
-        INSERT OR REPLACE INTO model_result (project_id, model, features)
-        VALUES (?, ?, ?)
-    """, (
-        project_id,
-        pickle.dumps(model),
-        json.dumps(features)
-    ))
-
-    conn.commit()
-    conn.close()
-
-
-# ======================
-# SAVE CALIBRATED MODEL
-# ======================
-def save_calibrated_model(project_id, params, features):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS model_calibrated (
-            project_id INTEGER PRIMARY KEY,
-            params BLOB,
-            features TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    cursor.execute("""
-        INSERT OR REPLACE INTO model_calibrated (project_id, params, features)
-        VALUES (?, ?, ?)
-    """, (
-        project_id,
-        pickle.dumps(params),
-        json.dumps(features)
-    ))
-
-    conn.commit()
-    conn.close()
-
-
-# ======================
-# LOAD MODEL
-# ======================
-def load_model(project_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT model, features
-        FROM model_result
-        WHERE project_id = ?
-    """, (project_id,))
-
-    row = cursor.fetchone()
-    conn.close()
-
-    if row is None:
-        return None, None
-
-    return pickle.loads(row[0]), parse_features(row[1])
+from database.status import save_stage_params
+from pipeline.stages import fit_logit
 
 
 # ======================
@@ -150,9 +55,20 @@ def run(project_id):
 
     st.header("📊 Model Training (Logistic Regression)")
 
-    split = load_split(project_id)
     config = load_preprocessing(project_id)
-    model_data = load_model_dataset(project_id)
+
+    split = None
+    if config is not None:
+        split = load_split(
+            project_id,
+            parts=("train",),
+            columns=[config["target"]]
+        )
+
+    model_data = load_model_dataset(
+        project_id,
+        artifacts=("df_woe", "features", "woe_result")
+    )
 
     if split is None or config is None or model_data is None:
         st.warning("Complete previous steps first")
@@ -214,7 +130,6 @@ def run(project_id):
         return
 
     X = X[selected_vars]
-    X_const = sm.add_constant(X)
 
     # ======================
     # TRAIN
@@ -222,29 +137,19 @@ def run(project_id):
     if st.button("🚀 Train Model"):
 
         try:
-            model = sm.Logit(y, X_const).fit(disp=0)
-
             # ======================
-            # BUILD SCORECARD
+            # FIT + BUILD SCORECARD
             # ======================
-            coef_df = pd.DataFrame({
-                "index": model.params.index,
-                "Coefficient_final": model.params.values,
-                "std_error": model.bse.values,
-                "p_value": model.pvalues.values
-            })
-
-            intercept = model.params.get("const", 0)
+            model, coef_df, intercept = fit_logit(X, y)
             woe_result["kategori"] = woe_result["kategori"].astype(str)
 
             # ======================
             # SAVE MODEL DATASET
             # ======================
+            # df_woe & woe_result tidak berubah → tidak ditulis ulang
             save_model_dataset(
                 project_id=project_id,
-                df_woe=df_woe,
                 features=selected_vars,
-                woe_result=woe_result,  # ✅ dari modul WOE
                 coef_df=coef_df,
                 intercept=intercept
             )
@@ -327,6 +232,7 @@ def run(project_id):
             # SAVE MODEL
             # ======================
             save_model(project_id, model, selected_vars)
+            save_stage_params(project_id, "training", {"features": selected_vars})
 
             st.session_state["model"] = model
             st.session_state["model_features"] = selected_vars
@@ -5,13 +5,13 @@ from database.crud import (
     load_split,
     load_preprocessing,
     load_binning,
-    load_model_dataset,
     save_model_dataset
 )
 
-from utils.binning import apply_binning
-from utils.woe import calculate_woe_iv, sort_woe_table
-from utils.transform import apply_transformation
+from database.status import save_stage_params
+
+from pipeline.stages import woe_tables, build_woe_transformer
+from utils.woe import standardize_woe_table, WOE_ALPHA
 
 
 # ======================
@@ -36,16 +36,17 @@ def run(project_id):
     # ======================
     # LOAD DATA
     # ======================
-    split = load_split(project_id)
     config = load_preprocessing(project_id)
     binning_rules = load_binning(project_id)
-    existing_model_data = load_model_dataset(project_id)
+
+    # train tidak di-load di sini (handle) → hanya dibaca kalau cache miss
+    split = load_split(project_id, parts=())
 
     if split is None or config is None or binning_rules is None:
         st.warning("Complete previous steps first")
         return
 
-    df = split["train"].copy()
+    train = split["train"]
     target = config["target"]
     features = config["features"]
 
@@ -60,29 +61,35 @@ def run(project_id):
         default=features
     )    
 
-    # ======================
-    # APPLY TRANSFORMATION
-    # ======================
-    df = apply_transformation(df, binning_rules)
-    st.success("Transformation applied")
-
-    # ======================
-    # APPLY BINNING
-    # ======================
-    df_binned = apply_binning(df, binning_rules)
-    st.success("Binning applied")
-
-    iv_summary = []
-    woe_results_all = []
-
     alpha = st.slider(
         "Smoothing (alpha)",
         min_value=0.0,
         max_value=2.0,
-        value=0.5,
+        value=WOE_ALPHA,
         step=0.05
     )
 
+    # ======================
+    # WOE TABLES (STAGE CACHE)
+    # 🔥 hanya variabel yang input-nya berubah yang dihitung ulang
+    # ======================
+    tables, errors, n_stale = woe_tables(
+        project_id,
+        train,
+        target,
+        selected_features,
+        binning_rules,
+        alpha
+    )
+
+    if n_stale:
+        st.success(f"Transformation & binning applied ({n_stale} variables)")
+    else:
+        st.success("WOE tables loaded from cache")
+
+    iv_summary = []
+    woe_results_all = []
+
     # ======================
     # LOOP FEATURES
     # ======================
@@ -90,16 +97,17 @@ def run(project_id):
 
         st.subheader(f"🔹 {col}")
 
+        if col in errors:
+            st.error(f"Error processing {col}: {errors[col]}")
+            continue
+
         try:
-            woe_table, iv = calculate_woe_iv(df_binned, col, target, alpha)
+            woe_table, iv = tables[col]
 
             # ======================
-            # SORT
+            # SORT + STANDARDIZE COLUMN NAME
             # ======================
-            if binning_rules[col]["type"] == "numeric":
-                woe_table = sort_woe_table(woe_table)
-            else:
-                woe_table = woe_table.sort_values(by="woe", ascending=False)
+            woe_table = standardize_woe_table(woe_table, col, binning_rules[col])
 
             st.write(f"IV: {iv:.4f}")
             st.dataframe(woe_table, width='stretch')
@@ -109,17 +117,6 @@ def run(project_id):
                 "iv": iv
             })
 
-            # ======================
-            # STANDARDIZE COLUMN NAME
-            # ======================
-            woe_table["variabel"] = col
-
-            if "bin" in woe_table.columns:
-                woe_table = woe_table.rename(columns={"bin": "kategori"})
-
-            # 🔥 WAJIB INI
-            woe_table["kategori"] = woe_table["kategori"].astype(str)
-
             woe_results_all.append(
                 woe_table[["variabel", "kategori", "woe"]]
             )
@@ -135,17 +132,22 @@ def run(project_id):
         woe_result = pd.concat(woe_results_all, ignore_index=True)
 
         # ======================
-        # MERGE DENGAN DATA EXISTING (JANGAN HILANGKAN DATA LAIN)
+        # SIMPAN (artifact lain seperti df_woe tidak disentuh)
         # ======================
-        df_woe_existing = None
-        if existing_model_data is not None:
-            df_woe_existing = existing_model_data.get("df_woe")
+        # 🔥 transformer (rules + WOE + alpha) dipakai ulang di halaman VIF
+        transformer = build_woe_transformer(train, binning_rules, woe_result, alpha)
 
         save_model_dataset(
             project_id=project_id,
-            df_woe=df_woe_existing,  # 🔥 jangan overwrite
             features=features,
-            woe_result=woe_result
+            woe_result=woe_result,
+            woe_maps=transformer.to_dict()
+        )
+
+        save_stage_params(
+            project_id,
+            "woe",
+            {"features": selected_features, "alpha": alpha}
         )
 
         st.success("WOE result saved to database")
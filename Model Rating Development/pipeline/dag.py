@@ -0,0 +1,42 @@
+# ======================
+# PIPELINE DAG
+# (key, label, upstream)
+# urutan list = urutan topologis
+# ======================
+STAGES = [
+    ("input", "① Input Data", []),
+    ("preprocessing", "② Preprocessing", ["input"]),
+    ("split", "③ Split Data", ["input", "preprocessing"]),
+    ("binning", "④ Binning", ["preprocessing", "split"]),
+    ("woe", "⑤ WOE", ["split", "binning"]),
+    ("preselection", "⑥ Pre-selection", ["woe"]),
+    ("vif", "⑦ Multicollinearity", ["woe", "preselection"]),
+    ("smote", "⑧ SMOTE", ["split", "vif"]),
+    ("training", "⑨ Training Model", ["woe", "smote"]),
+    ("performance", "⑩ Model Performance", ["split", "binning", "training"]),
+]
+
+STAGE_KEYS = [key for key, _, _ in STAGES]
+STAGE_LABELS = {key: label for key, label, _ in STAGES}
+UPSTREAM = {key: upstream for key, _, upstream in STAGES}
+
+
+def downstream_of(stage):
+    # semua stage yang (langsung / tidak langsung) bergantung pada stage
+    affected = {stage}
+
+    for key in STAGE_KEYS:
+        if any(parent in affected for parent in UPSTREAM[key]):
+            affected.add(key)
+
+    affected.discard(stage)
+
+    return [key for key in STAGE_KEYS if key in affected]
+
+
+def stages_from(stage=None):
+    # stage + semua turunannya, urut topologis
+    if stage is None:
+        return list(STAGE_KEYS)
+
+    return [stage] + downstream_of(stage)
@@ -0,0 +1,97 @@
+import argparse
+import json
+
+from database.models import create_tables
+from database.status import load_pipeline_status, load_stage_params, mark_stage
+from pipeline.dag import UPSTREAM, stages_from
+from pipeline.stages import STAGE_RUNNERS
+
+
+# ======================
+# RUN FROM HERE
+# stage + semua turunannya dijalankan berurutan (topologis)
+# ======================
+def run_pipeline(project_id, start=None, params=None, on_stage=None):
+    # params: override per stage, mis. {"input": {"path": "data.csv"}}
+    params = params or {}
+    results = []
+
+    for stage in stages_from(start):
+
+        status = load_pipeline_status(project_id)
+
+        blocked = [
+            parent for parent in UPSTREAM[stage]
+            if status.get(parent, {}).get("status") != "done"
+        ]
+
+        if blocked:
+            result = {
+                "stage": stage,
+                "status": "blocked",
+                "error": f"Upstream not done: {blocked}"
+            }
+            results.append(result)
+
+            if on_stage:
+                on_stage(result)
+
+            break
+
+        stage_params = {**load_stage_params(project_id, stage), **params.get(stage, {})}
+
+        mark_stage(project_id, stage, "running")
+
+        try:
+            summary = STAGE_RUNNERS[stage](project_id, stage_params)
+
+        except Exception as e:
+            mark_stage(project_id, stage, "failed", error=str(e))
+
+            result = {"stage": stage, "status": "failed", "error": str(e)}
+            results.append(result)
+
+            if on_stage:
+                on_stage(result)
+
+            break
+
+        mark_stage(project_id, stage, "done")
+
+        result = {"stage": stage, "status": "done", "summary": summary}
+        results.append(result)
+
+        if on_stage:
+            on_stage(result)
+
+    return results
+
+
+# ======================
+# CLI (batch rebuild)
+# python -m pipeline.runner <project_id> [--from split] [--input data.csv]
+# ======================
+def main():
+    parser = argparse.ArgumentParser(description="Run the modelling pipeline headless")
+    parser.add_argument("project_id", type=int)
+    parser.add_argument("--from", dest="start", choices=list(STAGE_RUNNERS))
+    parser.add_argument("--input", help="Refreshed CSV / Excel file for the input stage")
+
+    args = parser.parse_args()
+
+    create_tables()
+
+    params = {"input": {"path": args.input}} if args.input else {}
+
+    results = run_pipeline(
+        args.project_id,
+        start=args.start,
+        params=params,
+        on_stage=lambda result: print(json.dumps(result, default=str))
+    )
+
+    return 0 if results and results[-1]["status"] == "done" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,346 @@
+import argparse
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from database.artifacts import CHUNK_ROWS
+from database.crud import (
+    load_split,
+    load_binning,
+    load_model_dataset,
+    load_model_rules,
+    load_calibrated_model
+)
+from database.models import create_tables
+from pipeline.stages import load_woe_transformer
+from utils.rating import assign_rules
+
+
+# ======================
+# SCORE SCALING
+# Score = Offset - Factor × logit, Factor = PDO / ln 2
+# ======================
+REFERENCE_SCORE = 600
+REFERENCE_ODDS = 50
+PDO = 50
+
+
+def score_scaling(pdo=PDO, reference_score=REFERENCE_SCORE, reference_odds=REFERENCE_ODDS):
+    factor = pdo / np.log(2)
+    offset = reference_score - factor * np.log(reference_odds)
+
+    return factor, offset
+
+
+# =====================================================
+# SCORER (HEADLESS)
+# binning rules + WOE (transformer) + koefisien model + rules rating / score
+# → DataFrame mentah / stream chunk jadi PD, score, rating, range
+# =====================================================
+class Scorer:
+
+    def __init__(
+        self,
+        transformer,
+        coef,
+        params=None,
+        rating_rules=None,
+        score_rules=None,
+        pdo=PDO,
+        reference_score=REFERENCE_SCORE,
+        reference_odds=REFERENCE_ODDS
+    ):
+        # coef  : {variabel: koefisien} model Logit asli (termasuk "const") → score
+        # params: {variabel: koefisien} untuk PD (model kalibrasi); default = coef
+        self.transformer = transformer
+        self.coef = pd.Series(coef, dtype="float64")
+        self.params = pd.Series(params if params is not None else coef, dtype="float64")
+        self.calibrated = params is not None
+        self.rating_rules = rating_rules or []
+        self.score_rules = score_rules or []
+        self.factor, self.offset = score_scaling(pdo, reference_score, reference_odds)
+
+        self.features = [
+            col for col in dict.fromkeys(list(self.coef.index) + list(self.params.index))
+            if col != "const"
+        ]
+
+        missing = [col for col in self.features if col not in transformer.woe]
+
+        if missing:
+            raise ValueError(f"No WOE table for model variables: {missing}")
+
+    @classmethod
+    def from_project(cls, project_id, calibrated=False, rating_rules=None, score_rules=None):
+        model_data = load_model_dataset(project_id, artifacts=("coef_df", "woe_maps", "woe_result"))
+
+        if model_data is None or model_data["coef_df"] is None:
+            raise ValueError("Model not trained")
+
+        split = load_split(project_id, parts=())
+        transformer = load_woe_transformer(
+            project_id,
+            split["train"] if split else None,
+            load_binning(project_id)
+        )
+
+        if transformer is None:
+            raise ValueError("Run WOE step first")
+
+        coef_df = model_data["coef_df"]
+        coef = dict(zip(coef_df["index"], coef_df["Coefficient_final"]))
+
+        params = None
+
+        if calibrated:
+            calibrated_params, calibrated_features = load_calibrated_model(project_id)
+
+            if calibrated_params is None:
+                raise ValueError("Calibrated model not found")
+
+            params = dict(zip(calibrated_features, np.ravel(calibrated_params)))
+
+        # rules tersimpan di halaman performance (bisa di-override)
+        saved_rating, saved_score = load_model_rules(project_id)
+
+        return cls(
+            transformer,
+            coef,
+            params,
+            rating_rules if rating_rules is not None else saved_rating,
+            score_rules if score_rules is not None else saved_score
+        )
+
+    # ======================
+    # WOE MATRIX
+    # bin tanpa WOE / NaN → WOE bin Missing (0 kalau tidak ada)
+    # ======================
+    def woe_matrix(self, df):
+        X = self.transformer.transform(df, self.features, unseen="missing")
+        return X.fillna(0)
+
+    def _linear(self, X, params):
+        weights = params.drop("const", errors="ignore")
+
+        linear = X[weights.index].to_numpy(dtype="float64") @ weights.to_numpy()
+
+        return linear + params.get("const", 0.0)
+
+    def predict_pd(self, df):
+        linear = self._linear(self.woe_matrix(df), self.params)
+        return pd.Series(1 / (1 + np.exp(-linear)), index=df.index, name="pd")
+
+    def score_points(self, df):
+        # = InterceptScore + Σ skor per bin (scorecard)
+        linear = self._linear(self.woe_matrix(df), self.coef)
+        return pd.Series(self.offset - self.factor * linear, index=df.index, name="score")
+
+    def score(self, df):
+        X = self.woe_matrix(df)
+
+        pd_ = 1 / (1 + np.exp(-self._linear(X, self.params)))
+        points = self.offset - self.factor * self._linear(X, self.coef)
+
+        result = pd.DataFrame({"pd": pd_, "score": points}, index=df.index)
+
+        if self.rating_rules:
+            result["rating"] = assign_rules(result["pd"], self.rating_rules).array
+
+        if self.score_rules:
+            result["score_range"] = assign_rules(result["score"], self.score_rules).array
+
+        return result
+
+    def score_models(self, df):
+        # satu WOE matrix → PD model asli (coef), PD kalibrasi (params) & score
+        X = self.woe_matrix(df)
+        linear = self._linear(X, self.coef)
+
+        result = pd.DataFrame({
+            "pd": 1 / (1 + np.exp(-linear)),
+            "score": self.offset - self.factor * linear
+        }, index=df.index)
+
+        if self.calibrated:
+            result["pd_calibrated"] = 1 / (1 + np.exp(-self._linear(X, self.params)))
+
+        return result
+
+    def scorecard(self, woe_result):
+        # tabel skor per bin: variabel | kategori | woe | Coefficient_final | Score
+        coef = self.coef.drop("const", errors="ignore")
+
+        table = woe_result[woe_result["variabel"].isin(coef.index)].copy()
+        table["Coefficient_final"] = table["variabel"].map(coef)
+        table["Score"] = -self.factor * table["Coefficient_final"] * table["woe"]
+
+        return table.dropna()
+
+    @property
+    def intercept_score(self):
+        return self.offset - self.factor * self.coef.get("const", 0.0)
+
+    # ======================
+    # CHUNK STREAM (MULTI-CORE)
+    # jumlah chunk yang sedang diproses dibatasi → memory tetap terbatas
+    # ======================
+    def score_chunks(self, chunks, max_workers=None, keep_columns=None):
+        keep_columns = list(keep_columns or [])
+
+        if max_workers == 1:
+            for chunk in chunks:
+                yield _score_with(self, chunk, keep_columns)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self,)
+        ) as pool:
+            pending = deque()
+            window = 2 * (max_workers or os.cpu_count() or 1)
+
+            for chunk in chunks:
+                pending.append(pool.submit(_score_chunk, chunk, keep_columns))
+
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def score_file(self, path, output, chunksize=CHUNK_ROWS, max_workers=None, keep_columns=None):
+        # CSV / parquet → parquet / CSV, chunk demi chunk
+        path = Path(path)
+        output = Path(output)
+
+        if path.suffix == ".parquet":
+            chunks = (
+                batch.to_pandas()
+                for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize)
+            )
+        else:
+            chunks = pd.read_csv(path, chunksize=chunksize)
+
+        rows = 0
+        writer = None
+
+        try:
+            for i, result in enumerate(self.score_chunks(chunks, max_workers, keep_columns)):
+
+                if output.suffix == ".csv":
+                    result.to_csv(output, mode="w" if i == 0 else "a", header=i == 0, index=False)
+                else:
+                    table = pa.Table.from_pandas(result, preserve_index=False)
+
+                    if writer is None:
+                        writer = pq.ParquetWriter(output, table.schema, compression="zstd")
+
+                    writer.write_table(table)
+
+                rows += len(result)
+
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return rows
+
+
+def _score_with(scorer, chunk, keep_columns):
+    result = scorer.score(chunk)
+
+    if keep_columns:
+        result = pd.concat([chunk[keep_columns], result], axis=1)
+
+    return result
+
+
+_worker_scorer = None
+
+
+def _init_worker(scorer):
+    global _worker_scorer
+    _worker_scorer = scorer
+
+
+def _score_chunk(chunk, keep_columns):
+    return _score_with(_worker_scorer, chunk, keep_columns)
+
+
+# =====================================================
+# COMPARISON (MULTI-DATASET)
+# semua partisi di-load sekali (column projection), satu Scorer
+# → plan binning / WOE di-compile sekali, model asli & kalibrasi
+#   dihitung dari WOE matrix yang sama
+# =====================================================
+DATASET_PARTS = {"Train": "train", "Test": "test", "Validation": "val"}
+
+
+def score_partitions(project_id, target, columns=None):
+    # → {dataset: DataFrame[target, pd, score, (pd_calibrated)]}
+    try:
+        scorer = Scorer.from_project(project_id, calibrated=True)
+    except ValueError:
+        scorer = Scorer.from_project(project_id)
+
+    split = load_split(project_id, parts=tuple(DATASET_PARTS.values()), columns=columns)
+
+    scored = {}
+
+    for dataset, part in DATASET_PARTS.items():
+        df = split[part]
+
+        if df is None or df.empty:
+            continue
+
+        result = scorer.score_models(df)
+        result.insert(0, "target", df[target].to_numpy())
+
+        scored[dataset] = result.reset_index(drop=True)
+
+    return scored
+
+
+# ======================
+# CLI (batch scoring portfolio)
+# python -m pipeline.scoring <project_id> portfolio.csv scored.parquet [--calibrated] [--keep id]
+# ======================
+def main():
+    parser = argparse.ArgumentParser(description="Score a portfolio file with a saved model")
+    parser.add_argument("project_id", type=int)
+    parser.add_argument("input", help="CSV / parquet file to score")
+    parser.add_argument("output", help="Output file (.parquet or .csv)")
+    parser.add_argument("--calibrated", action="store_true")
+    parser.add_argument("--keep", nargs="*", default=[], help="Input columns copied to the output (e.g. account id)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int)
+
+    args = parser.parse_args()
+
+    create_tables()
+
+    scorer = Scorer.from_project(args.project_id, calibrated=args.calibrated)
+
+    rows = scorer.score_file(
+        args.input,
+        args.output,
+        chunksize=args.chunksize,
+        max_workers=args.workers,
+        keep_columns=args.keep
+    )
+
+    print(json.dumps({"rows": rows, "output": args.output}))
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,529 @@
+from pathlib import Path
+
+import pandas as pd
+import statsmodels.api as sm
+from imblearn.combine import SMOTETomek
+
+from database.artifacts import CHUNK_ROWS
+from database.cache import stage_key, load_stage_results, save_stage_result
+from database.crud import (
+    save_dataset,
+    save_dataset_chunks,
+    load_dataset,
+    open_dataset,
+    load_preprocessing,
+    save_split,
+    load_split,
+    load_binning,
+    load_model_dataset,
+    save_model_dataset,
+    save_model
+)
+from database.status import load_stage_params, save_stage_params
+
+from utils.binning import apply_binning, fit_binning_rules, needs_quantile_fit, BINNING_VERSION
+from utils.helpers import apply_imputation, apply_type_conversion, scan_csv_dtypes
+from utils.selection import preselect_features
+from utils.split import split_frame
+from utils.transform import apply_transformation
+from utils.woe import woe_iv_batch, split_woe_result, standardize_woe_table, WoeTransformer, WOE_ALPHA
+
+
+# =====================================================
+# SHARED STAGE COMPUTATION
+# dipakai modul Streamlit dan runner headless
+# =====================================================
+def _bin_stale(train, target, stale, binning_rules):
+    # hanya kolom yang cache-nya miss yang dibaca dari parquet
+    stale_rules = {col: binning_rules[col] for col in stale if col in binning_rules}
+
+    df = train.load(columns=stale + [target])
+    df = apply_transformation(df, stale_rules)
+
+    # rules lama tanpa edge quantile → fit di train (sama dengan scoring)
+    stale_rules = fit_binning_rules(df, stale_rules)
+
+    return apply_binning(df, stale_rules)
+
+
+def _woe_stale(train, target, stale, binning_rules, alpha=WOE_ALPHA):
+    # semua variabel stale dihitung dalam satu batch (woe_iv_batch)
+    # → ({col: (woe_table, iv)}, {col: error})
+    if not stale:
+        return {}, {}
+
+    df_binned = _bin_stale(train, target, stale, binning_rules)
+
+    try:
+        return split_woe_result(woe_iv_batch(df_binned, stale, target, alpha)), {}
+
+    except Exception:
+        # batch gagal → per variabel, supaya error tetap per fitur
+        fresh = {}
+        errors = {}
+
+        for col in stale:
+            try:
+                fresh.update(split_woe_result(woe_iv_batch(df_binned, [col], target, alpha)))
+            except Exception as e:
+                errors[col] = e
+
+        return fresh, errors
+
+
+def woe_tables(project_id, train, target, features, binning_rules, alpha=WOE_ALPHA):
+    # → ({col: (woe_table, iv)}, {col: error}, jumlah variabel yang dihitung ulang)
+    # key = hash train split + target + rule variabel + alpha
+    cache_keys = {
+        col: (
+            f"woe_table:{col}",
+            stage_key(train.hash, target, col, binning_rules.get(col), alpha, BINNING_VERSION)
+        )
+        for col in features
+    }
+
+    cached = load_stage_results(project_id, cache_keys.values())
+
+    stale = [col for col in features if cache_keys[col] not in cached]
+
+    fresh, errors = _woe_stale(train, target, stale, binning_rules, alpha)
+
+    tables = {}
+
+    for col in features:
+        if col in errors:
+            continue
+
+        try:
+            if cache_keys[col] in cached:
+                woe_table, value = cached[cache_keys[col]]
+                tables[col] = (woe_table, value["iv"])
+                continue
+
+            woe_table, iv = fresh[col]
+
+            save_stage_result(
+                project_id,
+                *cache_keys[col],
+                df=woe_table,
+                value={"iv": float(iv)}
+            )
+
+            tables[col] = (woe_table, iv)
+
+        except Exception as e:
+            errors[col] = e
+
+    return tables, errors, len(stale)
+
+
+def build_woe_transformer(train, binning_rules, woe_result, alpha=None):
+    # rules lama tanpa edge quantile → edge di-fit di train sekali,
+    # lalu ikut tersimpan di transformer
+    features = [col for col in woe_result["variabel"].unique() if col in binning_rules]
+    rules = {col: binning_rules[col] for col in features}
+
+    if needs_quantile_fit(rules):
+        df = apply_transformation(train.load(columns=features), rules)
+        rules = fit_binning_rules(df, rules)
+
+    return WoeTransformer.from_woe_result(rules, woe_result, alpha)
+
+
+def load_woe_transformer(project_id, train=None, binning_rules=None):
+    # transformer tersimpan dari halaman WOE; project lama (hanya woe_result)
+    # → dibangun dari woe_result + binning rules
+    model_data = load_model_dataset(project_id, artifacts=("woe_maps", "woe_result"))
+
+    if model_data is None:
+        return None
+
+    if isinstance(model_data.get("woe_maps"), dict):
+        return WoeTransformer.from_dict(model_data["woe_maps"])
+
+    if model_data["woe_result"] is None or train is None or binning_rules is None:
+        return None
+
+    return build_woe_transformer(train, binning_rules, model_data["woe_result"])
+
+
+def woe_columns(project_id, train, features, transformer):
+    # → (df_woe, {col: missing_ratio sebelum fill}, {col: error}, jumlah dihitung ulang)
+    # key = hash train split + rule & tabel WOE variabel (dari transformer)
+    errors = {
+        col: KeyError(f"No WOE table for {col}; run the WOE step first")
+        for col in features
+        if col not in transformer.woe
+    }
+
+    features = [col for col in features if col not in errors]
+
+    cache_keys = {
+        col: (
+            f"woe_column:{col}",
+            stage_key(train.hash, col, transformer.fingerprint(col), BINNING_VERSION)
+        )
+        for col in features
+    }
+
+    cached = load_stage_results(project_id, cache_keys.values())
+
+    stale = [col for col in features if cache_keys[col] not in cached]
+
+    if stale:
+        # 🔥 encoding sama dengan woe_result tersimpan (alpha dari halaman WOE)
+        df_stale = transformer.transform(train.load(columns=stale), stale)
+
+    columns = []
+    missing_ratios = {}
+
+    for col in features:
+        try:
+            if cache_keys[col] in cached:
+                woe_column, value = cached[cache_keys[col]]
+
+                columns.append(woe_column)
+                missing_ratios[col] = value["missing_ratio"]
+
+                continue
+
+            woe_column = df_stale[[col]]
+
+            missing_ratio = float(woe_column[col].isna().mean())
+
+            # fill missing
+            woe_column = woe_column.fillna(0)
+
+            save_stage_result(
+                project_id,
+                *cache_keys[col],
+                df=woe_column,
+                value={"missing_ratio": missing_ratio}
+            )
+
+            columns.append(woe_column)
+            missing_ratios[col] = missing_ratio
+
+        except Exception as e:
+            errors[col] = e
+
+    df_woe = pd.concat(columns, axis=1) if columns else pd.DataFrame()
+
+    return df_woe, missing_ratios, errors, len(stale)
+
+
+def preselection_inputs(project_id, train, target, binning_rules, transformer):
+    # → (df_woe semua variabel WOE, {col: IV}, {col: error}) dari stage cache
+    df_woe, _, errors, _ = woe_columns(
+        project_id,
+        train,
+        transformer.features,
+        transformer
+    )
+
+    alpha = transformer.alpha if transformer.alpha is not None else WOE_ALPHA
+
+    tables, iv_errors, _ = woe_tables(
+        project_id,
+        train,
+        target,
+        list(df_woe.columns),
+        binning_rules,
+        alpha
+    )
+
+    iv = {col: float(value) for col, (_, value) in tables.items()}
+
+    return df_woe, iv, {**errors, **iv_errors}
+
+
+def preselection_shortlist(project_id, features):
+    # shortlist disimpan di params stage pre-selection (bukan artifact features,
+    # yang ditimpa VIF / training) → hanya yang masih punya WOE
+    shortlist = load_stage_params(project_id, "preselection").get("shortlist") or []
+
+    return [col for col in shortlist if col in features]
+
+
+def resample(X, y, sampling_strategy=None):
+    if sampling_strategy:
+        smote = SMOTETomek(
+            sampling_strategy=float(sampling_strategy),
+            random_state=42
+        )
+    else:
+        smote = SMOTETomek(random_state=42)
+
+    return smote.fit_resample(X, y)
+
+
+def fit_logit(X, y):
+    model = sm.Logit(y, sm.add_constant(X)).fit(disp=0)
+
+    coef_df = pd.DataFrame({
+        "index": model.params.index,
+        "Coefficient_final": model.params.values,
+        "std_error": model.bse.values,
+        "p_value": model.pvalues.values
+    })
+
+    intercept = model.params.get("const", 0)
+
+    return model, coef_df, intercept
+
+
+# =====================================================
+# HEADLESS STAGE RUNNERS
+# run_<stage>(project_id, params) → ringkasan (dict)
+# params = parameter terakhir dari UI (+ override)
+# =====================================================
+def _require(value, message):
+    if value is None:
+        raise ValueError(message)
+    return value
+
+
+def _train_handle(project_id):
+    split = _require(load_split(project_id, parts=()), "Split not found")
+    return split["train"]
+
+
+def run_input(project_id, params):
+    path = params.get("path")
+
+    if path is None:
+        # data tidak di-refresh → dataset tersimpan dipakai
+        handle, file_name = open_dataset(project_id)
+        _require(handle, "No dataset saved; pass params['path']")
+        return {"file": file_name, "rows": len(handle), "refreshed": False}
+
+    path = Path(path)
+    type_map = params.get("type_map", {})
+
+    if path.suffix == ".csv":
+        # dtype dikunci dari scan per chunk (sama dengan baca penuh, memory tetap terbatas)
+        dtypes = scan_csv_dtypes(path, CHUNK_ROWS)
+
+        chunks = pd.read_csv(path, chunksize=CHUNK_ROWS, dtype=dtypes)
+        chunks = (apply_type_conversion(chunk, type_map) for chunk in chunks)
+
+        save_dataset_chunks(project_id, chunks, path.name)
+
+    else:
+        df = apply_type_conversion(pd.read_excel(path), type_map)
+        save_dataset(project_id, df, path.name)
+
+    handle, _ = open_dataset(project_id)
+
+    return {"file": path.name, "rows": len(handle), "refreshed": True}
+
+
+def run_preprocessing(project_id, params):
+    config = _require(load_preprocessing(project_id), "Preprocessing not saved")
+    handle, _ = open_dataset(project_id)
+
+    required = config["features"] + [config["target"]]
+    missing = [col for col in required if col not in handle.columns]
+
+    if missing:
+        raise ValueError(f"Columns not found in dataset: {missing}")
+
+    return {"target": config["target"], "features": len(config["features"])}
+
+
+def run_split(project_id, params):
+    if "method" not in params:
+        raise ValueError("No split parameters saved; save a split from the UI first")
+
+    config = _require(load_preprocessing(project_id), "Preprocessing not saved")
+    df, _ = load_dataset(project_id)
+
+    df = apply_imputation(df, config["imputation_rules"])
+
+    train, test, val = split_frame(df, config["target"], **params)
+
+    save_split(project_id, train, test, val, params["method"])
+
+    return {
+        "train": len(train),
+        "test": len(test),
+        "val": len(val) if val is not None else 0
+    }
+
+
+def run_binning(project_id, params):
+    # rules = spesifikasi model (cut points tetap) → hanya divalidasi
+    config = _require(load_preprocessing(project_id), "Preprocessing not saved")
+    rules = _require(load_binning(project_id), "Binning not saved")
+
+    unbinned = [col for col in config["features"] if col not in rules]
+
+    return {"rules": len(rules), "unbinned": unbinned}
+
+
+def run_woe(project_id, params):
+    config = _require(load_preprocessing(project_id), "Preprocessing not saved")
+    rules = _require(load_binning(project_id), "Binning not saved")
+
+    features = params.get("features", config["features"])
+    alpha = params.get("alpha", WOE_ALPHA)
+
+    train = _train_handle(project_id)
+
+    tables, errors, n_stale = woe_tables(
+        project_id,
+        train,
+        config["target"],
+        features,
+        rules,
+        alpha
+    )
+
+    if not tables:
+        raise ValueError("No WOE result generated")
+
+    woe_result = pd.concat([
+        standardize_woe_table(woe_table, col, rules[col])[["variabel", "kategori", "woe"]]
+        for col, (woe_table, _) in tables.items()
+    ], ignore_index=True)
+
+    save_model_dataset(
+        project_id=project_id,
+        features=config["features"],
+        woe_result=woe_result,
+        woe_maps=build_woe_transformer(train, rules, woe_result, alpha).to_dict()
+    )
+
+    return {
+        "iv": {col: float(iv) for col, (_, iv) in tables.items()},
+        "errors": {col: str(e) for col, e in errors.items()},
+        "recomputed": n_stale
+    }
+
+
+def run_preselection(project_id, params):
+    config = _require(load_preprocessing(project_id), "Preprocessing not saved")
+    rules = _require(load_binning(project_id), "Binning not saved")
+
+    train = _train_handle(project_id)
+    transformer = _require(load_woe_transformer(project_id, train, rules), "Run WOE step first")
+
+    df_woe, iv, _ = preselection_inputs(project_id, train, config["target"], rules, transformer)
+
+    shortlist, report = preselect_features(
+        df_woe,
+        iv,
+        iv_min=params.get("iv_min", 0.02),
+        corr_max=params.get("corr_max", 0.6),
+        vif_max=params.get("vif_max", 5.0)
+    )
+
+    _require(shortlist or None, "No variable passed pre-selection")
+
+    save_stage_params(project_id, "preselection", {**params, "shortlist": shortlist})
+
+    return {"features": shortlist, "candidates": len(report)}
+
+
+def run_vif(project_id, params):
+    rules = _require(load_binning(project_id), "Binning not saved")
+    train = _train_handle(project_id)
+    transformer = _require(load_woe_transformer(project_id, train, rules), "Run WOE step first")
+
+    # default sama dengan halaman VIF: shortlist pre-selection, kalau tidak ada semua variabel WOE
+    config = _require(load_preprocessing(project_id), "Preprocessing not saved")
+    woe_features = [col for col in config["features"] if col in transformer.woe]
+
+    features = _require(
+        params.get("features") or preselection_shortlist(project_id, woe_features) or woe_features,
+        "No WOE variables available"
+    )
+
+    df_woe, _, errors, n_stale = woe_columns(project_id, train, features, transformer)
+
+    if errors:
+        raise ValueError(f"WOE transformation failed: { {col: str(e) for col, e in errors.items()} }")
+
+    save_model_dataset(project_id, df_woe[features], features)
+
+    return {"features": features, "recomputed": n_stale}
+
+
+def run_smote(project_id, params):
+    model_data = _require(
+        load_model_dataset(project_id, artifacts=("features",)),
+        "Run VIF step first"
+    )
+
+    source = "smote" if params.get("use_smote") else "original"
+
+    save_model_dataset(
+        project_id,
+        features=model_data["features"],
+        source=source
+    )
+
+    return {"source": source}
+
+
+def run_training(project_id, params):
+    config = _require(load_preprocessing(project_id), "Preprocessing not saved")
+    model_data = _require(
+        load_model_dataset(project_id, artifacts=("df_woe", "features")),
+        "Run VIF step first"
+    )
+
+    split = load_split(project_id, parts=("train",), columns=[config["target"]])
+
+    df_woe = model_data["df_woe"]
+    features = params.get("features", model_data["features"])
+    selected = [col for col in features if col in df_woe.columns]
+
+    X = df_woe[selected].reset_index(drop=True)
+    y = split["train"][config["target"]].reset_index(drop=True)
+
+    # 🔥 dari params stage SMOTE (artifact source bisa ditimpa save lain)
+    smote_params = load_stage_params(project_id, "smote")
+
+    if smote_params.get("use_smote"):
+        X, y = resample(X, y, smote_params.get("sampling_strategy"))
+
+    model, coef_df, intercept = fit_logit(X, y)
+
+    save_model_dataset(
+        project_id=project_id,
+        features=selected,
+        coef_df=coef_df,
+        intercept=intercept
+    )
+
+    save_model(project_id, model, selected)
+
+    return {"features": selected, "pseudo_r2": float(model.prsquared)}
+
+
+def run_performance(project_id, params):
+    # report interaktif → headless hanya cek prasyarat
+    model_data = _require(
+        load_model_dataset(project_id, artifacts=("coef_df", "intercept")),
+        "Model not trained"
+    )
+
+    _require(model_data["coef_df"], "Model not trained")
+    split = _require(load_split(project_id, parts=()), "Split not found")
+
+    return {"test_rows": len(split["test"])}
+
+
+STAGE_RUNNERS = {
+    "input": run_input,
+    "preprocessing": run_preprocessing,
+    "split": run_split,
+    "binning": run_binning,
+    "woe": run_woe,
+    "preselection": run_preselection,
+    "vif": run_vif,
+    "smote": run_smote,
+    "training": run_training,
+    "performance": run_performance,
+}
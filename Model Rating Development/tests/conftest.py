@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# root app (modules / utils / database / pipeline diimport tanpa package)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # DB + artifact store baru per test (DB_PATH relatif: storage/app.db)
+    import database.db as database
+    from database.models import create_tables
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "storage").mkdir()
+
+    # koneksi pool lama menunjuk DB test sebelumnya
+    database.get_pool().close()
+
+    create_tables()
+
+    yield tmp_path
+
+    database.get_pool().close()
@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+
+import database.crud as crud
+from database.artifacts import artifact_path, collect_garbage
+from database.crud import create_project, delete_project, load_dataset, save_dataset, save_model_dataset
+from database.db import transaction
+
+
+@pytest.fixture
+def projects(db, monkeypatch):
+    # vacuum background tidak relevan di sini
+    monkeypatch.setattr(crud, "schedule_vacuum", lambda: None)
+
+    create_project("a")
+    create_project("b")
+
+    return 1, 2
+
+
+def _artifact(hash_value):
+    with transaction() as cursor:
+        cursor.execute("SELECT refcount, format FROM artifacts WHERE hash = ?", (hash_value,))
+        row = cursor.fetchone()
+
+    return dict(row) if row else None
+
+
+def _dataset_hash(project_id):
+    with transaction() as cursor:
+        cursor.execute("SELECT data_hash FROM datasets WHERE project_id = ?", (project_id,))
+        return cursor.fetchone()["data_hash"]
+
+
+def _purge():
+    with transaction(write=True) as cursor:
+        return collect_garbage(cursor, grace_seconds=0)
+
+
+def test_refcount_follows_references(projects):
+    df = pd.DataFrame({"x": range(10), "y": list("ab") * 5})
+
+    save_dataset(1, df, "a.csv")
+    hash_value = _dataset_hash(1)
+    assert _artifact(hash_value)["refcount"] == 1
+
+    # isi sama → artifact yang sama (content-addressed)
+    save_dataset(2, df, "b.csv")
+    assert _dataset_hash(2) == hash_value
+    assert _artifact(hash_value)["refcount"] == 2
+
+    save_model_dataset(1, df_woe=df)
+    assert _artifact(hash_value)["refcount"] == 3
+
+    # replace → referensi lama dilepas
+    save_model_dataset(1, df_woe=df.head(3))
+    assert _artifact(hash_value)["refcount"] == 2
+
+
+def test_shared_artifact_survives_delete(projects):
+    shared = pd.DataFrame({"x": range(10)})
+    own = pd.DataFrame({"x": range(20)})
+
+    save_dataset(1, shared, "a.csv")
+    save_dataset(2, shared, "b.csv")
+    save_model_dataset(1, df_woe=own)
+
+    shared_hash = _dataset_hash(1)
+
+    with transaction() as cursor:
+        cursor.execute("SELECT artifact_hash FROM model_artifacts WHERE project_id = 1")
+        own_hash = cursor.fetchone()["artifact_hash"]
+
+    own_info = _artifact(own_hash)
+    delete_project(1)
+
+    # metadata langsung hilang, file masih dilindungi grace period
+    assert _artifact(own_hash) is None
+    assert artifact_path(own_hash, own_info["format"]).exists()
+
+    assert _purge() == 1
+    assert not artifact_path(own_hash, own_info["format"]).exists()
+
+    assert _artifact(shared_hash)["refcount"] == 1
+    df, _ = load_dataset(2)
+    pd.testing.assert_frame_equal(df, shared)
+
+
+def test_unreferenced_file_purged(projects):
+    save_dataset(1, pd.DataFrame({"x": [1, 2, 3]}), "a.csv")
+    hash_value = _dataset_hash(1)
+    fmt = _artifact(hash_value)["format"]
+
+    save_dataset(1, pd.DataFrame({"x": [4, 5, 6]}), "a.csv")
+
+    assert _artifact(hash_value)["refcount"] == 0
+    _purge()
+
+    assert _artifact(hash_value) is None
+    assert not artifact_path(hash_value, fmt).exists()
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.binning import (
+    apply_binning,
+    bin_codes,
+    compile_binning_plan,
+    sketch_bin_features,
+    MISSING_LABEL
+)
+from utils.woe import WoeTransformer
+
+
+CUTS = [-3.4567891, 0.123456789, 2.123456789]
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    x = pd.Series(rng.normal(size=2000))
+    x[:20] = np.nan
+    # nilai tepat di cut point → bin kiri (right-closed)
+    x[20:23] = CUTS
+    return x
+
+
+def _legacy_cut(x, separate_missing):
+    # implementasi lama: pd.cut langsung
+    result = pd.cut(x, bins=[-np.inf] + CUTS + [np.inf])
+
+    if not separate_missing:
+        return result
+
+    result = result.astype(object).astype(str)
+    result[x.isna()] = MISSING_LABEL
+    return result
+
+
+def test_cut_labels_match_pd_cut():
+    plan = compile_binning_plan({
+        "x": {"type": "numeric", "mode": "manual", "cut_points": CUTS}
+    })
+
+    expected = pd.cut([], bins=[-np.inf] + CUTS + [np.inf]).categories.astype(str)
+
+    assert plan["x"]["labels"] == list(expected)
+    assert "(-3.457, 0.123]" in plan["x"]["labels"]
+
+
+@pytest.mark.parametrize("separate_missing", [False, True])
+def test_apply_binning_matches_pd_cut(values, separate_missing):
+    rules = {
+        "x": {
+            "type": "numeric",
+            "mode": "manual",
+            "cut_points": CUTS,
+            "separate_missing": separate_missing
+        }
+    }
+
+    binned = apply_binning(pd.DataFrame({"x": values}), rules)["x"]
+    legacy = _legacy_cut(values, separate_missing)
+
+    assert binned.isna().equals(pd.Series(legacy).isna())
+
+    mask = binned.notna().to_numpy()
+    assert (binned.astype(str).to_numpy()[mask] == pd.Series(legacy).astype(str).to_numpy()[mask]).all()
+
+
+def test_bin_codes_right_closed(values):
+    plan = compile_binning_plan({
+        "x": {"type": "numeric", "mode": "manual", "cut_points": CUTS}
+    })
+
+    codes, labels = bin_codes(pd.DataFrame({"x": values}), plan)["x"]
+
+    expected = pd.cut(values, bins=[-np.inf] + CUTS + [np.inf]).cat.codes.to_numpy()
+
+    np.testing.assert_array_equal(codes, expected)
+    assert len(labels) == len(CUTS) + 1
+
+
+def test_categorical_mapping_fallback():
+    rules = {
+        "c": {
+            "type": "categorical",
+            "mode": "manual",
+            "mapping": {"a": "A", "b": "A", "c": "C"},
+            "separate_missing": True
+        }
+    }
+
+    plan = compile_binning_plan(rules)
+    codes, labels = bin_codes(pd.DataFrame({"c": ["a", "b", "c", "z", None]}), plan)["c"]
+
+    assert [labels[code] for code in codes] == ["A", "A", "C", MISSING_LABEL, MISSING_LABEL]
+
+
+def test_transformer_rejects_stale_labels(values):
+    rules = {"x": {"type": "numeric", "mode": "manual", "cut_points": CUTS}}
+
+    # label presisi penuh (format lama) tidak dikenal plan → error, bukan WOE 0
+    stale = WoeTransformer(rules, {"x": {"(-3.4567891, 0.123456789]": 0.3}})
+
+    with pytest.raises(ValueError, match="re-run WOE"):
+        stale.transform(pd.DataFrame({"x": values}))
+
+    fresh = WoeTransformer(rules, {"x": {"(-3.457, 0.123]": 0.3}})
+    result = fresh.transform(pd.DataFrame({"x": values}))
+
+    inside = (values > CUTS[0]) & (values <= CUTS[1])
+    assert np.allclose(result["x"][inside], 0.3)
+
+
+# =====================================================
+# AUTO-BIN: SKETCH (streaming)
+# =====================================================
+@pytest.fixture
+def train():
+    rng = np.random.default_rng(3)
+    n = 20_000
+
+    x1 = rng.normal(size=n)
+    x2 = rng.uniform(0, 10, size=n)
+    x2[rng.random(n) < 0.05] = np.nan
+
+    logit = -2 + 1.2 * x1 - 0.2 * np.nan_to_num(x2, nan=5)
+    y = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int)
+
+    return pd.DataFrame({"x1": x1, "x2": x2, "y": y})
+
+
+def test_sketch_bin_features_end_to_end(train):
+    chunks = (train.iloc[i:i + 4000] for i in range(0, len(train), 4000))
+    seen = []
+
+    results = sketch_bin_features(
+        chunks,
+        "y",
+        ["x1", "x2"],
+        monotonic_trend="auto",
+        separate_missing={"x2": True},
+        time_limit=30,
+        max_workers=1,
+        on_result=seen.append
+    )
+
+    assert [r["feature"] for r in results] == ["x1", "x2"]
+    assert sorted(r["feature"] for r in seen) == ["x1", "x2"]
+
+    for result in results:
+        assert result["error"] is None
+        assert result["status"] == "OPTIMAL"
+
+        splits = result["splits"]
+        assert splits and splits == sorted(splits)
+
+        # bin sketch bisa langsung dipakai apply_binning
+        col = result["feature"]
+        rules = {col: {"type": "numeric", "mode": "manual", "cut_points": splits, "separate_missing": col == "x2"}}
+        binned = apply_binning(train, rules)[col]
+        assert binned.notna().all()
+        assert binned.nunique() == len(splits) + 1 + (col == "x2")
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from database.crud import create_project, load_model_dataset, save_model_dataset
+from database.db import transaction
+from database.status import load_pipeline_status
+
+
+@pytest.fixture
+def project(db):
+    create_project("a")
+
+    df_woe = pd.DataFrame({"x_woe": [0.1, -0.2, 0.3], "y": [0, 1, 0]})
+    woe_result = pd.DataFrame({"feature": ["x"], "iv": [0.12]})
+
+    save_model_dataset(1, df_woe=df_woe, woe_result=woe_result, woe_maps={"x": {"A": 0.1}})
+    save_model_dataset(1, features=["x_woe"], source="smote")
+
+    return 1, df_woe, woe_result
+
+
+def _updated_at():
+    with transaction() as cursor:
+        cursor.execute("SELECT name, updated_at FROM model_artifacts WHERE project_id = 1")
+        return {row["name"]: row["updated_at"] for row in cursor.fetchall()}
+
+
+def test_partial_save_keeps_other_artifacts(project):
+    project_id, df_woe, woe_result = project
+
+    save_model_dataset(project_id, features=["x_woe", "y"])
+    data = load_model_dataset(project_id)
+
+    assert data["features"] == ["x_woe", "y"]
+    # source tidak dikirim → nilai lama tetap
+    assert data["source"] == "smote"
+    pd.testing.assert_frame_equal(data["df_woe"], df_woe)
+    pd.testing.assert_frame_equal(data["woe_result"], woe_result)
+
+
+def test_partial_save_only_touches_sent_rows(project):
+    project_id, *_ = project
+
+    with transaction(write=True) as cursor:
+        cursor.execute("UPDATE model_artifacts SET updated_at = '2000-01-01'")
+
+    save_model_dataset(project_id, coef_df=pd.DataFrame({"coef": [np.float64(1.5)]}), intercept=-2.0)
+    stamps = _updated_at()
+
+    assert {name for name, stamp in stamps.items() if stamp != "2000-01-01"} == {"coef_df", "intercept"}
+
+
+def test_load_subset(project):
+    project_id, *_ = project
+
+    data = load_model_dataset(project_id, artifacts=["features"])
+
+    assert data["features"] == ["x_woe"]
+    assert data["df_woe"] is None
+
+
+def test_unchanged_save_keeps_downstream(project):
+    project_id, *_ = project
+
+    save_model_dataset(project_id, coef_df=pd.DataFrame({"coef": [1.0]}), intercept=-2.0)
+    assert load_pipeline_status(project_id)["training"]["status"] == "done"
+
+    # rerun identik → training tidak jadi stale
+    save_model_dataset(project_id, features=["x_woe"], source="smote")
+    assert load_pipeline_status(project_id)["training"]["status"] == "done"
+
+    save_model_dataset(project_id, features=["x_woe"], source="original")
+    assert load_pipeline_status(project_id)["training"]["status"] == "stale"
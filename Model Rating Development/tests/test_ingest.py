@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from database.crud import create_project, load_dataset, save_dataset_chunks
+from utils.helpers import promote_dtype, scan_csv_dtypes
+
+CHUNK = 1000
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    rng = np.random.default_rng(1)
+    n = 5 * CHUNK
+
+    flag = rng.random(n) < 0.3
+
+    df = pd.DataFrame({
+        # bool, NaN hanya di chunk terakhir
+        "b": pd.Series(flag, dtype=object),
+        # bool, chunk pertama kosong semua
+        "b_empty": pd.Series(~flag, dtype=object),
+        # bool tanpa NaN
+        "b_full": flag,
+        # int, satu chunk kosong → float
+        "i": pd.Series(np.arange(n), dtype="float64"),
+        "f": rng.normal(size=n),
+        "s": rng.choice(["x", "y", "z"], size=n)
+    })
+
+    df.loc[n - 3:, "b"] = np.nan
+    df.loc[:CHUNK - 1, "b_empty"] = np.nan
+    df.loc[2 * CHUNK:3 * CHUNK - 1, "i"] = np.nan
+
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+
+    return path
+
+
+def _one_shot(path):
+    # referensi: baca penuh sekali (bool + NaN → object berisi True / False / nan)
+    df = pd.read_csv(path, low_memory=False)
+
+    for col in ("b", "b_empty"):
+        assert set(df[col].dropna().map(type)) == {bool}
+        df[col] = df[col].astype("boolean")
+
+    return df
+
+
+def test_scan_matches_one_shot(csv_file):
+    dtypes = scan_csv_dtypes(csv_file, CHUNK)
+    expected = _one_shot(csv_file).dtypes.to_dict()
+
+    assert dtypes == expected
+
+
+def test_chunked_ingest_parity(db, csv_file):
+    create_project("a")
+
+    # sama dengan run_input: dtype dikunci dari scan → read_csv per chunk → parquet
+    dtypes = scan_csv_dtypes(csv_file, CHUNK)
+    save_dataset_chunks(1, pd.read_csv(csv_file, chunksize=CHUNK, dtype=dtypes), csv_file.name)
+
+    df, _ = load_dataset(1)
+
+    expected = _one_shot(csv_file)
+    pd.testing.assert_frame_equal(df, expected)
+
+    # nilai bool tetap bool (bukan string 'True')
+    assert df["b"].iloc[0] in (True, False)
+    assert df["b"].isna().sum() == 3
+
+
+@pytest.mark.parametrize("left, right, expected", [
+    ("int64", "float64", "float64"),
+    ("bool", "boolean", "boolean"),
+    ("bool", "float64", "object"),
+    ("int64", "object", "object"),
+])
+def test_promote_dtype(left, right, expected):
+    assert str(promote_dtype(pd.api.types.pandas_dtype(left), pd.api.types.pandas_dtype(right))) == expected
@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+
+from utils.metrics import (
+    bootstrap_ci,
+    delong_ci,
+    discrimination_metrics,
+    exact_metrics,
+    histogram_metrics,
+    metrics_ci_table,
+)
+
+
+def naive_auroc(score, target):
+    # P(skor bad > skor good) + ½ P(sama), semua pasangan
+    bad = score[target == 1]
+    good = score[target == 0]
+
+    diff = bad[:, None] - good[None, :]
+
+    return ((diff > 0).sum() + 0.5 * (diff == 0).sum()) / diff.size
+
+
+def naive_ks(score, target):
+    thresholds = np.unique(score)
+
+    bad = np.array([(score[target == 1] <= t).mean() for t in thresholds])
+    good = np.array([(score[target == 0] <= t).mean() for t in thresholds])
+
+    return np.abs(bad - good).max()
+
+
+@pytest.fixture
+def sample():
+    rng = np.random.default_rng(5)
+    n = 3000
+
+    target = (rng.random(n) < 0.15).astype(int)
+    # dibulatkan → banyak tie
+    score = np.round(rng.normal(size=n) + 0.8 * target, 1)
+
+    return score, target
+
+
+def test_exact_matches_naive(sample):
+    score, target = sample
+
+    metrics, table = exact_metrics(score, target)
+
+    assert metrics["auroc"] == pytest.approx(naive_auroc(score, target), abs=1e-12)
+    assert metrics["ks"] == pytest.approx(naive_ks(score, target), abs=1e-12)
+    assert metrics["gini"] == pytest.approx(2 * metrics["auroc"] - 1)
+
+    assert table["total"].sum() == len(score)
+    assert table["bad"].sum() == target.sum()
+
+
+def test_orientation(sample):
+    score, target = sample
+
+    high_bad, _ = exact_metrics(score, target, higher_is_bad=True)
+    low_bad, _ = exact_metrics(-score, target, higher_is_bad=False)
+
+    assert high_bad["auroc"] == pytest.approx(low_bad["auroc"])
+
+
+def test_histogram_close_to_exact(sample):
+    rng = np.random.default_rng(6)
+    target = (rng.random(200_000) < 0.1).astype(int)
+    score = rng.normal(size=len(target)) + target
+
+    exact, _ = exact_metrics(score, target)
+    approx, _ = histogram_metrics(score, target, n_bins=2000)
+
+    assert approx["auroc"] == pytest.approx(exact["auroc"], abs=1e-3)
+    assert approx["ks"] == pytest.approx(exact["ks"], abs=5e-3)
+
+
+def test_nan_dropped_and_dispatch(sample):
+    score, target = sample
+    score = score.astype(float).copy()
+    score[:10] = np.nan
+
+    metrics, _ = discrimination_metrics(score, target, method="exact")
+    expected, _ = exact_metrics(score[10:], target[10:])
+
+    assert metrics == expected
+
+
+def test_single_class_raises():
+    with pytest.raises(ValueError):
+        exact_metrics([0.1, 0.2], [0, 0])
+
+
+# =====================================================
+# CONFIDENCE INTERVAL (DeLong / bootstrap)
+# =====================================================
+def naive_delong_se(score, target):
+    # structural components langsung dari matriks pasangan (DeLong 1988)
+    bad = score[target == 1]
+    good = score[target == 0]
+
+    diff = bad[:, None] - good[None, :]
+    psi = (diff > 0) + 0.5 * (diff == 0)
+
+    v10 = psi.mean(axis=1)
+    v01 = psi.mean(axis=0)
+
+    return np.sqrt(v10.var(ddof=1) / len(bad) + v01.var(ddof=1) / len(good))
+
+
+def test_delong_matches_naive(sample):
+    score, target = sample
+
+    ci = delong_ci(score, target)
+    auroc, low, high = ci["auroc"]
+
+    assert auroc == pytest.approx(naive_auroc(score, target), abs=1e-12)
+    assert ci["se"] == pytest.approx(naive_delong_se(score, target), rel=1e-9)
+    assert low < auroc < high
+
+    gini, gini_low, gini_high = ci["gini"]
+    assert gini == pytest.approx(2 * auroc - 1)
+    assert gini_low == pytest.approx(2 * low - 1)
+    assert gini_high == pytest.approx(2 * high - 1)
+
+
+def test_delong_too_few_bads():
+    with pytest.raises(ValueError):
+        delong_ci([0.1, 0.2, 0.3], [0, 0, 1])
+
+
+def test_bootstrap_independent_of_workers(sample):
+    score, target = sample
+
+    single = bootstrap_ci(score, target, n_boot=200, seed=7, max_workers=1)
+    pooled = bootstrap_ci(score, target, n_boot=200, seed=7, max_workers=2)
+
+    assert single == pooled
+
+    # CI bootstrap ≈ CI DeLong
+    low, high = single["auroc"][1:]
+    delong = delong_ci(score, target)["auroc"]
+    assert low == pytest.approx(delong[1], abs=0.02)
+    assert high == pytest.approx(delong[2], abs=0.02)
+
+
+def test_metrics_ci_table(sample):
+    score, target = sample
+
+    table = metrics_ci_table(score, target)
+    assert list(table.columns) == ["metric", "estimate", "lower", "upper", "method"]
+    assert list(table["metric"]) == ["AUROC", "GINI"]
+
+    table = metrics_ci_table(score, target, n_boot=100, max_workers=1)
+    assert list(table["metric"]) == ["AUROC", "GINI", "AUROC", "GINI", "KS"]
+    assert (table["lower"] <= table["upper"]).all()
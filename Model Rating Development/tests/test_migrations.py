@@ -0,0 +1,75 @@
+import pytest
+
+from database import migrations
+from database.db import transaction
+from database.migrations import MIGRATIONS, run_migrations, schema_version
+
+
+def _version():
+    with transaction() as cursor:
+        return schema_version(cursor)
+
+
+def _tables():
+    with transaction() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger', 'index')")
+        return sorted(row["name"] for row in cursor.fetchall())
+
+
+def test_latest_version(db):
+    assert _version() == MIGRATIONS[-1][0]
+
+    for table in ("projects", "artifacts", "model_artifacts", "pipeline_status"):
+        assert table in _tables()
+
+
+def test_rerun_is_noop(db):
+    before = _tables()
+
+    # paksa runner jalan lagi (cache per process dikosongkan)
+    migrations._migrated.clear()
+    run_migrations()
+
+    assert _version() == MIGRATIONS[-1][0]
+    assert _tables() == before
+
+
+def test_preselection_inherits_woe_status(db):
+    with transaction(write=True) as cursor:
+        cursor.execute("INSERT INTO projects (name) VALUES ('a'), ('b')")
+        cursor.executemany("""
+            INSERT INTO pipeline_status (project_id, stage, status) VALUES (?, 'woe', ?)
+        """, [(1, "done"), (2, "failed")])
+        cursor.execute("PRAGMA user_version = 8")
+
+    migrations._migrated.clear()
+    run_migrations()
+
+    with transaction() as cursor:
+        cursor.execute("""
+            SELECT project_id, status FROM pipeline_status WHERE stage = 'preselection'
+        """)
+        rows = {row["project_id"]: row["status"] for row in cursor.fetchall()}
+
+    assert _version() == 9
+    assert rows == {1: "done"}
+
+
+@pytest.mark.parametrize("table", ["model_artifacts", "pipeline_status"])
+def test_project_cascade(db, table):
+    with transaction(write=True) as cursor:
+        cursor.execute("INSERT INTO projects (name) VALUES ('a')")
+
+        if table == "model_artifacts":
+            cursor.execute("""
+                INSERT INTO model_artifacts (project_id, name, value) VALUES (1, 'features', '[]')
+            """)
+        else:
+            cursor.execute("""
+                INSERT INTO pipeline_status (project_id, stage, status) VALUES (1, 'woe', 'done')
+            """)
+
+        cursor.execute("DELETE FROM projects WHERE id = 1")
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+
+        assert cursor.fetchone()[0] == 0
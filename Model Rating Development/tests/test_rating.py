@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.rating import assign_rules, map_with_rules, validate_rules, UNKNOWN_LABEL
+
+
+RULE_SETS = {
+    "contiguous": [("A", 0.0, 0.1), ("B", 0.1, 0.3), ("C", 0.3, 1.0)],
+    "gap": [("A", 0.0, 0.1), ("B", 0.2, 0.3), ("C", 0.3, 1.0)],
+    "overlap": [("A", 0.0, 0.2), ("B", 0.1, 0.3), ("C", 0.3, 1.0)],
+    "nested": [("A", 0.0, 0.5), ("B", 0.1, 0.2), ("C", 0.5, 1.0)],
+    "duplicate_name": [("A", 0.0, 0.1), ("B", 0.1, 0.3), ("A", 0.3, 1.0)],
+    "score": [("L", 300, 500), ("M", 500, 650), ("H", 650, 850)],
+}
+
+
+@pytest.mark.parametrize("name", list(RULE_SETS))
+def test_assign_rules_matches_map_with_rules(name):
+    rules = RULE_SETS[name]
+
+    rng = np.random.default_rng(2)
+    low, high = rules[0][1], rules[-1][2]
+
+    values = np.concatenate([
+        rng.uniform(low - 0.1 * (high - low), high * 1.1, 5000),
+        # batas rule persis + NaN
+        [bound for _, a, b in rules for bound in (a, b)],
+        [np.nan]
+    ])
+
+    series = pd.Series(values, index=np.arange(len(values)) * 3)
+
+    result = assign_rules(series, rules)
+    expected = series.map(lambda x: map_with_rules(x, rules))
+
+    assert result.index.equals(series.index)
+    assert result.astype(str).tolist() == expected.astype(str).tolist()
+
+
+def test_assign_rules_empty():
+    result = assign_rules(pd.Series([0.1, 0.5]), [])
+
+    assert result.astype(str).tolist() == [UNKNOWN_LABEL, UNKNOWN_LABEL]
+
+
+def test_validate_rules():
+    assert validate_rules(RULE_SETS["contiguous"]) == []
+
+    # rule bersarang = overlap, tapi bukan gap (rule terluar masih menutup)
+    nested = validate_rules(RULE_SETS["nested"])
+    assert any("overlaps" in issue for issue in nested)
+    assert not any("Gap" in issue for issue in nested)
+
+    assert any("Gap" in issue for issue in validate_rules(RULE_SETS["gap"]))
+    assert any("overlaps" in issue for issue in validate_rules(RULE_SETS["overlap"]))
+    assert any("Duplicate" in issue for issue in validate_rules(RULE_SETS["duplicate_name"]))
+    assert any("min" in issue for issue in validate_rules([("A", 0.5, 0.1)]))
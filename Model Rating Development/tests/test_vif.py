@@ -0,0 +1,78 @@
+import inspect
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.vif import calculate_vif, drop_high_vif, gram_matrix, vif_from_gram
+
+variance_inflation_factor = pytest.importorskip(
+    "statsmodels.stats.outliers_influence"
+).variance_inflation_factor
+
+# statsmodels >= 0.15 menstandardisasi X secara default (VIF centered)
+_HAS_STANDARDIZE = "standardize" in inspect.signature(variance_inflation_factor).parameters
+
+
+def statsmodels_vif(X, i, centered=False):
+    if _HAS_STANDARDIZE:
+        return variance_inflation_factor(X, i, standardize=centered)
+
+    if centered:
+        X = np.column_stack([np.ones(len(X)), X])
+        return variance_inflation_factor(X, i + 1)
+
+    return variance_inflation_factor(X, i)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    n = 500
+
+    df = pd.DataFrame({f"x{i}": rng.normal(size=n) for i in range(4)})
+    df["x4"] = df["x0"] * 0.8 + rng.normal(scale=0.3, size=n)
+    # hampir kolinear dengan x1 + x2 → VIF sangat tinggi
+    df["x5"] = df["x1"] + df["x2"] + rng.normal(scale=0.01, size=n)
+
+    return df
+
+
+def test_uncentered_matches_statsmodels(frame):
+    X = frame.to_numpy()
+
+    expected = [statsmodels_vif(X, i) for i in range(X.shape[1])]
+
+    np.testing.assert_allclose(calculate_vif(frame)["vif"], expected, rtol=1e-6)
+
+
+def test_centered_matches_statsmodels(frame):
+    X = frame.to_numpy()
+
+    expected = [statsmodels_vif(X, i, centered=True) for i in range(X.shape[1])]
+
+    np.testing.assert_allclose(calculate_vif(frame, centered=True)["vif"], expected, rtol=1e-6)
+
+
+def test_collinear_and_zero_columns():
+    rng = np.random.default_rng(4)
+    A = rng.normal(size=(200, 3))
+
+    # x3 = x0 + x1 (kolinear sempurna), x4 independen, x5 nol
+    A = np.column_stack([A, A[:, 0] + A[:, 1], rng.normal(size=200), np.zeros(200)])
+
+    vif = vif_from_gram(gram_matrix(A))
+
+    assert np.isinf(vif[[0, 1, 3]]).all()
+    assert np.isfinite(vif[[2, 4]]).all()
+    assert np.isnan(vif[5])
+
+
+def test_drop_high_vif(frame):
+    keep, history = drop_high_vif(frame, threshold=10)
+
+    assert len(keep) == frame.shape[1] - 1
+    assert history["variable"].iloc[0] in ("x1", "x2", "x5")
+
+    remaining = calculate_vif(frame[keep])["vif"]
+    assert (remaining <= 10).all()
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.woe import calculate_woe_iv, woe_iv_batch, split_woe_result, woe_lookup, WOE_COLUMNS
+
+
+@pytest.fixture
+def binned():
+    rng = np.random.default_rng(1)
+    n = 5000
+
+    df = pd.DataFrame({
+        "num": pd.cut(rng.normal(size=n), bins=[-np.inf, -1, 0, 1, np.inf]),
+        "cat": rng.choice(["a", "b", "c", None], n),
+        "txt": rng.choice(["x", "y", "nan"], n),
+        "y": (rng.random(n) < 0.2).astype(int)
+    })
+
+    df.loc[:50, "num"] = np.nan
+
+    return df
+
+
+@pytest.mark.parametrize("alpha", [0.05, 0.5])
+def test_batch_matches_per_feature(binned, alpha):
+    features = ["num", "cat", "txt"]
+
+    batch = split_woe_result(woe_iv_batch(binned, features, "y", alpha))
+
+    for col in features:
+        expected, expected_iv = calculate_woe_iv(binned, col, "y", alpha)
+        table, iv = batch[col]
+
+        assert list(table.columns) == WOE_COLUMNS
+        assert table["bin"].astype(str).tolist() == expected["bin"].astype(str).tolist()
+
+        for column in ["total", "bad", "good", "woe", "iv_contrib"]:
+            np.testing.assert_allclose(table[column], expected[column], rtol=1e-12)
+
+        assert iv == pytest.approx(expected_iv, rel=1e-12)
+
+
+def test_woe_lookup_unseen_policies():
+    mapping = {"A": 0.5, "Missing": -0.2}
+    labels = ["A", "B", "nan"]
+
+    # [A, B, nan → Missing, kode -1 → Missing]
+    assert np.allclose(woe_lookup(labels, mapping, "missing"), [0.5, -0.2, -0.2, -0.2])
+    assert np.allclose(woe_lookup(labels, mapping, "zero"), [0.5, 0.0, -0.2, -0.2])
+    assert np.isnan(woe_lookup(labels, mapping, "nan")[1])
+
+    with pytest.raises(ValueError):
+        woe_lookup(labels, mapping, "error")
@@ -1,6 +1,9 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import numpy as np
-from optbinning import OptimalBinning
+from optbinning import OptimalBinning, OptimalBinningSketch
 
 
 # =====================================================
@@ -33,6 +36,50 @@ def create_numeric_bins(series, n_bins=5, separate_missing=False):
     return result
 
 
+# =====================================================
+# QUANTILE FIT (EDGE DARI TRAIN)
+# edge disimpan di rules → test / validation / scoring
+# cukup searchsorted, tanpa qcut ulang
+# =====================================================
+def quantile_edges(series, n_bins=5):
+    values = pd.to_numeric(series, errors="coerce").dropna()
+
+    if values.empty:
+        return []
+
+    _, edges = pd.qcut(values, q=n_bins, duplicates="drop", retbins=True)
+
+    # edge luar diganti -inf / inf saat apply → data di luar range train tetap masuk
+    return [float(edge) for edge in edges[1:-1]]
+
+
+def needs_quantile_fit(rules):
+    return any(
+        rule["type"] == "numeric"
+        and rule["mode"] == "quantile"
+        and "edges" not in rule
+        for rule in rules.values()
+    )
+
+
+def fit_binning_rules(df, rules):
+    # df = data train yang SUDAH di-apply_transformation
+    fitted = {}
+
+    for col, rule in rules.items():
+
+        if (
+            rule["type"] == "numeric"
+            and rule["mode"] == "quantile"
+            and "edges" not in rule
+        ):
+            rule = {**rule, "edges": quantile_edges(df[col], rule["n_bins"])}
+
+        fitted[col] = rule
+
+    return fitted
+
+
 # =====================================================
 # CATEGORICAL BINNING
 # =====================================================
@@ -116,14 +163,7 @@ def create_optimal_bins(
         x = series_clean
         y = target
 
-    optb = OptimalBinning(
-        dtype="numerical",
-        solver="mip",
-        monotonic_trend=monotonic_trend,
-        max_n_prebins=20
-    )
-
-    optb.fit(x, y)
+    optb = fit_optimal_splits(x, y, monotonic_trend=monotonic_trend)
 
     bins = optb.transform(x, metric="bins")
 
@@ -138,6 +178,184 @@ def create_optimal_bins(
     return result, optb
 
 
+def fit_optimal_splits(x, y, monotonic_trend="auto", time_limit=100):
+    optb = OptimalBinning(
+        dtype="numerical",
+        solver="mip",
+        monotonic_trend=monotonic_trend,
+        max_n_prebins=20,
+        time_limit=time_limit
+    )
+
+    optb.fit(x, y)
+
+    return optb
+
+
+# =====================================================
+# AUTO-BIN (PARALLEL)
+# satu proses per fitur, time_limit = batas waktu solver MIP per fitur
+# =====================================================
+def _auto_bin_worker(col, x, y, monotonic_trend, separate_missing, time_limit):
+    start = time.perf_counter()
+
+    try:
+        if separate_missing:
+            non_missing = ~np.isnan(x)
+            x, y = x[non_missing], y[non_missing]
+
+        optb = fit_optimal_splits(x, y, monotonic_trend, time_limit)
+
+        return {
+            "feature": col,
+            "splits": [float(split) for split in optb.splits],
+            "status": optb.status,
+            "seconds": time.perf_counter() - start,
+            "error": None
+        }
+
+    except Exception as e:
+        return {
+            "feature": col,
+            "splits": None,
+            "status": "FAILED",
+            "seconds": time.perf_counter() - start,
+            "error": str(e)
+        }
+
+
+def auto_bin_features(
+    df,
+    target,
+    features,
+    monotonic_trend="auto",
+    separate_missing=None,
+    time_limit=60,
+    max_workers=None,
+    on_result=None
+):
+    # df = data train yang SUDAH di-apply_transformation
+    # separate_missing: {fitur: bool}
+    separate_missing = separate_missing or {}
+    y = df[target].to_numpy()
+
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(
+                _auto_bin_worker,
+                col,
+                _numeric_values(df[col]),
+                y,
+                monotonic_trend,
+                separate_missing.get(col, False),
+                time_limit
+            )
+            for col in features
+        ]
+
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["feature"]] = result
+
+            if on_result:
+                on_result(result)
+
+    return [results[col] for col in features]
+
+
+# =====================================================
+# AUTO-BIN (STREAMING SKETCH)
+# data besar: satu pass per chunk → quantile sketch (GK) + count
+# good/bad per bucket, optimizer jalan di agregat → memory konstan
+# =====================================================
+SKETCH_EPS = 1e-4
+
+
+def _sketch_solve_worker(col, sketch):
+    start = time.perf_counter()
+
+    try:
+        sketch.solve()
+
+        return {
+            "feature": col,
+            "splits": [float(split) for split in sketch.splits],
+            "status": sketch.status,
+            "seconds": time.perf_counter() - start,
+            "error": None
+        }
+
+    except Exception as e:
+        return {
+            "feature": col,
+            "splits": None,
+            "status": "FAILED",
+            "seconds": time.perf_counter() - start,
+            "error": str(e)
+        }
+
+
+def sketch_bin_features(
+    chunks,
+    target,
+    features,
+    monotonic_trend="auto",
+    separate_missing=None,
+    time_limit=60,
+    eps=SKETCH_EPS,
+    max_workers=None,
+    on_result=None
+):
+    # chunks: iterable DataFrame yang SUDAH di-apply_transformation
+    # (mis. ArtifactHandle.iter_chunks) → full train tanpa load penuh
+    separate_missing = separate_missing or {}
+
+    sketches = {
+        col: OptimalBinningSketch(
+            name=col,
+            dtype="numerical",
+            sketch="gk",
+            eps=eps,
+            solver="mip",
+            monotonic_trend=monotonic_trend,
+            max_n_prebins=20,
+            time_limit=time_limit
+        )
+        for col in features
+    }
+
+    for chunk in chunks:
+        y = chunk[target].to_numpy()
+
+        for col in features:
+            x = _numeric_values(chunk[col])
+
+            if separate_missing.get(col, False):
+                non_missing = ~np.isnan(x)
+                sketches[col].add(x[non_missing], y[non_missing])
+            else:
+                sketches[col].add(x, y)
+
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_sketch_solve_worker, col, sketches[col])
+            for col in features
+        ]
+
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["feature"]] = result
+
+            if on_result:
+                on_result(result)
+
+    return [results[col] for col in features]
+
+
 # =====================================================
 # BIN STATISTICS
 # =====================================================
@@ -197,96 +415,225 @@ def calculate_bin_stats(
 
 
 # =====================================================
-# APPLY BINNING
+# BINNING PLAN (COMPILED RULES)
+# rules di-compile sekali → tiap kolom jadi kode bin integer
+# numeric   : np.searchsorted ke cut points (right-closed, sama dengan pd.cut)
+# categorical: hashed lookup (pd.Index.get_indexer)
 # =====================================================
-def apply_binning(df, rules):
+# naikkan kalau label / kode bin berubah → stage cache lama tidak dipakai
+BINNING_VERSION = 3
+
+MISSING_LABEL = "Missing"
+OTHER_LABEL = "Other"
+
+
+def code_dtype(n_labels):
+    # kode -1 = NaN → int8 cukup sampai 127 bin
+    if n_labels <= np.iinfo(np.int8).max:
+        return np.int8
+    if n_labels <= np.iinfo(np.int16).max:
+        return np.int16
+    return np.int32
+
+
+def _interval_labels(edges):
+    # label diformat pd.cut sendiri (precision=3) → sama dengan woe_result lama
+    return list(pd.cut(np.array([], dtype="float64"), bins=edges).categories.astype(str))
+
+
+def _compile_cuts(cut_points, separate_missing):
+    cuts = np.asarray(cut_points, dtype="float64")
+
+    if np.any(np.diff(cuts) <= 0):
+        raise ValueError("bins must increase monotonically.")
+
+    edges = np.concatenate([[-np.inf], cuts, [np.inf]])
+    labels = _interval_labels(edges)
+
+    return {
+        "kind": "cut",
+        "cuts": cuts,
+        "edges": edges,
+        "labels": labels + ([MISSING_LABEL] if separate_missing else []),
+        "missing_code": len(labels) if separate_missing else -1,
+        "separate_missing": separate_missing
+    }
+
 
-    df_copy = df.copy()
+def _compile_mapping(mapping, separate_missing):
+    # label grup urut kemunculan pertama di mapping
+    groups = list(dict.fromkeys(str(group) for group in mapping.values()))
+    fallback = MISSING_LABEL if separate_missing else OTHER_LABEL
+
+    if fallback not in groups:
+        groups.append(fallback)
+
+    group_codes = {group: code for code, group in enumerate(groups)}
+
+    return {
+        "kind": "lookup",
+        "index": pd.Index(list(mapping.keys())),
+        "key_codes": np.array(
+            [group_codes[str(group)] for group in mapping.values()],
+            dtype="int64"
+        ),
+        "labels": groups,
+        "fallback_code": group_codes[fallback],
+        "separate_missing": separate_missing
+    }
+
+
+def compile_binning_plan(rules):
+
+    plan = {}
 
     for col, rule in rules.items():
 
-        separate_missing = rule.get(
-            "separate_missing",
-            False
-        )
+        separate_missing = rule.get("separate_missing", False)
 
-        # ============================================
-        # NUMERIC
-        # ============================================
         if rule["type"] == "numeric":
 
-            series = pd.to_numeric(
-                df_copy[col],
-                errors="coerce"
-            )
-
-            if rule["mode"] == "quantile":
+            if rule["mode"] == "quantile" and "edges" in rule:
+                # edge hasil fit di train
+                plan[col] = _compile_cuts(rule["edges"], separate_missing)
 
-                result = pd.qcut(
-                    series,
-                    q=rule["n_bins"],
-                    duplicates="drop"
-                )
+            elif rule["mode"] == "quantile":
+                # rules lama tanpa edge → qcut di data yang diberikan
+                plan[col] = {
+                    "kind": "qcut",
+                    "n_bins": rule["n_bins"],
+                    "separate_missing": separate_missing
+                }
 
             elif rule["mode"] == "optimal":
+                plan[col] = _compile_cuts(rule["splits"], separate_missing)
 
-                bins = (
-                    [-float("inf")]
-                    + rule["splits"]
-                    + [float("inf")]
-                )
+            else:
+                plan[col] = _compile_cuts(rule["cut_points"], separate_missing)
 
-                result = pd.cut(series, bins=bins)
+        elif rule["mode"] == "quantile":
+            plan[col] = {"kind": "factorize", "separate_missing": separate_missing}
 
-            else:
+        else:
+            plan[col] = _compile_mapping(rule["mapping"], separate_missing)
+
+    return plan
+
+
+def _numeric_values(series):
+    return pd.to_numeric(series, errors="coerce").to_numpy(
+        dtype="float64",
+        na_value=np.nan
+    )
 
-                bins = (
-                    [-float("inf")]
-                    + rule["cut_points"]
-                    + [float("inf")]
-                )
 
-                result = pd.cut(series, bins=bins)
+def _cut_codes(values, step):
+    # (c[i-1], c[i]] → i  ⇔  searchsorted side="left"
+    codes = np.searchsorted(step["cuts"], values, side="left")
 
-            if separate_missing:
-                result = result.astype(str)
-                result[series.isna()] = "Missing"
+    # NaN dan -inf tidak masuk interval manapun (sama dengan pd.cut)
+    codes[np.isnan(values) | (values == -np.inf)] = step["missing_code"]
 
-            df_copy[col] = result
+    return codes, step["labels"]
+
+
+def _qcut_codes(values, step):
+    binned = pd.qcut(values, q=step["n_bins"], duplicates="drop")
+
+    codes = np.asarray(binned.codes, dtype="int64")
+    labels = [str(interval) for interval in binned.categories]
+
+    if step["separate_missing"]:
+        codes = np.where(codes < 0, len(labels), codes)
+        labels = labels + [MISSING_LABEL]
+
+    return codes, labels
+
+
+def _factorize_codes(series, step):
+    codes, uniques = pd.factorize(series)
+
+    # nilai berbeda dengan str() sama (mis. 1 dan "1") → satu label
+    labels, inverse = np.unique(
+        np.array([str(value) for value in uniques], dtype=object),
+        return_inverse=True
+    )
+
+    codes = np.where(codes < 0, -1, inverse[np.maximum(codes, 0)])
+    labels = list(labels)
+
+    if step["separate_missing"]:
+        codes = np.where(codes < 0, len(labels), codes)
+        labels = labels + [MISSING_LABEL]
+
+    return codes, labels
+
+
+def _lookup_codes(series, step):
+    positions = step["index"].get_indexer(series)
+
+    codes = np.where(
+        positions < 0,
+        step["fallback_code"],
+        step["key_codes"][np.maximum(positions, 0)]
+    )
+
+    return codes, step["labels"]
+
+
+def bin_codes(df, plan):
+    # → {kolom: (kode int8/int16, label)}; kode -1 = NaN
+    result = {}
+
+    for col, step in plan.items():
+
+        if step["kind"] == "cut":
+            codes, labels = _cut_codes(_numeric_values(df[col]), step)
+
+        elif step["kind"] == "qcut":
+            codes, labels = _qcut_codes(_numeric_values(df[col]), step)
+
+        elif step["kind"] == "factorize":
+            codes, labels = _factorize_codes(df[col], step)
 
-        # ============================================
-        # CATEGORICAL
-        # ============================================
         else:
+            codes, labels = _lookup_codes(df[col], step)
+
+        result[col] = (codes.astype(code_dtype(len(labels))), labels)
 
-            if rule["mode"] == "quantile":
+    return result
 
-                if separate_missing:
 
-                    df_copy[col] = (
-                        df_copy[col]
-                        .fillna("Missing")
-                        .astype(str)
-                    )
+def decode_bins(codes, labels, step):
+    # 🔥 BIN-CODE DTYPE: kode int8/int16 + tabel label per fitur
+    # (pd.Categorical, kategori = label string yang sama dengan woe_result)
+    binned = pd.Categorical.from_codes(codes, categories=pd.Index(labels, dtype=object))
 
-                else:
+    # interval tanpa separate_missing → semua bin tampil (termasuk yang kosong)
+    # selain itu hanya bin yang muncul di data
+    if step["kind"] in ("cut", "qcut") and not step["separate_missing"]:
+        return binned
 
-                    df_copy[col] = (
-                        df_copy[col]
-                        .astype(str)
-                    )
+    used = np.bincount(codes.astype("int64") + 1, minlength=len(labels) + 1)[1:] > 0
 
-            else:
+    if used.all():
+        return binned
+
+    return binned.remove_categories([label for label, keep in zip(labels, used) if not keep])
+
+
+# =====================================================
+# APPLY BINNING
+# =====================================================
+def apply_binning(df, rules, plan=None):
 
-                result = df_copy[col].map(
-                    rule["mapping"]
-                )
+    if plan is None:
+        plan = compile_binning_plan(rules)
 
-                if separate_missing:
-                    result = result.fillna("Missing")
-                else:
-                    result = result.fillna("Other")
+    # shallow copy: kolom yang tidak di-bin tidak ikut dicopy
+    df_copy = df.copy(deep=False)
 
-                df_copy[col] = result.astype(str)
+    for col, (codes, labels) in bin_codes(df, plan).items():
+        df_copy[col] = decode_bins(codes, labels, plan[col])
 
     return df_copy
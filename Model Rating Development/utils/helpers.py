@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def apply_imputation(df, imputation_rules):
@@ -24,3 +25,134 @@ def apply_imputation(df, imputation_rules):
         df_copy[col] = df_copy[col].fillna(value)
 
     return df_copy
+
+
+# ======================
+# CSV DTYPE SCAN (STREAMING)
+# dtype per kolom dari semua chunk tanpa memuat file penuh
+# → sama dengan dtype hasil pd.read_csv sekali baca
+# ======================
+def csv_dtype(series):
+    # bool + NaN dibaca pandas sebagai object (True / False / nan);
+    # object yang dikunci lewat read_csv(dtype=...) → string 'True' / 'False'
+    # 🔥 pakai nullable "boolean"
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == "boolean":
+        return pd.BooleanDtype()
+
+    return series.dtype
+
+
+def csv_dtypes(df):
+    return {col: csv_dtype(df[col]) for col in df.columns}
+
+
+def promote_dtype(left, right):
+    if left == right:
+        return left
+
+    # bool di satu chunk, bool + NaN di chunk lain → boolean
+    if {str(left), str(right)} == {"bool", "boolean"}:
+        return pd.BooleanDtype()
+
+    # int + float (mis. NaN muncul di chunk lain) → float
+    if pd.api.types.is_numeric_dtype(left) and pd.api.types.is_numeric_dtype(right) \
+            and not pd.api.types.is_bool_dtype(left) and not pd.api.types.is_bool_dtype(right):
+        return np.result_type(left, right)
+
+    # campuran tipe lain → object
+    return np.dtype(object)
+
+
+def _with_missing(dtype):
+    # kolom yang punya chunk kosong (semua NaN)
+    if dtype is None:
+        return np.dtype("float64")
+
+    if pd.api.types.is_integer_dtype(dtype):
+        return np.result_type(dtype, np.float64)
+
+    if dtype == bool:
+        return pd.BooleanDtype()
+
+    return dtype
+
+
+def scan_csv_dtypes(path, chunksize):
+    dtypes = {}
+    missing = set()
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for col in chunk.columns:
+
+            # chunk tanpa nilai tidak menentukan tipe (pandas → float64),
+            # hanya menandai kolom punya missing
+            if chunk[col].isna().all():
+                dtypes.setdefault(col, None)
+                missing.add(col)
+                continue
+
+            dtype = csv_dtype(chunk[col])
+            dtypes[col] = dtype if dtypes.get(col) is None else promote_dtype(dtypes[col], dtype)
+
+    return {
+        col: _with_missing(dtype) if col in missing else dtype
+        for col, dtype in dtypes.items()
+    }
+
+
+def required_columns(config, binning_rules=None):
+    # kolom minimal yang dibutuhkan modul (untuk column projection)
+    columns = list(config["features"])
+
+    for col in (binning_rules or {}):
+        if col not in columns:
+            columns.append(col)
+
+    if config["target"] not in columns:
+        columns.append(config["target"])
+
+    return columns
+
+
+def apply_type_conversion(df, type_map, on_error=None):
+    # type_map: {kolom: "numeric" | "datetime" | "categorical" | "string"}
+    df_converted = df.copy()
+
+    for col, new_type in type_map.items():
+
+        try:
+            # NUMERIC
+            if new_type == "numeric":
+                df_converted[col] = (
+                    df_converted[col]
+                    .astype(str)
+                    .str.replace(",", "")
+                    .str.strip()
+                )
+                df_converted[col] = pd.to_numeric(
+                    df_converted[col],
+                    errors='coerce'
+                )
+
+            # DATETIME
+            elif new_type == "datetime":
+                df_converted[col] = pd.to_datetime(
+                    df_converted[col],
+                    errors='coerce',
+                    dayfirst=True
+                )
+
+            # CATEGORICAL
+            elif new_type == "categorical":
+                df_converted[col] = df_converted[col].astype("category")
+
+            # STRING
+            elif new_type == "string":
+                df_converted[col] = df_converted[col].astype(str)
+
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(col, e)
+
+    return df_converted
@@ -0,0 +1,354 @@
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+
+# =====================================================
+# DISCRIMINATORY POWER (KS / AUROC / GINI)
+# dihitung dari skor mentah (resolusi penuh), bukan per grade
+# exact    : group per nilai unik (sort, O(n log n)); tie → ½ (Mann-Whitney)
+# histogram: bincount ke n_bins lebar sama (O(n)); tie di dalam bin → ½
+# =====================================================
+def _prepare(score, target, higher_is_bad):
+    score = np.asarray(score, dtype="float64")
+    target = np.asarray(target, dtype="float64")
+
+    valid = ~(np.isnan(score) | np.isnan(target))
+    score, target = score[valid], target[valid]
+
+    # orientasi: nilai besar = lebih berisiko
+    return (score if higher_is_bad else -score), target
+
+
+def _curve_metrics(bad, good):
+    # bad / good per bucket, urut dari paling aman → paling berisiko
+    total_bad = bad.sum()
+    total_good = good.sum()
+
+    if total_bad == 0 or total_good == 0:
+        raise ValueError("Target needs both good and bad observations")
+
+    good_below = np.cumsum(good) - good
+
+    # P(skor bad > skor good) + ½ P(sama)
+    auroc = (bad * (good_below + 0.5 * good)).sum() / (total_bad * total_good)
+
+    ks = np.abs(np.cumsum(good) / total_good - np.cumsum(bad) / total_bad).max()
+
+    return {"auroc": float(auroc), "ks": float(ks), "gini": float(2 * auroc - 1)}
+
+
+def _bucket_table(lower, upper, bad, good, n_buckets):
+    # bucket (nilai unik / bin histogram) → ±n_buckets grup berisi populasi mirip
+    # tanpa memecah bucket → urut dari paling berisiko (sama dengan tabel grade)
+    total = bad + good
+
+    group = np.minimum(
+        (np.cumsum(total) - total) * n_buckets // max(total.sum(), 1),
+        n_buckets - 1
+    )
+
+    table = pd.DataFrame({
+        "group": group,
+        "min_bound": lower,
+        "max_bound": upper,
+        "bad": bad,
+        "good": good,
+        "total": total
+    }).groupby("group").agg(
+        min_bound=("min_bound", "min"),
+        max_bound=("max_bound", "max"),
+        bad=("bad", "sum"),
+        good=("good", "sum"),
+        total=("total", "sum")
+    )
+
+    table = table.iloc[::-1].reset_index(drop=True)
+
+    table["bad_ratio"] = table["bad"] / table["total"]
+    table["bad_pct"] = table["bad"] / table["bad"].sum()
+    table["good_pct"] = table["good"] / table["good"].sum()
+    table["total_pct"] = table["total"] / table["total"].sum()
+    table["cum_bad_pct"] = table["bad_pct"].cumsum()
+    table["cum_good_pct"] = table["good_pct"].cumsum()
+    table["KS"] = (table["cum_bad_pct"] - table["cum_good_pct"]).abs()
+
+    return table
+
+
+def exact_metrics(score, target, higher_is_bad=True, n_buckets=10):
+    # → (metrics dict, tabel bucket)
+    score, target = _prepare(score, target, higher_is_bad)
+
+    values, inverse = np.unique(score, return_inverse=True)
+
+    bad = np.bincount(inverse, weights=target, minlength=len(values))
+    good = np.bincount(inverse, minlength=len(values)) - bad
+
+    metrics = _curve_metrics(bad, good)
+
+    bounds = values if higher_is_bad else -values
+    table = _bucket_table(bounds, bounds, bad, good, n_buckets)
+
+    return metrics, table
+
+
+def histogram_metrics(score, target, higher_is_bad=True, n_bins=2000, n_buckets=10):
+    # aproksimasi O(n): error AUROC ≤ ½ × massa pasangan di bin yang sama
+    score, target = _prepare(score, target, higher_is_bad)
+
+    low, high = score.min(), score.max()
+    width = (high - low) / n_bins if high > low else 1.0
+
+    bins = np.minimum(((score - low) / width).astype("int64"), n_bins - 1)
+
+    bad = np.bincount(bins, weights=target, minlength=n_bins)
+    good = np.bincount(bins, minlength=n_bins) - bad
+
+    metrics = _curve_metrics(bad, good)
+
+    edges = low + width * np.arange(n_bins + 1)
+    lower, upper = edges[:-1], edges[1:]
+
+    if not higher_is_bad:
+        lower, upper = -upper, -lower
+
+    used = (bad + good) > 0
+    table = _bucket_table(lower[used], upper[used], bad[used], good[used], n_buckets)
+
+    return metrics, table
+
+
+def discrimination_metrics(score, target, higher_is_bad=True, method="exact", n_buckets=10, n_bins=2000):
+    if method == "histogram":
+        return histogram_metrics(score, target, higher_is_bad, n_bins, n_buckets)
+
+    return exact_metrics(score, target, higher_is_bad, n_buckets)
+
+
+# =====================================================
+# CONFIDENCE INTERVAL
+# DeLong : varians AUROC analitik dari midrank (O(n log n))
+# bootstrap: resample = multinomial atas sel (nilai unik × good/bad),
+#            semua resample satu batch dihitung vektor (tanpa loop per resample)
+# =====================================================
+def _z(alpha):
+    return NormalDist().inv_cdf(1 - alpha / 2)
+
+
+def delong_ci(score, target, higher_is_bad=True, alpha=0.05):
+    # → {"auroc": (estimasi, low, high), "gini": (...), "se": standard error}
+    score, target = _prepare(score, target, higher_is_bad)
+
+    bad_mask = target == 1
+    m, n = bad_mask.sum(), (~bad_mask).sum()
+
+    if m < 2 or n < 2:
+        raise ValueError("DeLong needs at least two good and two bad observations")
+
+    rank_all = pd.Series(score).rank(method="average").to_numpy()
+    rank_bad = pd.Series(score[bad_mask]).rank(method="average").to_numpy()
+    rank_good = pd.Series(score[~bad_mask]).rank(method="average").to_numpy()
+
+    # placement value: porsi good di bawah tiap bad / bad di atas tiap good
+    v_bad = (rank_all[bad_mask] - rank_bad) / n
+    v_good = 1 - (rank_all[~bad_mask] - rank_good) / m
+
+    auroc = v_bad.mean()
+    se = np.sqrt(v_bad.var(ddof=1) / m + v_good.var(ddof=1) / n)
+
+    z = _z(alpha)
+    low, high = max(auroc - z * se, 0.0), min(auroc + z * se, 1.0)
+
+    return {
+        "auroc": (auroc, low, high),
+        "gini": (2 * auroc - 1, 2 * low - 1, 2 * high - 1),
+        "se": se
+    }
+
+
+# sel bootstrap dibatasi → nilai unik berlebih di-collapse ke histogram
+BOOTSTRAP_MAX_CELLS = 20_000
+BOOTSTRAP_BATCH = 50
+
+
+def _bootstrap_cells(score, target):
+    values, inverse = np.unique(score, return_inverse=True)
+
+    if len(values) > BOOTSTRAP_MAX_CELLS:
+        low, high = values[0], values[-1]
+        width = (high - low) / BOOTSTRAP_MAX_CELLS
+        inverse = np.minimum(((score - low) / width).astype("int64"), BOOTSTRAP_MAX_CELLS - 1)
+        k = BOOTSTRAP_MAX_CELLS
+    else:
+        k = len(values)
+
+    bad = np.bincount(inverse, weights=target, minlength=k)
+    good = np.bincount(inverse, minlength=k) - bad
+
+    return bad, good
+
+
+def _bootstrap_batch(bad, good, n_resamples, seed):
+    # → (auroc, ks) untuk n_resamples resample sekaligus
+    rng = np.random.default_rng(seed)
+
+    counts = np.concatenate([bad, good])
+    n = int(counts.sum())
+
+    draws = rng.multinomial(n, counts / n, size=n_resamples)
+
+    k = len(bad)
+    bad_b, good_b = draws[:, :k].astype("float64"), draws[:, k:].astype("float64")
+
+    total_bad = bad_b.sum(axis=1, keepdims=True)
+    total_good = good_b.sum(axis=1, keepdims=True)
+
+    cum_good = np.cumsum(good_b, axis=1)
+    cum_bad = np.cumsum(bad_b, axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        auroc = (bad_b * (cum_good - 0.5 * good_b)).sum(axis=1) / (total_bad * total_good)[:, 0]
+        ks = np.abs(cum_good / total_good - cum_bad / total_bad).max(axis=1)
+
+    return auroc, ks
+
+
+def bootstrap_ci(
+    score,
+    target,
+    higher_is_bad=True,
+    n_boot=1000,
+    seed=42,
+    alpha=0.05,
+    max_workers=None
+):
+    # → {"auroc" / "gini" / "ks": (estimasi, low, high)} (percentile CI)
+    # seed per batch dari SeedSequence → hasil sama berapapun jumlah worker
+    score, target = _prepare(score, target, higher_is_bad)
+
+    bad, good = _bootstrap_cells(score, target)
+
+    estimate = _curve_metrics(bad, good)
+
+    sizes = [BOOTSTRAP_BATCH] * (n_boot // BOOTSTRAP_BATCH)
+    if n_boot % BOOTSTRAP_BATCH:
+        sizes.append(n_boot % BOOTSTRAP_BATCH)
+
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if max_workers == 1 or len(sizes) == 1:
+        batches = [_bootstrap_batch(bad, good, size, s) for size, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            batches = list(pool.map(
+                _bootstrap_batch,
+                [bad] * len(sizes),
+                [good] * len(sizes),
+                sizes,
+                seeds
+            ))
+
+    auroc = np.concatenate([batch[0] for batch in batches])
+    ks = np.concatenate([batch[1] for batch in batches])
+
+    q = [100 * alpha / 2, 100 * (1 - alpha / 2)]
+
+    auroc_low, auroc_high = np.nanpercentile(auroc, q)
+    ks_low, ks_high = np.nanpercentile(ks, q)
+
+    return {
+        "auroc": (estimate["auroc"], auroc_low, auroc_high),
+        "gini": (estimate["gini"], 2 * auroc_low - 1, 2 * auroc_high - 1),
+        "ks": (estimate["ks"], ks_low, ks_high)
+    }
+
+
+def metrics_ci_table(score, target, higher_is_bad=True, alpha=0.05, n_boot=0, seed=42, max_workers=None):
+    # tabel: metric | estimate | lower | upper | method
+    rows = []
+
+    delong = delong_ci(score, target, higher_is_bad, alpha)
+
+    for metric in ("auroc", "gini"):
+        rows.append((metric.upper(), *delong[metric], "DeLong"))
+
+    if n_boot:
+        boot = bootstrap_ci(score, target, higher_is_bad, n_boot, seed, alpha, max_workers)
+
+        for metric in ("auroc", "gini", "ks"):
+            rows.append((metric.upper(), *boot[metric], f"Bootstrap ({n_boot})"))
+
+    return pd.DataFrame(rows, columns=["metric", "estimate", "lower", "upper", "method"])
+
+
+# =====================================================
+# MULTI-DATASET COMPARISON
+# KS / AUROC / Gini per dataset × model + delta terhadap referensi (train)
+# PSI: bin = desil distribusi PD referensi
+# =====================================================
+COMPARISON_MODELS = {"Original": "pd", "Calibrated": "pd_calibrated"}
+
+
+def population_stability(expected, actual, n_bins=10):
+    expected = np.asarray(expected, dtype="float64")
+    actual = np.asarray(actual, dtype="float64")
+
+    expected = expected[~np.isnan(expected)]
+    actual = actual[~np.isnan(actual)]
+
+    edges = np.unique(np.quantile(expected, np.linspace(0, 1, n_bins + 1)[1:-1]))
+
+    expected_pct = np.bincount(np.searchsorted(edges, expected, side="right"), minlength=len(edges) + 1) / len(expected)
+    actual_pct = np.bincount(np.searchsorted(edges, actual, side="right"), minlength=len(edges) + 1) / len(actual)
+
+    # bin kosong → epsilon (hindari log 0)
+    expected_pct = np.clip(expected_pct, 1e-6, None)
+    actual_pct = np.clip(actual_pct, 1e-6, None)
+
+    return float(((actual_pct - expected_pct) * np.log(actual_pct / expected_pct)).sum())
+
+
+def comparison_table(scored, reference="Train", n_bins=10):
+    # scored: {dataset: DataFrame[target, pd, (pd_calibrated)]} → satu baris per dataset × model
+    rows = []
+
+    for dataset, df in scored.items():
+        for model, col in COMPARISON_MODELS.items():
+            if col not in df:
+                continue
+
+            metrics, _ = exact_metrics(df[col], df["target"])
+
+            rows.append({
+                "dataset": dataset,
+                "model": model,
+                "n": len(df),
+                "bad_rate": df["target"].mean(),
+                "mean_pd": df[col].mean(),
+                "ks": metrics["ks"],
+                "auroc": metrics["auroc"],
+                "gini": metrics["gini"],
+                "psi": (
+                    population_stability(scored[reference][col], df[col], n_bins)
+                    if reference in scored else np.nan
+                )
+            })
+
+    table = pd.DataFrame(rows)
+
+    if table.empty:
+        return table
+
+    ref = table[table["dataset"] == reference].set_index("model")
+
+    for metric in ("ks", "gini"):
+        ref_value = table["model"].map(ref[metric]) if not ref.empty else np.nan
+        table[f"delta_{metric}"] = table[metric] - ref_value
+
+    # penurunan relatif gini (validasi biasanya: drop > 10-20% perlu dijelaskan)
+    table["gini_change_pct"] = table["delta_gini"] / table["model"].map(ref["gini"]) if not ref.empty else np.nan
+
+    return table
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+UNKNOWN_LABEL = "Unknown"
+
+
+# ======================
+# RATING / SCORE RANGE RULES
+# rules: [(nama, min, max), ...] → interval [min, max), interval terakhir [min, max]
+# rule pertama yang cocok menang (sama dengan map_with_rules)
+# ======================
+def map_with_rules(x, rules):
+    for i, (name, low, high) in enumerate(rules):
+        if i == len(rules) - 1:
+            if low <= x <= high:
+                return name
+        else:
+            if low <= x < high:
+                return name
+    return UNKNOWN_LABEL
+
+
+def validate_rules(rules):
+    # → daftar masalah (kosong = rules kontigu tanpa overlap / gap)
+    issues = []
+
+    for name, low, high in rules:
+        if low > high:
+            issues.append(f"{name}: min {low} > max {high}")
+
+    names = [name for name, _, _ in rules]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+
+    if duplicated:
+        issues.append(f"Duplicate names: {duplicated}")
+
+    ordered = sorted(rules, key=lambda rule: (rule[1], rule[2]))
+
+    if not ordered:
+        return issues
+
+    # batas kanan terjauh sejauh ini → overlap / gap terhadap rule berikutnya
+    reach_name, _, reach = ordered[0]
+
+    for name, low, high in ordered[1:]:
+        if low < reach:
+            issues.append(f"{reach_name} overlaps {name} ({low} < {reach})")
+        elif low > reach:
+            issues.append(f"Gap between {reach_name} and {name}: [{reach}, {low}) → {UNKNOWN_LABEL}")
+
+        if high > reach:
+            reach_name, reach = name, high
+
+    return issues
+
+
+def _segment_labels(rules, boundaries):
+    # label tiap segmen [b_k, b_k+1) = rule pertama yang menutup segmen
+    # (jumlah segmen ≤ 2 × jumlah rule → loop kecil, bukan per baris)
+    lows = np.array([low for _, low, _ in rules], dtype="float64")
+    highs = np.array([high for _, _, high in rules], dtype="float64")
+
+    starts = boundaries[:-1][:, None]
+    ends = boundaries[1:][:, None]
+
+    covers = (lows[None, :] <= starts) & (ends <= highs[None, :])
+
+    first = np.where(covers.any(axis=1), covers.argmax(axis=1), -1)
+
+    return first
+
+
+def assign_rules(values, rules):
+    # vectorized map_with_rules: np.searchsorted ke boundary terurut
+    # → Series categorical (kategori = nama rule urut rules + "Unknown")
+    index = values.index if isinstance(values, pd.Series) else None
+    values = np.asarray(values, dtype="float64")
+
+    names = list(dict.fromkeys(name for name, _, _ in rules))
+    categories = names + ([UNKNOWN_LABEL] if UNKNOWN_LABEL not in names else [])
+
+    unknown_code = categories.index(UNKNOWN_LABEL)
+    rule_code = np.array([categories.index(name) for name, _, _ in rules] + [unknown_code])
+
+    codes = np.full(len(values), unknown_code, dtype="int64")
+
+    if rules:
+        boundaries = np.unique([bound for _, low, high in rules for bound in (low, high)]).astype("float64")
+
+        segment_rule = _segment_labels(rules, boundaries)
+
+        # segmen di luar boundary → Unknown (index rule -1)
+        segment = np.searchsorted(boundaries, values, side="right") - 1
+        inside = (segment >= 0) & (segment < len(boundaries) - 1)
+
+        matched = np.full(len(values), -1, dtype="int64")
+        matched[inside] = segment_rule[segment[inside]]
+
+        # rule terakhir tertutup di kanan: x == max ikut rule terakhir
+        _, last_low, last_high = rules[-1]
+        closed = (matched < 0) & (values == last_high) & (last_low <= last_high)
+        matched[closed] = len(rules) - 1
+
+        codes = rule_code[matched]
+
+    result = pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object))
+
+    return pd.Series(result, index=index)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from utils.vif import drop_high_vif
+
+
+# ======================
+# WOE CORRELATION
+# standardisasi sekali → matrix korelasi penuh dari satu Z'Z (BLAS)
+# ======================
+def woe_correlation(df_woe):
+    X = df_woe.to_numpy(dtype="float64")
+
+    X = X - X.mean(axis=0)
+    std = np.sqrt((X ** 2).sum(axis=0))
+
+    # kolom konstan → korelasi 0 dengan semua
+    std[std == 0] = np.inf
+    X /= std
+
+    corr = X.T @ X
+    np.fill_diagonal(corr, 1.0)
+
+    return pd.DataFrame(corr, index=df_woe.columns, columns=df_woe.columns)
+
+
+# ======================
+# PRE-SELECTION
+# 1. IV < iv_min dibuang
+# 2. cluster korelasi: urut IV tertinggi → variabel jadi leader,
+#    variabel lain dengan |corr| > corr_max ikut cluster-nya (dibuang)
+# 3. leader dengan VIF > vif_max dibuang iteratif (VIF tertinggi dulu)
+# ======================
+def preselect_features(df_woe, iv, iv_min=0.02, corr_max=0.6, vif_max=5.0):
+    # iv: {fitur: IV} → (shortlist, report per fitur)
+    candidates = sorted(
+        [col for col in df_woe.columns if col in iv],
+        key=lambda col: iv[col],
+        reverse=True
+    )
+
+    report = {
+        col: {"variable": col, "iv": iv[col], "cluster": None, "status": "low IV"}
+        for col in candidates
+    }
+
+    strong = [col for col in candidates if iv[col] >= iv_min]
+
+    corr = woe_correlation(df_woe[strong]).abs().to_numpy() if strong else None
+
+    position = {col: i for i, col in enumerate(strong)}
+    assigned = set()
+    leaders = []
+
+    for col in strong:
+        if col in assigned:
+            continue
+
+        cluster = len(leaders) + 1
+        leaders.append(col)
+
+        members = [
+            other for other in strong
+            if other not in assigned
+            and corr[position[col], position[other]] > corr_max
+        ]
+
+        for other in members + [col]:
+            assigned.add(other)
+            report[other]["cluster"] = cluster
+            report[other]["status"] = f"correlated with {col}"
+
+        report[col]["status"] = "kept"
+
+    keep, _ = drop_high_vif(df_woe[leaders], threshold=vif_max) if leaders else ([], None)
+
+    for col in leaders:
+        if col not in keep:
+            report[col]["status"] = "high VIF"
+
+    report = pd.DataFrame(
+        list(report.values()),
+        columns=["variable", "iv", "cluster", "status"]
+    )
+
+    report["cluster"] = report["cluster"].astype("Int64")
+
+    return keep, report
@@ -0,0 +1,69 @@
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+
+# ======================
+# SPLIT FRAME
+# random / stratified / time_based → (train, test, val)
+# ======================
+def split_frame(
+    df,
+    target,
+    method="random",
+    test_size=0.2,
+    use_validation=False,
+    date_col=None,
+    split_date=None
+):
+
+    if method == "time_based":
+
+        df = df.copy()
+        df[date_col] = pd.to_datetime(df[date_col])
+        df = df.sort_values(date_col)
+
+        split_date = pd.Timestamp(split_date)
+
+        train = df[df[date_col] < split_date]
+        test = df[df[date_col] >= split_date]
+
+        return train, test, None
+
+    val_size = 0.2 if use_validation else 0
+
+    stratify_col = df[target] if method == "stratified" else None
+
+    if not use_validation:
+
+        train, test = train_test_split(
+            df,
+            test_size=test_size,
+            stratify=stratify_col,
+            random_state=42
+        )
+
+        return train, test, None
+
+    train_val, test = train_test_split(
+        df,
+        test_size=test_size,
+        stratify=stratify_col,
+        random_state=42
+    )
+
+    val_ratio = val_size / (1 - test_size)
+
+    stratify_val = (
+        train_val[target]
+        if method == "stratified"
+        else None
+    )
+
+    train, val = train_test_split(
+        train_val,
+        test_size=val_ratio,
+        stratify=stratify_val,
+        random_state=42
+    )
+
+    return train, test, val
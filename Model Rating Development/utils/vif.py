@@ -1,22 +1,108 @@
+import numpy as np
 import pandas as pd
-from statsmodels.stats.outliers_influence import variance_inflation_factor
 
 
-def calculate_vif(df):
+# ======================
+# VIF (BATCH)
+# semua VIF sekaligus dari invers matrix korelasi:
+# VIF_i = [R^-1]_ii  → satu X'X (BLAS), bukan p kali regresi OLS
+# centered=False → sama dengan statsmodels variance_inflation_factor
+# tanpa konstanta (R² uncentered); centered=True → VIF dengan intercept
+# ======================
+SINGULAR_COND = 1e12
 
-    X = df.copy()
+
+def gram_matrix(X, centered=False):
+    X = np.asarray(X, dtype="float64")
+
+    if centered:
+        X = X - X.mean(axis=0)
+
+    return X.T @ X
+
+
+def vif_from_gram(gram):
+    gram = np.asarray(gram, dtype="float64")
+
+    scale = np.sqrt(np.diag(gram))
+    valid = scale > 0
+
+    vif = np.full(len(gram), np.nan)
+
+    if not valid.any():
+        return vif
+
+    # korelasi (uncentered / centered) antar kolom yang tidak konstan nol
+    sub = gram[np.ix_(valid, valid)] / np.outer(scale[valid], scale[valid])
+
+    if np.linalg.cond(sub) < SINGULAR_COND:
+        vif[valid] = np.diag(np.linalg.inv(sub))
+        return vif
+
+    # 🔥 near-singular → eigen: diag(R^-1) = Σ V_ij² / w_j
+    # eigenvalue ~0 (kolinear sempurna) → VIF inf untuk kolom yang terlibat
+    w, v = np.linalg.eigh(sub)
+
+    tol = w.max() * len(w) * np.finfo("float64").eps
+    null = w <= tol
+
+    with np.errstate(divide="ignore"):
+        diag = (v[:, ~null] ** 2 / w[~null]).sum(axis=1)
+
+    involved = (v[:, null] ** 2).sum(axis=1) > tol
+    diag[involved] = np.inf
+
+    vif[valid] = diag
+
+    return vif
+
+
+def calculate_vif(df, centered=False):
 
     # drop non numeric
-    X = X.select_dtypes(include=["number"])
+    X = df.select_dtypes(include=["number"])
+
+    vif = vif_from_gram(gram_matrix(X.to_numpy(), centered))
+
+    return pd.DataFrame({
+        "variable": X.columns,
+        "vif": vif
+    })
+
 
-    vif_data = []
+# ======================
+# ITERATIVE DROP
+# buang variabel dengan VIF tertinggi sampai semua ≤ threshold
+# (X'X dihitung sekali, tiap iterasi cukup sub-matrix)
+# ======================
+def drop_high_vif(df, threshold=10, centered=False):
+    # → (variabel yang dipertahankan, riwayat drop)
+    X = df.select_dtypes(include=["number"])
 
-    for i in range(X.shape[1]):
-        vif = variance_inflation_factor(X.values, i)
+    gram = gram_matrix(X.to_numpy(), centered)
 
-        vif_data.append({
-            "variable": X.columns[i],
-            "vif": vif
+    keep = list(range(X.shape[1]))
+    dropped = []
+
+    while len(keep) > 1:
+        vif = vif_from_gram(gram[np.ix_(keep, keep)])
+
+        # NaN (kolom nol) dianggap paling tinggi → ikut dibuang
+        vif = np.where(np.isnan(vif), np.inf, vif)
+
+        worst = int(np.argmax(vif))
+
+        if vif[worst] <= threshold:
+            break
+
+        dropped.append({
+            "step": len(dropped) + 1,
+            "variable": X.columns[keep[worst]],
+            "vif": vif[worst]
         })
 
-    return pd.DataFrame(vif_data)
+        del keep[worst]
+
+    history = pd.DataFrame(dropped, columns=["step", "variable", "vif"])
+
+    return [X.columns[i] for i in keep], history
@@ -1,17 +1,54 @@
+import hashlib
+import json
+
 import pandas as pd
 import numpy as np
 
+from utils.binning import compile_binning_plan, bin_codes, MISSING_LABEL
+from utils.transform import apply_transformation
+
+MISSING_LABELS = ("nan", "NaN", "None")
+
+# smoothing default pipeline (halaman WOE, runner headless, stage cache)
+WOE_ALPHA = 0.5
+
+
+def missing_as_bin(binned):
+    # bin-code (categorical): NaN & label "nan" → kategori "Missing"
+    # cukup relabel tabel kategori, tidak menyentuh string per baris
+    labels = [
+        "Missing" if str(label) in MISSING_LABELS else label
+        for label in binned.cat.categories
+    ] + ["Missing"]
+
+    unique_labels = list(dict.fromkeys(labels))
+    position = {label: i for i, label in enumerate(unique_labels)}
+    remap = np.array([position[label] for label in labels])
+
+    codes = remap[binned.cat.codes.to_numpy()]  # kode -1 → "Missing" (elemen terakhir)
+
+    result = pd.Categorical.from_codes(codes, categories=pd.Index(unique_labels, dtype=object))
+
+    if not (codes == position["Missing"]).any():
+        result = result.remove_categories(["Missing"])
+
+    return pd.Series(result, index=binned.index, name=binned.name)
+
+
 def calculate_woe_iv(df, feature, target, alpha=0.05):
 
-    df = df.copy()
+    if isinstance(df[feature].dtype, pd.CategoricalDtype):
+        bins = missing_as_bin(df[feature])
+    else:
+        bins = (
+            df[feature]
+            .fillna("Missing")
+            .replace(["nan", "NaN", "None"], "Missing")
+        )
 
-    df[feature] = (
-        df[feature]
-        .fillna("Missing")
-        .replace(["nan", "NaN", "None"], "Missing")
-    )  
     grouped = (
-        df.groupby(feature, dropna=False, observed=False)[target]
+        df[target]
+        .groupby(bins, dropna=False, observed=False)
         .agg(["count", "sum"])
         .reset_index()
     )
@@ -40,6 +77,102 @@ def calculate_woe_iv(df, feature, target, alpha=0.05):
 
     return grouped, iv
 
+# =====================================================
+# BATCH WOE / IV
+# semua fitur sekali jalan: kode bin per fitur → np.bincount
+# (tanpa df.copy / groupby per fitur)
+# =====================================================
+WOE_COLUMNS = [
+    "bin", "total", "bad", "good", "bad_rate", "portion",
+    "good_dist", "bad_dist", "woe", "iv_contrib"
+]
+
+
+def _woe_codes(series):
+    # → (kode >= 0, label bin) dengan urutan bin sama seperti groupby
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        bins = missing_as_bin(series)
+        return bins.cat.codes.to_numpy(), bins.cat.categories
+
+    bins = (
+        series
+        .fillna("Missing")
+        .replace(["nan", "NaN", "None"], "Missing")
+    )
+
+    codes, labels = pd.factorize(bins, sort=True)
+
+    return codes, labels
+
+
+def woe_iv_batch(df, features, target, alpha=0.05):
+    # → woe_result tidy: variabel | bin | total | bad | ... | woe | iv_contrib
+    # angka per fitur identik dengan calculate_woe_iv
+    y = df[target].to_numpy(dtype="float64", na_value=np.nan)
+    valid = ~np.isnan(y)
+    y_valid = y[valid]
+
+    integer_target = pd.api.types.is_integer_dtype(df[target]) or pd.api.types.is_bool_dtype(df[target])
+
+    tables = []
+
+    for col in features:
+        codes, labels = _woe_codes(df[col])
+        codes = codes[valid] if not valid.all() else codes
+
+        n_bins = len(labels)
+
+        total = np.bincount(codes, minlength=n_bins)
+        bad = np.bincount(codes, weights=y_valid, minlength=n_bins)
+
+        if integer_target:
+            bad = bad.astype("int64")
+
+        tables.append(pd.DataFrame({
+            "variabel": col,
+            "bin": labels,
+            "total": total,
+            "bad": bad
+        }))
+
+    if not tables:
+        return pd.DataFrame(columns=["variabel"] + WOE_COLUMNS)
+
+    result = pd.concat(tables, ignore_index=True)
+
+    result["good"] = result["total"] - result["bad"]
+
+    # total per fitur (broadcast ke setiap bin)
+    per_feature = result.groupby("variabel", sort=False)
+
+    total_good = per_feature["good"].transform("sum")
+    total_bad = per_feature["bad"].transform("sum")
+    total_all = per_feature["total"].transform("sum")
+    n_bins = per_feature["bin"].transform("size")
+
+    # 🔥 SMOOTHING
+    result["bad_rate"] = result["bad"] / result["total"]
+    result["portion"] = result["total"] / total_all
+    result["good_dist"] = (result["good"] + alpha) / (total_good + alpha * n_bins)
+    result["bad_dist"] = (result["bad"] + alpha) / (total_bad + alpha * n_bins)
+
+    # WOE
+    result["woe"] = np.log(result["good_dist"] / result["bad_dist"])
+
+    # IV
+    result["iv_contrib"] = (result["good_dist"] - result["bad_dist"]) * result["woe"]
+
+    return result
+
+
+def split_woe_result(woe_result):
+    # woe_result tidy → {fitur: (woe_table, iv)} (format calculate_woe_iv)
+    return {
+        col: (table[WOE_COLUMNS].reset_index(drop=True), table["iv_contrib"].sum())
+        for col, table in woe_result.groupby("variabel", sort=False)
+    }
+
+
 def sort_woe_table(df):
 
     def order(x):
@@ -75,3 +208,173 @@ def sort_woe_table(df):
     df = df.sort_values("_sort").drop(columns="_sort")
 
     return df
+
+
+def standardize_woe_table(woe_table, col, rule):
+    # format woe_result: variabel | kategori | woe
+    if rule["type"] == "numeric":
+        woe_table = sort_woe_table(woe_table)
+    else:
+        woe_table = woe_table.sort_values(by="woe", ascending=False)
+
+    woe_table = woe_table.copy()
+    woe_table["variabel"] = col
+
+    if "bin" in woe_table.columns:
+        woe_table = woe_table.rename(columns={"bin": "kategori"})
+
+    woe_table["kategori"] = woe_table["kategori"].astype(str)
+
+    return woe_table
+
+
+# =====================================================
+# WOE TRANSFORMER
+# dibuat sekali di halaman WOE (rules ter-fit + woe_result + alpha),
+# disimpan sebagai artifact model "woe_maps" → VIF / training / scoring
+# memakai encoding yang sama persis
+# =====================================================
+class WoeTransformer:
+
+    def __init__(self, binning_rules, woe, alpha=None):
+        # woe: {fitur: {label bin: woe}}
+        self.binning_rules = {col: binning_rules[col] for col in woe}
+        self.woe = woe
+        self.alpha = alpha
+        self._plan = None
+
+    @classmethod
+    def from_woe_result(cls, binning_rules, woe_result, alpha=None):
+        woe = {
+            var: dict(zip(table["kategori"].astype(str), table["woe"].astype(float)))
+            for var, table in woe_result.groupby("variabel", sort=False)
+            if var in binning_rules
+        }
+
+        return cls(binning_rules, woe, alpha)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["binning_rules"], data["woe"], data.get("alpha"))
+
+    def to_dict(self):
+        return {
+            "binning_rules": self.binning_rules,
+            "woe": self.woe,
+            "alpha": self.alpha
+        }
+
+    @property
+    def features(self):
+        return list(self.woe)
+
+    def fingerprint(self, col):
+        # berubah hanya kalau rule / tabel WOE fitur ini berubah
+        payload = json.dumps([self.binning_rules[col], self.woe[col]], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            self._plan = compile_binning_plan(self.binning_rules)
+        return self._plan
+
+    def stale_labels(self, col):
+        # label WOE yang tidak dikenal plan binning (mis. tabel WOE dari format label lama)
+        step = self.plan[col]
+
+        if step["kind"] not in ("cut", "lookup"):
+            return []
+
+        known = set(step["labels"]) | {MISSING_LABEL, *MISSING_LABELS}
+
+        return [label for label in self.woe[col] if label not in known]
+
+    def transform_matrix(self, df, features=None, unseen="nan"):
+        # df mentah (belum di-transform / di-bin) → matrix float32 (baris × fitur)
+        features = self.features if features is None else list(features)
+
+        # 🔥 tabel WOE tidak cocok dengan label bin → error, bukan diam-diam WOE Missing / 0
+        for col in features:
+            stale = self.stale_labels(col)
+
+            if stale:
+                raise ValueError(f"WOE table of {col} does not match its bins {stale[:3]} — re-run WOE")
+
+        rules = {col: self.binning_rules[col] for col in features}
+        plan = {col: self.plan[col] for col in features}
+
+        df = apply_transformation(df[features], rules)
+
+        codes = bin_codes(df, plan)
+
+        lookups = {
+            col: woe_lookup(labels, self.woe[col], unseen)
+            for col, (_, labels) in codes.items()
+        }
+
+        return apply_woe(codes, lookups, features), features
+
+    def transform(self, df, features=None, unseen="nan"):
+        # → DataFrame WOE (default: bin tanpa WOE = NaN)
+        matrix, features = self.transform_matrix(df, features, unseen)
+
+        return pd.DataFrame(matrix, index=df.index, columns=features, copy=False)
+
+
+# =====================================================
+# APPLY WOE (DENSE LOOKUP)
+# per fitur: array WOE per kode bin → np.take langsung ke kolom
+# matrix float32 yang dialokasikan sekali (tanpa frame perantara)
+# =====================================================
+# bin yang tidak punya WOE (tidak muncul di train):
+# "nan" → NaN, "zero" → 0, "missing" → WOE bin Missing (0 kalau tidak ada), "error" → raise
+UNSEEN_POLICIES = ("nan", "zero", "missing", "error")
+
+
+def woe_lookup(labels, mapping, unseen="nan"):
+    # → float32 [WOE kode 0..n-1, WOE kode -1 (NaN)]
+    # label "nan" / kode -1 diperlakukan sebagai bin "Missing" (sama dengan calculate_woe_iv)
+    if unseen not in UNSEEN_POLICIES:
+        raise ValueError(f"Unknown unseen-bin policy: {unseen}")
+
+    missing_woe = mapping.get(MISSING_LABEL)
+
+    fallback = {
+        "nan": np.nan,
+        "zero": 0.0,
+        "missing": missing_woe if missing_woe is not None else 0.0,
+        "error": np.nan
+    }[unseen]
+
+    keys = [
+        MISSING_LABEL if str(label) in MISSING_LABELS else str(label)
+        for label in labels
+    ] + [MISSING_LABEL]
+
+    lookup = np.array([mapping.get(key, np.nan) for key in keys], dtype="float32")
+
+    unknown = np.isnan(lookup)
+
+    if unseen == "error" and unknown[:-1].any():
+        raise ValueError(f"Bins without WOE: {[key for key, flag in zip(keys, unknown) if flag]}")
+
+    lookup[unknown] = fallback
+
+    return lookup
+
+
+def apply_woe(codes, lookups, features=None):
+    # codes: {fitur: (kode bin, label)} dari bin_codes; lookups: {fitur: woe_lookup}
+    features = list(codes) if features is None else features
+
+    n_rows = len(codes[features[0]][0]) if features else 0
+
+    # Fortran order → tiap kolom contiguous, np.take menulis langsung (out=)
+    matrix = np.empty((n_rows, len(features)), dtype="float32", order="F")
+
+    for j, col in enumerate(features):
+        # mode="wrap": kode -1 → elemen terakhir lookup (Missing)
+        np.take(lookups[col], codes[col][0], out=matrix[:, j], mode="wrap")
+
+    return matrix
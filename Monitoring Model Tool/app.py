@@ -2,7 +2,7 @@ import streamlit as st
 import os
 from utils.psi import preprocess_for_psi, calculate_psi
 from utils.io_handler import save_to_excel
-from utils.metrics import process_max_dpd_per_observation, deduplicate_gini, calculate_gini_metrics
+from utils.metrics import process_max_dpd_per_observation, deduplicate_gini, calculate_gini_metrics, calculate_exact_metrics, calculate_auroc_ci
 
 st.set_page_config(page_title="Model Monitoring Tool", layout="wide")
 
@@ -65,6 +65,8 @@ if st.button("Mulai Proses"):
             # Proses Gini
             df_gini_dedup = deduplicate_gini(result_dfs)
             gini_df, gini_metrics_df, ks_value, auroc_value, gini_value = calculate_gini_metrics(df_gini_dedup, segment)
+            ks_exact, auroc_exact, gini_exact = calculate_exact_metrics(df_gini_dedup, segment)
+            auroc_ci, gini_ci = calculate_auroc_ci(df_gini_dedup, segment)
 
             # Simpan ke session state
             if segment == "Wholesale":
@@ -108,6 +110,17 @@ if st.button("Mulai Proses"):
             - **Gini**: {gini_value * 100:.2f}%
             """)
 
+            st.markdown("#### 🎯 Metrics dari skor mentah (exact)")
+            st.markdown(f"""
+            - **KS Value**: {ks_exact * 100:.2f}%  
+            - **AUROC**: {auroc_exact * 100:.2f}%  
+            - **Gini**: {gini_exact * 100:.2f}%
+            """)
+            st.caption(
+                f"95% CI (DeLong) — AUROC: {auroc_ci[0] * 100:.2f}% – {auroc_ci[1] * 100:.2f}% · "
+                f"Gini: {gini_ci[0] * 100:.2f}% – {gini_ci[1] * 100:.2f}%"
+            )
+
         except Exception as e:
             st.error(f"❌ Gagal memproses data: {e}")
     else:
@@ -1,6 +1,8 @@
 import os
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from statistics import NormalDist
 from dateutil.relativedelta import relativedelta
 from utils.io_handler import read_excel_file
 
@@ -179,3 +181,67 @@ def calculate_gini_metrics(df: pd.DataFrame, segment: str, score_col: str = "Fin
     gini_value = (auroc_value * 2) - 1
 
     return df, result, ks_value, auroc_value, gini_value
+
+# Fungsi untuk menghitung KS, AUROC, dan Gini exact dari skor mentah (bukan per grup)
+# nilai unik di-group sekali (sort, O(n log n)); skor sama (tie) dihitung ½
+# Catatan: salinan exact_metrics di "Model Rating Development/utils/metrics.py"
+# (app terpisah dengan requirements sendiri, tidak bisa saling import) → ubah keduanya bersamaan
+def _raw_score_target(df: pd.DataFrame, segment: str, score_col: str, flag_col: str):
+    df = df[df[score_col].notnull() & df[flag_col].isin([0, 1])]
+
+    if segment == "Wholesale":
+        # Grade lebih tinggi = risiko lebih tinggi
+        score = df[score_col].astype(str).str.extract(r"(\d+)", expand=False).astype(float).to_numpy()
+    else:
+        score = pd.to_numeric(df[score_col], errors="coerce").to_numpy(dtype=float)
+
+    target = df[flag_col].to_numpy(dtype=float)
+
+    valid = ~np.isnan(score)
+    return score[valid], target[valid]
+
+def calculate_exact_metrics(df: pd.DataFrame, segment: str, score_col: str = "Final PD", flag_col: str = "Bad Flag"):
+    score, target = _raw_score_target(df, segment, score_col, flag_col)
+
+    values, inverse = np.unique(score, return_inverse=True)
+    bad = np.bincount(inverse, weights=target, minlength=len(values))
+    good = np.bincount(inverse, minlength=len(values)) - bad
+
+    total_bad, total_good = bad.sum(), good.sum()
+
+    if total_bad == 0 or total_good == 0:
+        return np.nan, np.nan, np.nan
+
+    good_below = np.cumsum(good) - good
+
+    auroc_value = (bad * (good_below + 0.5 * good)).sum() / (total_bad * total_good)
+    ks_value = np.abs(np.cumsum(good) / total_good - np.cumsum(bad) / total_bad).max()
+    gini_value = (auroc_value * 2) - 1
+
+    return ks_value, auroc_value, gini_value
+
+# Confidence interval AUROC & Gini (DeLong): varians analitik dari midrank, tanpa resampling
+# (salinan delong_ci di "Model Rating Development/utils/metrics.py" → ubah keduanya bersamaan)
+def calculate_auroc_ci(df: pd.DataFrame, segment: str, score_col: str = "Final PD", flag_col: str = "Bad Flag", alpha: float = 0.05):
+    score, target = _raw_score_target(df, segment, score_col, flag_col)
+
+    bad_mask = target == 1
+    m, n = bad_mask.sum(), (~bad_mask).sum()
+
+    if m < 2 or n < 2:
+        return (np.nan, np.nan), (np.nan, np.nan)
+
+    rank_all = pd.Series(score).rank(method="average").to_numpy()
+    rank_bad = pd.Series(score[bad_mask]).rank(method="average").to_numpy()
+    rank_good = pd.Series(score[~bad_mask]).rank(method="average").to_numpy()
+
+    v_bad = (rank_all[bad_mask] - rank_bad) / n
+    v_good = 1 - (rank_all[~bad_mask] - rank_good) / m
+
+    auroc_value = v_bad.mean()
+    se = np.sqrt(v_bad.var(ddof=1) / m + v_good.var(ddof=1) / n)
+
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    auroc_low, auroc_high = max(auroc_value - z * se, 0.0), min(auroc_value + z * se, 1.0)
+
+    return (auroc_low, auroc_high), (auroc_low * 2 - 1, auroc_high * 2 - 1)